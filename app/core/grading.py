@@ -23,7 +23,7 @@ class Rubric:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class Node:
     code: str
     label: str = ""
@@ -31,8 +31,8 @@ class Node:
     children: List["Node"] = field(default_factory=list)
 
     def level(self) -> int:
-        # "1" => 0, "1.2" => 1, "1.2.1" => 2
-        return max(0, len(self.code.split(".")) - 1)
+        # "1" => 0, "1.2" => 1, "1.2.1" => 2 (nombre de points : pas de liste intermédiaire)
+        return self.code.count(".")
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -126,6 +126,29 @@ def leaf_nodes(scheme: Scheme) -> List[Node]:
     return out
 
 
+def node_totals(scheme: Scheme) -> Dict[str, float]:
+    """Total max ("good") de chaque nœud, indexé par code, calculé en un seul parcours post-ordre.
+
+    Feuille de niveau 1/2 : rubric.good (1 par défaut) ; nœud avec enfants : somme des enfants.
+    """
+    out: Dict[str, float] = {}
+    # Post-ordre itératif : chaque nœud est empilé deux fois (descente, puis somme des enfants)
+    stack: List[Tuple[Node, bool]] = [(ex, False) for ex in reversed(scheme.exercises)]
+    while stack:
+        n, done = stack.pop()
+        if n.children:
+            if not done:
+                stack.append((n, True))
+                stack.extend((c, False) for c in reversed(n.children))
+                continue
+            out[n.code] = float(sum(out[c.code] for c in n.children))
+        elif n.level() in (1, 2):
+            out[n.code] = float(n.rubric.good) if n.rubric else 1.0
+        else:
+            out[n.code] = 0.0
+    return out
+
+
 def points_for(scheme: Scheme, leaf_code: str, result: str) -> float:
     found = find_node(scheme, leaf_code)
     if not found:
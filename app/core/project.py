@@ -164,6 +164,24 @@ class Project:
         self.settings.setdefault("image_categories", ["Général"])
         # grading_scheme is handled in app_window via ensure_scheme_dict
 
+    def _normalize_annotations(self) -> None:
+        """Répare settings["annotations"] au chargement : dict[str, list[dict]].
+
+        Fait une seule fois ici, pour que l'UI puisse ensuite lire les listes sans revérifier les types.
+        """
+        ann = self.settings.get("annotations")
+        if not isinstance(ann, dict):
+            self.settings["annotations"] = {}
+            return
+        clean: Dict[str, List[Dict[str, Any]]] = {}
+        for doc_id, lst in ann.items():
+            if not isinstance(lst, list):
+                continue
+            if not all(isinstance(a, dict) for a in lst):
+                lst = [a for a in lst if isinstance(a, dict)]
+            clean[str(doc_id)] = lst
+        self.settings["annotations"] = clean
+
     @classmethod
     def create(cls, parent_dir: Path, name: str) -> "Project":
         parent_dir = Path(parent_dir).expanduser().resolve()
@@ -275,6 +293,7 @@ class Project:
             settings=dict(d.get("settings") or {}),
         )
         prj._ensure_defaults()
+        prj._normalize_annotations()
         return prj
 
     def to_dict(self) -> Dict[str, Any]:
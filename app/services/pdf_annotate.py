@@ -1,10 +1,11 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 import math
 import sys
 import tempfile
+import threading
 
 from PIL import Image
 import fitz
@@ -14,6 +15,12 @@ from app.services.pdf_images import insert_image as _insert_pdf_image
 
 
 _BG_IMAGE_CACHE: dict[tuple[int, int, int, int], str] = {}
+_BG_IMAGE_LOCK = threading.Lock()
+
+# PyMuPDF n'est pas thread-safe pour un même objet : chaque thread travaille sur ses
+# propres fitz.Document (la génération du PDF corrigé ouvre les siens dans le worker),
+# et ce verrou ne protège que les documents partagés (celui de la vue PDF).
+MUPDF_LOCK = threading.RLock()
 
 
 def _get_solid_rgba_png(rgb01: Tuple[float, float, float], opacity: float) -> str:
@@ -29,23 +36,25 @@ def _get_solid_rgba_png(rgb01: Tuple[float, float, float], opacity: float) -> st
     a = int(max(0.0, min(1.0, float(opacity))) * 255)
 
     key = (r, g, b, a)
-    cached = _BG_IMAGE_CACHE.get(key)
-    if cached and Path(cached).exists():
-        return cached
-
-    tmp = Path(tempfile.gettempdir())
-    path = tmp / f"pdfcorr_bg_{r:02x}{g:02x}{b:02x}_{a:03d}.png"
-    if not path.exists():
-        try:
-            img = Image.new("RGBA", (8, 8), (r, g, b, a))
-            img.save(path, format="PNG")
-        except Exception:
-            # Fallback : crée une version opaque si jamais la création échoue
-            img = Image.new("RGB", (8, 8), (r, g, b))
-            img.save(path, format="PNG")
-
-    _BG_IMAGE_CACHE[key] = str(path)
-    return str(path)
+    # partagé entre le thread Tk et le worker de régénération (fichier écrit une seule fois)
+    with _BG_IMAGE_LOCK:
+        cached = _BG_IMAGE_CACHE.get(key)
+        if cached and Path(cached).exists():
+            return cached
+
+        tmp = Path(tempfile.gettempdir())
+        path = tmp / f"pdfcorr_bg_{r:02x}{g:02x}{b:02x}_{a:03d}.png"
+        if not path.exists():
+            try:
+                img = Image.new("RGBA", (8, 8), (r, g, b, a))
+                img.save(path, format="PNG")
+            except Exception:
+                # Fallback : crée une version opaque si jamais la création échoue
+                img = Image.new("RGB", (8, 8), (r, g, b))
+                img.save(path, format="PNG")
+
+        _BG_IMAGE_CACHE[key] = str(path)
+        return str(path)
 
 
 def _hex_to_rgb01(hex_color: str) -> Tuple[float, float, float]:
@@ -188,31 +197,18 @@ def _insert_text_safe(
     except Exception:
         return
 
-def apply_annotations(
-    base_pdf: Path,
-    out_pdf: Path,
-    annotations: List[Dict[str, Any]],
+def _draw_annotation(
+    page: "fitz.Page",
+    ann: Dict[str, Any],
+    g_op: float = 1.0,
     project_root: Optional[Path] = None,
-    opacity_factor: float = 1.0,
+    base_pdf: Optional[Path] = None,
 ) -> None:
-    """
-    Applique les annotations:
-    - score_circle: pastille (rond) + libellé bleu
-    - ink: trait main levée (polyline)
-    - textbox: zone de texte (sans cadre / fond transparent)
-    - arrow: flèche (ligne + tête)
-    - image: insertion d'un PNG (rect)
-    """
-    base_pdf = Path(base_pdf)
-    out_pdf = Path(out_pdf)
-    out_pdf.parent.mkdir(parents=True, exist_ok=True)
+    """Dessine une annotation (dict) sur une page déjà chargée.
 
-    # Facteur global (0..1). Sert principalement à l'aperçu des overlays (GuideCorrection).
-    try:
-        g_op = float(opacity_factor)
-    except Exception:
-        g_op = 1.0
-    g_op = max(0.0, min(1.0, g_op))
+    Partagé par la génération complète et la régénération page par page.
+    """
+    kind = str(ann.get("kind") or "").strip()
 
     def _adj_color(rgb: Tuple[float, float, float]) -> Tuple[float, float, float]:
         # Simulation d'opacité sur fond blanc
@@ -229,327 +225,356 @@ def apply_annotations(
         v = v * g_op
         return max(0.0, min(1.0, v))
 
-    doc = fitz.open(str(base_pdf))
-    try:
-        for ann in annotations:
-            if not isinstance(ann, dict):
-                continue
-            kind = str(ann.get("kind") or "").strip()
+    style = ann.get("style") or {}
 
-            page_i = int(ann.get("page", 0))
-            if page_i < 0 or page_i >= doc.page_count:
-                continue
-            page = doc.load_page(page_i)
+    # ---------------- Pastille (Correction V0) ----------------
+    if kind == "score_circle":
+        x = float(ann.get("x_pt", 0))
+        y = float(ann.get("y_pt", 0))
 
-            style = ann.get("style") or {}
+        radius = float(style.get("radius_pt", 9.0))
 
-            # ---------------- Pastille (Correction V0) ----------------
-            if kind == "score_circle":
-                x = float(ann.get("x_pt", 0))
-                y = float(ann.get("y_pt", 0))
+        result = str(ann.get("result", "good"))
+        fill_hex = str(style.get("fill", RESULT_COLORS.get(result, RESULT_COLORS["good"])))
 
-                radius = float(style.get("radius_pt", 9.0))
+        label_text = str(ann.get("exercise_label") or ann.get("exercise_code") or "").strip()
+        label_size = float(style.get("label_fontsize", 11.0))
+        label_dx = float(style.get("label_dx_pt", radius + 6.0))
 
-                result = str(ann.get("result", "good"))
-                fill_hex = str(style.get("fill", RESULT_COLORS.get(result, RESULT_COLORS["good"])))
+        fill = _adj_color(_resolve_color(fill_hex, default_hex=RESULT_COLORS["good"]))
 
-                label_text = str(ann.get("exercise_label") or ann.get("exercise_code") or "").strip()
-                label_size = float(style.get("label_fontsize", 11.0))
-                label_dx = float(style.get("label_dx_pt", radius + 6.0))
+        # Style du libellé (compat: si absent -> bleu normal)
+        label_style = str(style.get("label_style") or "blue").strip().lower()
+        label_bold = bool(style.get("label_bold", False))
+        label_color_any = style.get("label_color")
 
-                fill = _adj_color(_resolve_color(fill_hex, default_hex=RESULT_COLORS["good"]))
+        if label_style in ("red_bold", "rouge_gras", "rouge-gras", "red-bold"):
+            label_bold = True
+            label_color_any = label_color_any or BASIC_COLORS["rouge"]
+        else:
+            label_color_any = label_color_any or LABEL_BLUE
 
-                # Style du libellé (compat: si absent -> bleu normal)
-                label_style = str(style.get("label_style") or "blue").strip().lower()
-                label_bold = bool(style.get("label_bold", False))
-                label_color_any = style.get("label_color")
+        label_color = _adj_color(_resolve_color(label_color_any, default_hex=LABEL_BLUE))
+        label_font = "Helvetica-Bold" if label_bold else "Helvetica"
 
-                if label_style in ("red_bold", "rouge_gras", "rouge-gras", "red-bold"):
-                    label_bold = True
-                    label_color_any = label_color_any or BASIC_COLORS["rouge"]
-                else:
-                    label_color_any = label_color_any or LABEL_BLUE
+        shape = page.new_shape()
+        shape.draw_circle((x, y), radius)
+        # fill_opacity n'est pas garanti sur toutes les versions, d'où le mix avec blanc via _adj_color
+        shape.finish(color=None, fill=fill, fill_opacity=(g_op if g_op < 0.999 else 1.0))
+        shape.commit()
 
-                label_color = _adj_color(_resolve_color(label_color_any, default_hex=LABEL_BLUE))
-                label_font = "Helvetica-Bold" if label_bold else "Helvetica"
+        if label_text:
+            # Texte à droite (bleu)
+            text_point = (x + label_dx, y + (label_size / 3.0))
+            _insert_text_safe(page, text_point, label_text, fontsize=label_size, fontname=label_font, color=label_color, overlay=True)
+        return
 
-                shape = page.new_shape()
-                shape.draw_circle((x, y), radius)
-                # fill_opacity n'est pas garanti sur toutes les versions, d'où le mix avec blanc via _adj_color
-                shape.finish(color=None, fill=fill, fill_opacity=(g_op if g_op < 0.999 else 1.0))
-                shape.commit()
 
-                if label_text:
-                    # Texte à droite (bleu)
-                    text_point = (x + label_dx, y + (label_size / 3.0))
-                    _insert_text_safe(page, text_point, label_text, fontsize=label_size, fontname=label_font, color=label_color, overlay=True)
-                continue
+    # ---------------- Points manuels (par exercice) ----------------
+    if kind == "manual_score":
+        x = float(ann.get("x_pt", 0))
+        y = float(ann.get("y_pt", 0))
 
+        radius = float(style.get("radius_pt", 12.0))
+        pts_val = ann.get("points", "")
+        try:
+            pts_f = float(pts_val)
+            # affichage compact
+            if abs(pts_f - round(pts_f)) < 1e-9:
+                pts_txt = str(int(round(pts_f)))
+            else:
+                pts_txt = f"{pts_f:g}"
+        except Exception:
+            pts_txt = str(pts_val)
 
-            # ---------------- Points manuels (par exercice) ----------------
-            if kind == "manual_score":
-                x = float(ann.get("x_pt", 0))
-                y = float(ann.get("y_pt", 0))
+        border = _adj_color(_resolve_color(style.get("border_color", BASIC_COLORS["rouge"]), default_hex=BASIC_COLORS["rouge"]))
+        fill = _adj_color(_resolve_color(style.get("fill", "#FFFFFF"), default_hex="#FFFFFF"))
+        width = float(style.get("border_width_pt", 1.6))
+        font_size = float(style.get("font_size", 11.0))
 
-                radius = float(style.get("radius_pt", 12.0))
-                pts_val = ann.get("points", "")
-                try:
-                    pts_f = float(pts_val)
-                    # affichage compact
-                    if abs(pts_f - round(pts_f)) < 1e-9:
-                        pts_txt = str(int(round(pts_f)))
-                    else:
-                        pts_txt = f"{pts_f:g}"
-                except Exception:
-                    pts_txt = str(pts_val)
+        shape = page.new_shape()
+        shape.draw_circle((x, y), radius)
+        shape.finish(color=border, fill=fill, width=width, fill_opacity=(g_op if g_op < 0.999 else 1.0))
+        shape.commit()
 
-                border = _adj_color(_resolve_color(style.get("border_color", BASIC_COLORS["rouge"]), default_hex=BASIC_COLORS["rouge"]))
-                fill = _adj_color(_resolve_color(style.get("fill", "#FFFFFF"), default_hex="#FFFFFF"))
-                width = float(style.get("border_width_pt", 1.6))
-                font_size = float(style.get("font_size", 11.0))
+        # Texte centré approximativement
+        try:
+            w_txt = fitz.get_text_length(pts_txt, fontname="Helvetica-Bold", fontsize=font_size)
+        except Exception:
+            w_txt = max(6.0, font_size * 0.6 * len(pts_txt))
+        tx = x - (w_txt / 2.0)
+        ty = y + (font_size / 3.0)
+        _insert_text_safe(page, (tx, ty), pts_txt, fontsize=font_size, fontname="Helvetica-Bold", color=border, overlay=True)
+        return
 
-                shape = page.new_shape()
-                shape.draw_circle((x, y), radius)
-                shape.finish(color=border, fill=fill, width=width, fill_opacity=(g_op if g_op < 0.999 else 1.0))
-                shape.commit()
+    # ---------------- Image (PNG) ----------------
+    if kind == "image":
+        rect = ann.get("rect")
+        if not (isinstance(rect, list) and len(rect) == 4):
+            return
+        r = _norm_rect(rect)
+        if r.is_empty or r.get_area() <= 1:
+            return
+
+        style = ann.get("style") or {}
+        keep_prop = bool(style.get("keep_proportion", True))
+        opacity = _adj_opacity(style.get("opacity"))
+
+        # Résolution du chemin image : priorise image_rel (portabilité du projet)
+        img_ref = str(ann.get("image_rel") or ann.get("image_path") or "").strip()
+        if not img_ref:
+            return
+
+        img_path = Path(img_ref)
+        if not img_path.is_absolute():
+            if project_root:
+                img_path = Path(project_root) / img_ref
+            else:
+                # fallback : relatif au PDF de base
+                img_path = (Path(base_pdf).parent if base_pdf else Path.cwd()) / img_ref
+
+        _insert_pdf_image(page, r, img_path, keep_proportion=keep_prop, overlay=True, opacity=opacity)
+        return
 
-                # Texte centré approximativement
+    # ---------------- Main levée ----------------
+    if kind == "ink":
+        pts = ann.get("points") or []
+        if not isinstance(pts, list) or len(pts) < 2:
+            return
+        points = []
+        for p in pts:
+            if isinstance(p, (list, tuple)) and len(p) == 2:
                 try:
-                    w_txt = fitz.get_text_length(pts_txt, fontname="Helvetica-Bold", fontsize=font_size)
+                    points.append((float(p[0]), float(p[1])))
                 except Exception:
-                    w_txt = max(6.0, font_size * 0.6 * len(pts_txt))
-                tx = x - (w_txt / 2.0)
-                ty = y + (font_size / 3.0)
-                _insert_text_safe(page, (tx, ty), pts_txt, fontsize=font_size, fontname="Helvetica-Bold", color=border, overlay=True)
-                continue
-
-            # ---------------- Image (PNG) ----------------
-            if kind == "image":
-                rect = ann.get("rect")
-                if not (isinstance(rect, list) and len(rect) == 4):
-                    continue
-                r = _norm_rect(rect)
-                if r.is_empty or r.get_area() <= 1:
-                    continue
-
-                style = ann.get("style") or {}
-                keep_prop = bool(style.get("keep_proportion", True))
-                opacity = _adj_opacity(style.get("opacity"))
-
-                # Résolution du chemin image : priorise image_rel (portabilité du projet)
-                img_ref = str(ann.get("image_rel") or ann.get("image_path") or "").strip()
-                if not img_ref:
-                    continue
-
-                img_path = Path(img_ref)
-                if not img_path.is_absolute():
-                    if project_root:
-                        img_path = Path(project_root) / img_ref
-                    else:
-                        # fallback : relatif au PDF de base
-                        img_path = base_pdf.parent / img_ref
+                    pass
+        if len(points) < 2:
+            return
+        color = _adj_color(_resolve_color(style.get("color"), default_hex=BASIC_COLORS["bleu"]))
+        width = float(style.get("width_pt", 2.0))
+        page.draw_polyline(points, color=color, width=width, overlay=True)
+        return
 
-                _insert_pdf_image(page, r, img_path, keep_proportion=keep_prop, overlay=True, opacity=opacity)
+    # ---------------- Zone de texte ----------------
+    if kind == "textbox":
+        rect = ann.get("rect")
+        if not isinstance(rect, list):
+            return
+        r = _norm_rect(rect)
+        if r.is_empty or r.get_area() <= 1:
+            return
+
+        text = str(ann.get("text") or "").rstrip("\n")
+        if not text:
+            return
+
+        payload = ann.get("payload") or {}
+        is_final = isinstance(payload, dict) and payload.get("tag") == "final_note"
+
+        fontsize = float(style.get("fontsize", 14.0))
+        fontname, fontfile = _resolve_font_request(style)
+
+        # Couleurs / cadre (optionnels)
+        border_color_name = style.get("border_color")
+        border_width = float(style.get("border_width_pt", 1.2))
+        padding = float(style.get("padding_pt", 4.0))
+        bold_total = bool(style.get("bold_total", False)) or is_final
+
+        if is_final:
+            # Toujours rouge + encadré (portable en packaging : Helvetica / Helvetica-Bold sont intégrées)
+            color = _adj_color(_resolve_color("rouge", default_hex=BASIC_COLORS["rouge"]))
+            border_color = _adj_color(_resolve_color("rouge", default_hex=BASIC_COLORS["rouge"]))
+        else:
+            color = _adj_color(_resolve_color(style.get("color"), default_hex=BASIC_COLORS["bleu"]))
+            border_color = _adj_color(_resolve_color(border_color_name, default_hex=BASIC_COLORS["bleu"])) if border_color_name else None
+
+        # Fond (optionnel) : utile pour la note finale sans marge (overlay sur la copie)
+        bg_any = style.get("bg_color")
+        if bg_any is None:
+            bg_any = style.get("fill_color")
+        if bg_any is None:
+            bg_any = style.get("background")
+
+        bg_opacity = style.get("bg_opacity")
+        if bg_opacity is None:
+            bg_opacity = style.get("fill_opacity")
+        if bg_opacity is None:
+            bg_opacity = style.get("background_opacity")
+
+        if bg_any is not None:
+            try:
+                fill = _adj_color(_resolve_color(bg_any, default_hex="#FFFFFF"))
+                op_raw = float(bg_opacity) if bg_opacity is not None else None
+                op = _adj_opacity(op_raw)
+                if op is None:
+                    op = 1.0
+                # Fond semi-transparent : méthode la plus robuste = image RGBA
+                # (certaines versions de PyMuPDF ignorent `fill_opacity`).
+                if op < 0.999:
+                    try:
+                        img_path = _get_solid_rgba_png(fill, op)
+                        _insert_pdf_image(page, r, img_path, keep_proportion=False, overlay=True, opacity=None)
+                    except Exception:
+                        # fallback : fond opaque si l'insertion image échoue
+                        shape = page.new_shape()
+                        shape.draw_rect(r)
+                        shape.finish(color=None, fill=fill)
+                        shape.commit()
+                else:
+                    shape = page.new_shape()
+                    shape.draw_rect(r)
+                    shape.finish(color=None, fill=fill)
+                    shape.commit()
+            except Exception:
+                pass
+
+        # Encadré (si demandé ou si note finale)
+        if border_color is not None:
+            try:
+                page.draw_rect(r, color=border_color, width=border_width, overlay=True)
+            except Exception:
+                pass
+
+        # Robustesse multi-lignes : on dessine ligne par ligne.
+        # Pourquoi ?
+        # - certains environnements PyMuPDF/packaging peuvent mal gérer les sauts de ligne
+        #   avec insert_textbox (symptôme : seule la 1ère ligne apparaît)
+        # - cela donne un résultat prévisible et permet d'ajuster facilement la hauteur.
+        x = float(r.x0 + padding)
+        y = float(r.y0 + padding + fontsize)  # baseline
+        line_h = float(fontsize * 1.25)
+        max_w = float(r.width - 2 * padding)
+
+        def _text_len(s: str) -> float:
+            try:
+                # PyMuPDF: mesure en points
+                return float(fitz.get_text_length(s, fontname=fontname, fontsize=fontsize))
+            except Exception:
+                # fallback heuristique
+                return float(len(s) * fontsize * 0.55)
+
+        def _wrap_line(raw: str) -> list[str]:
+            raw = raw.rstrip("\n")
+            if not raw:
+                return [""]
+            # si déjà OK, pas de wrap
+            if _text_len(raw) <= max_w:
+                return [raw]
+            words = raw.split(" ")
+            out: list[str] = []
+            cur = ""
+            for w in words:
+                cand = (cur + " " + w).strip() if cur else w
+                if _text_len(cand) <= max_w or not cur:
+                    cur = cand
+                else:
+                    out.append(cur)
+                    cur = w
+            if cur:
+                out.append(cur)
+            return out or [raw]
+
+        # Si on doit mettre une ligne en gras (ex: Total), on ne wrap pas (garde le style simple)
+        # et on applique la règle "Total".
+        lines_src = text.splitlines() if text is not None else []
+        for src_line in lines_src:
+            if y > float(r.y1 - padding):
+                break
+            if src_line == "":
+                y += line_h
                 continue
 
-            # ---------------- Main levée ----------------
-            if kind == "ink":
-                pts = ann.get("points") or []
-                if not isinstance(pts, list) or len(pts) < 2:
-                    continue
-                points = []
-                for p in pts:
-                    if isinstance(p, (list, tuple)) and len(p) == 2:
-                        try:
-                            points.append((float(p[0]), float(p[1])))
-                        except Exception:
-                            pass
-                if len(points) < 2:
-                    continue
-                color = _adj_color(_resolve_color(style.get("color"), default_hex=BASIC_COLORS["bleu"]))
-                width = float(style.get("width_pt", 2.0))
-                page.draw_polyline(points, color=color, width=width, overlay=True)
+            if bold_total:
+                use_font = "Helvetica-Bold" if src_line.strip().lower().startswith("total") else fontname
+                _insert_text_safe(page, (x, y), src_line, fontsize=fontsize, fontname=use_font, color=color, overlay=True, fontfile=fontfile)
+                y += line_h
                 continue
 
-            # ---------------- Zone de texte ----------------
-            if kind == "textbox":
-                rect = ann.get("rect")
-                if not isinstance(rect, list):
-                    continue
-                r = _norm_rect(rect)
-                if r.is_empty or r.get_area() <= 1:
-                    continue
+            # mode normal : wrap doux par mots
+            for wrapped in _wrap_line(src_line):
+                if y > float(r.y1 - padding):
+                    break
+                _insert_text_safe(page, (x, y), wrapped, fontsize=fontsize, fontname=fontname, color=color, overlay=True, fontfile=fontfile)
+                y += line_h
+        return
 
-                text = str(ann.get("text") or "").rstrip("\n")
-                if not text:
-                    continue
+    # ---------------- Flèche ----------------
+    if kind == "arrow":
+        s = ann.get("start")
+        e = ann.get("end")
+        if not (isinstance(s, list) and isinstance(e, list) and len(s) == 2 and len(e) == 2):
+            return
+        try:
+            x0, y0 = float(s[0]), float(s[1])
+            x1, y1 = float(e[0]), float(e[1])
+        except Exception:
+            return
 
-                payload = ann.get("payload") or {}
-                is_final = isinstance(payload, dict) and payload.get("tag") == "final_note"
+        color = _adj_color(_resolve_color(style.get("color"), default_hex=BASIC_COLORS["bleu"]))
+        width = float(style.get("width_pt", 2.0))
 
-                fontsize = float(style.get("fontsize", 14.0))
-                fontname, fontfile = _resolve_font_request(style)
+        page.draw_line((x0, y0), (x1, y1), color=color, width=width, overlay=True)
 
-                # Couleurs / cadre (optionnels)
-                border_color_name = style.get("border_color")
-                border_width = float(style.get("border_width_pt", 1.2))
-                padding = float(style.get("padding_pt", 4.0))
-                bold_total = bool(style.get("bold_total", False)) or is_final
+        # tête de flèche (2 traits)
+        dx = x1 - x0
+        dy = y1 - y0
+        L = math.hypot(dx, dy)
+        if L < 0.5:
+            return
+        ang = math.atan2(dy, dx)
 
-                if is_final:
-                    # Toujours rouge + encadré (portable en packaging : Helvetica / Helvetica-Bold sont intégrées)
-                    color = _adj_color(_resolve_color("rouge", default_hex=BASIC_COLORS["rouge"]))
-                    border_color = _adj_color(_resolve_color("rouge", default_hex=BASIC_COLORS["rouge"]))
-                else:
-                    color = _adj_color(_resolve_color(style.get("color"), default_hex=BASIC_COLORS["bleu"]))
-                    border_color = _adj_color(_resolve_color(border_color_name, default_hex=BASIC_COLORS["bleu"])) if border_color_name else None
-
-                # Fond (optionnel) : utile pour la note finale sans marge (overlay sur la copie)
-                bg_any = style.get("bg_color")
-                if bg_any is None:
-                    bg_any = style.get("fill_color")
-                if bg_any is None:
-                    bg_any = style.get("background")
-
-                bg_opacity = style.get("bg_opacity")
-                if bg_opacity is None:
-                    bg_opacity = style.get("fill_opacity")
-                if bg_opacity is None:
-                    bg_opacity = style.get("background_opacity")
-
-                if bg_any is not None:
-                    try:
-                        fill = _adj_color(_resolve_color(bg_any, default_hex="#FFFFFF"))
-                        op_raw = float(bg_opacity) if bg_opacity is not None else None
-                        op = _adj_opacity(op_raw)
-                        if op is None:
-                            op = 1.0
-                        # Fond semi-transparent : méthode la plus robuste = image RGBA
-                        # (certaines versions de PyMuPDF ignorent `fill_opacity`).
-                        if op < 0.999:
-                            try:
-                                img_path = _get_solid_rgba_png(fill, op)
-                                _insert_pdf_image(page, r, img_path, keep_proportion=False, overlay=True, opacity=None)
-                            except Exception:
-                                # fallback : fond opaque si l'insertion image échoue
-                                shape = page.new_shape()
-                                shape.draw_rect(r)
-                                shape.finish(color=None, fill=fill)
-                                shape.commit()
-                        else:
-                            shape = page.new_shape()
-                            shape.draw_rect(r)
-                            shape.finish(color=None, fill=fill)
-                            shape.commit()
-                    except Exception:
-                        pass
+        head_len = float(style.get("head_len_pt", max(10.0, width * 4.0)))
+        head_ang = math.radians(float(style.get("head_angle_deg", 28.0)))
 
-                # Encadré (si demandé ou si note finale)
-                if border_color is not None:
-                    try:
-                        page.draw_rect(r, color=border_color, width=border_width, overlay=True)
-                    except Exception:
-                        pass
-
-                # Robustesse multi-lignes : on dessine ligne par ligne.
-                # Pourquoi ?
-                # - certains environnements PyMuPDF/packaging peuvent mal gérer les sauts de ligne
-                #   avec insert_textbox (symptôme : seule la 1ère ligne apparaît)
-                # - cela donne un résultat prévisible et permet d'ajuster facilement la hauteur.
-                x = float(r.x0 + padding)
-                y = float(r.y0 + padding + fontsize)  # baseline
-                line_h = float(fontsize * 1.25)
-                max_w = float(r.width - 2 * padding)
-
-                def _text_len(s: str) -> float:
-                    try:
-                        # PyMuPDF: mesure en points
-                        return float(fitz.get_text_length(s, fontname=fontname, fontsize=fontsize))
-                    except Exception:
-                        # fallback heuristique
-                        return float(len(s) * fontsize * 0.55)
-
-                def _wrap_line(raw: str) -> list[str]:
-                    raw = raw.rstrip("\n")
-                    if not raw:
-                        return [""]
-                    # si déjà OK, pas de wrap
-                    if _text_len(raw) <= max_w:
-                        return [raw]
-                    words = raw.split(" ")
-                    out: list[str] = []
-                    cur = ""
-                    for w in words:
-                        cand = (cur + " " + w).strip() if cur else w
-                        if _text_len(cand) <= max_w or not cur:
-                            cur = cand
-                        else:
-                            out.append(cur)
-                            cur = w
-                    if cur:
-                        out.append(cur)
-                    return out or [raw]
-
-                # Si on doit mettre une ligne en gras (ex: Total), on ne wrap pas (garde le style simple)
-                # et on applique la règle "Total".
-                lines_src = text.splitlines() if text is not None else []
-                for src_line in lines_src:
-                    if y > float(r.y1 - padding):
-                        break
-                    if src_line == "":
-                        y += line_h
-                        continue
-
-                    if bold_total:
-                        use_font = "Helvetica-Bold" if src_line.strip().lower().startswith("total") else fontname
-                        _insert_text_safe(page, (x, y), src_line, fontsize=fontsize, fontname=use_font, color=color, overlay=True, fontfile=fontfile)
-                        y += line_h
-                        continue
-
-                    # mode normal : wrap doux par mots
-                    for wrapped in _wrap_line(src_line):
-                        if y > float(r.y1 - padding):
-                            break
-                        _insert_text_safe(page, (x, y), wrapped, fontsize=fontsize, fontname=fontname, color=color, overlay=True, fontfile=fontfile)
-                        y += line_h
-# ---------------- Flèche ----------------
-            if kind == "arrow":
-                s = ann.get("start")
-                e = ann.get("end")
-                if not (isinstance(s, list) and isinstance(e, list) and len(s) == 2 and len(e) == 2):
-                    continue
-                try:
-                    x0, y0 = float(s[0]), float(s[1])
-                    x1, y1 = float(e[0]), float(e[1])
-                except Exception:
-                    continue
+        hx1 = x1 - head_len * math.cos(ang - head_ang)
+        hy1 = y1 - head_len * math.sin(ang - head_ang)
+        hx2 = x1 - head_len * math.cos(ang + head_ang)
+        hy2 = y1 - head_len * math.sin(ang + head_ang)
 
-                color = _adj_color(_resolve_color(style.get("color"), default_hex=BASIC_COLORS["bleu"]))
-                width = float(style.get("width_pt", 2.0))
+        page.draw_line((x1, y1), (hx1, hy1), color=color, width=width, overlay=True)
+        page.draw_line((x1, y1), (hx2, hy2), color=color, width=width, overlay=True)
+        return
 
-                page.draw_line((x0, y0), (x1, y1), color=color, width=width, overlay=True)
+    # autres kind : ignorés
 
-                # tête de flèche (2 traits)
-                dx = x1 - x0
-                dy = y1 - y0
-                L = math.hypot(dx, dy)
-                if L < 0.5:
-                    continue
-                ang = math.atan2(dy, dx)
 
-                head_len = float(style.get("head_len_pt", max(10.0, width * 4.0)))
-                head_ang = math.radians(float(style.get("head_angle_deg", 28.0)))
+def apply_annotations(
+    base_pdf: Path,
+    out_pdf: Path,
+    annotations: List[Dict[str, Any]],
+    project_root: Optional[Path] = None,
+    opacity_factor: float = 1.0,
+) -> None:
+    """
+    Applique les annotations:
+    - score_circle: pastille (rond) + libellé bleu
+    - ink: trait main levée (polyline)
+    - textbox: zone de texte (sans cadre / fond transparent)
+    - arrow: flèche (ligne + tête)
+    - image: insertion d'un PNG (rect)
+    """
+    base_pdf = Path(base_pdf)
+    out_pdf = Path(out_pdf)
+    out_pdf.parent.mkdir(parents=True, exist_ok=True)
 
-                hx1 = x1 - head_len * math.cos(ang - head_ang)
-                hy1 = y1 - head_len * math.sin(ang - head_ang)
-                hx2 = x1 - head_len * math.cos(ang + head_ang)
-                hy2 = y1 - head_len * math.sin(ang + head_ang)
+    # Facteur global (0..1). Sert principalement à l'aperçu des overlays (GuideCorrection).
+    try:
+        g_op = float(opacity_factor)
+    except Exception:
+        g_op = 1.0
+    g_op = max(0.0, min(1.0, g_op))
 
-                page.draw_line((x1, y1), (hx1, hy1), color=color, width=width, overlay=True)
-                page.draw_line((x1, y1), (hx2, hy2), color=color, width=width, overlay=True)
+    # document propre à cet appel : pas de verrou global (voir MUPDF_LOCK)
+    doc = fitz.open(str(base_pdf))
+    try:
+        for ann in annotations:
+            if not isinstance(ann, dict):
                 continue
-
-            # autres kind : ignorés
+            page_i = int(ann.get("page", 0))
+            if page_i < 0 or page_i >= doc.page_count:
+                continue
+            page = doc.load_page(page_i)
+            _draw_annotation(page, ann, g_op=g_op, project_root=project_root, base_pdf=base_pdf)
 
         if out_pdf.exists():
             out_pdf.unlink()
@@ -558,3 +583,65 @@ def apply_annotations(
         doc.save(str(out_pdf), garbage=1, deflate=True)
     finally:
         doc.close()
+
+
+def apply_annotations_to_pages(
+    base_pdf: Path,
+    prev_pdf: Path,
+    out_pdf: Path,
+    annotations: List[Dict[str, Any]],
+    pages: Iterable[int],
+    project_root: Optional[Path] = None,
+    opacity_factor: float = 1.0,
+) -> None:
+    """Régénération incrémentale : ne redessine que les pages indiquées.
+
+    Part du PDF corrigé précédent (`prev_pdf`) : chaque page de `pages` y est
+    remplacée par la page vierge correspondante de `base_pdf`, puis seules les
+    annotations de ces pages sont redessinées. Les autres pages sont conservées
+    telles quelles.
+
+    Lève ValueError si `prev_pdf` n'est pas compatible (nombre de pages différent) :
+    l'appelant doit alors repasser par `apply_annotations`.
+    """
+    base_pdf = Path(base_pdf)
+    prev_pdf = Path(prev_pdf)
+    out_pdf = Path(out_pdf)
+    out_pdf.parent.mkdir(parents=True, exist_ok=True)
+
+    try:
+        g_op = float(opacity_factor)
+    except Exception:
+        g_op = 1.0
+    g_op = max(0.0, min(1.0, g_op))
+
+    # documents propres à cet appel : pas de verrou global (voir MUPDF_LOCK)
+    src = fitz.open(str(base_pdf))
+    try:
+        doc = fitz.open(str(prev_pdf))
+        try:
+            if doc.page_count != src.page_count:
+                raise ValueError("PDF corrigé précédent incompatible avec le PDF de base")
+
+            dirty = sorted({int(p) for p in pages if 0 <= int(p) < src.page_count})
+            for page_i in dirty:
+                doc.delete_page(page_i)
+                doc.insert_pdf(src, from_page=page_i, to_page=page_i, start_at=page_i)
+
+            dirty_set = set(dirty)
+            for ann in annotations:
+                if not isinstance(ann, dict):
+                    continue
+                page_i = int(ann.get("page", 0))
+                if page_i not in dirty_set:
+                    continue
+                page = doc.load_page(page_i)
+                _draw_annotation(page, ann, g_op=g_op, project_root=project_root, base_pdf=base_pdf)
+
+            if out_pdf.exists():
+                out_pdf.unlink()
+            doc.save(str(out_pdf), garbage=1, deflate=True)
+        finally:
+            doc.close()
+    finally:
+        src.close()
@@ -8,18 +8,30 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, simpledialog
 from pathlib import Path
 import fitz  # PyMuPDF
-import uuid
 from datetime import datetime
 import math
 import copy
 import sys
-from contextlib import contextmanager
+import itertools
+import secrets
+from bisect import bisect_left
+from contextlib import closing, contextmanager
+from dataclasses import dataclass
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from array import array
+from typing import Iterable, Iterator
+
+try:
+    import orjson  # optionnel : (dé)sérialisation JSON plus rapide (export/import du barème)
+except Exception:
+    orjson = None  # type: ignore
 
 from app.ui.theme import apply_dark_theme, DARK_BG, DARK_BG_2
 from app.core.project import Project
 from app.services.pdf_margin import add_margins, add_left_margin
 from app.services.pdf_lock import export_locked
-from app.services.pdf_annotate import apply_annotations, RESULT_COLORS, BASIC_COLORS
+from app.services.pdf_annotate import apply_annotations, apply_annotations_to_pages, RESULT_COLORS, BASIC_COLORS
 from app.services.pdf_recap_to_csv_table_fixed2 import collect_results as recap_collect_results, write_csv as recap_write_csv
 from app.ui.image_tool import ImageStampTool
 from app.ui.image_library import (
@@ -100,6 +112,65 @@ def _sanitize_tk_filetypes(filetypes):
         clean.append((label, tuple(dedup) if len(dedup) > 1 else dedup[0]))
 
     return clean or None
+
+
+def _ex_sort_key(code: str):
+    """Clé de tri des codes d'exercices : numériques d'abord (ordre entier), puis les autres."""
+    try:
+        return (0, int(code))
+    except Exception:
+        return (1, code)
+
+
+def _ex_top(code: str) -> str:
+    """Code de l'exercice principal d'un code de barème ("2.1.3" -> "2")."""
+    return code.strip().split(".", 1)[0]
+
+
+def _simplify_ink_xy(buf, tol_pt: float = 0.3) -> list[list[float]]:
+    """Simplifie un tracé (tampon plat x0, y0, x1, y1, ...) par Douglas–Peucker.
+
+    Supprime les points quasi alignés (écart < tol_pt) : JSON plus léger et
+    régénération plus rapide, sans différence visible. Retourne [[x, y], ...].
+    """
+    n = len(buf) // 2
+    if n <= 2:
+        return [[buf[2 * i], buf[2 * i + 1]] for i in range(n)]
+
+    tol2 = float(tol_pt) * float(tol_pt)
+    keep = bytearray(n)
+    keep[0] = 1
+    keep[n - 1] = 1
+    # Pile explicite (pas de récursion : tracés longs)
+    stack = [(0, n - 1)]
+    while stack:
+        i0, i1 = stack.pop()
+        ax, ay = buf[2 * i0], buf[2 * i0 + 1]
+        bx, by = buf[2 * i1], buf[2 * i1 + 1]
+        vx, vy = bx - ax, by - ay
+        vv = vx * vx + vy * vy
+        best_d2 = -1.0
+        best_i = -1
+        for i in range(i0 + 1, i1):
+            px = buf[2 * i] - ax
+            py = buf[2 * i + 1] - ay
+            if vv <= 1e-12:
+                d2 = px * px + py * py
+            else:
+                # distance perpendiculaire au segment [a, b], au carré
+                cross = px * vy - py * vx
+                d2 = (cross * cross) / vv
+            if d2 > best_d2:
+                best_d2 = d2
+                best_i = i
+        if best_i >= 0 and best_d2 > tol2:
+            keep[best_i] = 1
+            stack.append((i0, best_i))
+            stack.append((best_i, i1))
+
+    return [[buf[2 * i], buf[2 * i + 1]] for i in range(n) if keep[i]]
+
+
 from app.ui.widgets.pdf_viewer import PDFViewer
 from app.ui.widgets.multiline_text_dialog import MultiLineTextDialog
 
@@ -107,12 +178,67 @@ from app.core.grading import (
     ensure_scheme_dict, scheme_from_dict, scheme_to_dict,
     regenerate_exercises, add_exercise, add_sublevel, add_subsublevel,
     delete_node, delete_exercise, set_label, set_rubric, find_node,
-    leaf_nodes, points_for
+    leaf_nodes, points_for, node_totals, Rubric
 )
 
 
 APP_VERSION = "0.7.29"
 
+# Déplacement (outil sélection) : en dessous de ce seuil (en points PDF), le relâchement
+# est traité comme un simple clic (ni sauvegarde ni régénération).
+MOVE_MIN_PT = 0.5
+
+# Conversion centimètres -> points PDF (1 pouce = 2,54 cm = 72 pt)
+CM_TO_PT = 72.0 / 2.54
+# Dimensions par défaut d'une page (A4 portrait, en points) si le PDF ne peut être lu
+A4_PORTRAIT = (595.0, 842.0)
+
+
+class _DragState:
+    """État d'une interaction souris en cours sur le PDF (dessin ou déplacement).
+
+    Regroupé sur un seul objet à __slots__ (accès rapides dans les handlers de drag) ;
+    réinitialisé en bloc par AppWindow._reset_draw_state().
+    """
+
+    __slots__ = (
+        "kind", "page", "points", "start", "end",
+        "move_active", "ann_id", "anchor_x", "anchor_y",
+        "move_kind", "origin", "delta", "has_moved",
+    )
+
+    def __init__(self) -> None:
+        self.kind: str | None = None            # outil en cours ("ink", "arrow", ...) ou "move"
+        self.page: int | None = None
+        # Tracé "ink" en cours : tampon plat x0, y0, x1, y1, ... (pas d'un tuple par échantillon)
+        self.points: array = array("d")
+        self.start: tuple[float, float] | None = None
+        self.end: tuple[float, float] | None = None
+        # Déplacement d'annotation (outil sélection)
+        self.move_active: bool = False
+        self.ann_id: str | None = None
+        self.anchor_x: float = 0.0
+        self.anchor_y: float = 0.0
+        # Origine compacte de l'annotation déplacée (coordonnées seules, pas de deepcopy au clic)
+        self.move_kind: str | None = None
+        self.origin: tuple | None = None
+        # Dernier delta (dx, dy) du déplacement (appliqué aux tracés "ink" au relâchement)
+        self.delta: tuple[float, float] | None = None
+        self.has_moved: bool = False
+
+
+@dataclass(slots=True)
+class _SchemeTotals:
+    """Totaux du barème, calculés une fois par dict settings["grading_scheme"] (cf. AppWindow._scheme_totals)."""
+
+    scheme_dict: dict                 # dict barème source (identité = clé du cache)
+    by_node: dict[str, float]         # total max par code de nœud
+    total: float                      # total général
+    max_by_ex: dict[str, float]       # total max par exercice principal
+    sorted_codes: tuple[str, ...]     # codes des exercices principaux triés (_ex_sort_key)
+    ex_pos: dict[str, int]            # code -> position dans sorted_codes
+    max_s: tuple[str, ...]            # maxima formatés, dans l'ordre de sorted_codes
+
 
 class AppWindow:
     def __init__(self, root: tk.Tk):
@@ -136,6 +262,9 @@ class AppWindow:
         # Déplacement pastille (Correction V0)
         self._drag_active: bool = False
         self._drag_target_idx: int | None = None
+        # <B1-Motion> regroupés : seule la dernière position est appliquée, au plus une fois par frame
+        self._drag_pending: tuple[int, float, float] | None = None
+        self._drag_tick = None
 
         # Style du libellé des pastilles (Correction V0) : "blue" (bleu) ou "red_bold" (rouge gras)
         self.c_label_style_var = tk.StringVar(value="blue")
@@ -144,6 +273,11 @@ class AppWindow:
         # Alignement dans la marge (Correction V0) : distance (cm) depuis le bord gauche
         # (utilisé quand "Aligner dans la marge" est coché)
         self.c_align_margin_cm_var = tk.StringVar(value="0.5")
+        # Caches (option cochée / X marge en points) : relus à chaque événement de drag,
+        # invalidés par trace sur les variables Tk correspondantes.
+        self._cached_align_margin: bool | None = None
+        self._cached_margin_x_pt: float | None = None
+        self.c_align_margin_cm_var.trace_add("write", lambda *_: self._on_corr_margin_cm_written())
 
         # Outils d'annotation classiques (Visualisation PDF)
         self.ann_tool_var = tk.StringVar(value="none")   # none | ink | textbox | arrow | image | manual_score
@@ -193,27 +327,103 @@ class AppWindow:
         self._sync_tool_sel_guard = False  # évite les boucles tool<->sélection
 
 
-        # Etat runtime (drag)
-        self._draw_kind: str | None = None
-        self._draw_page: int | None = None
-        self._draw_points: list[tuple[float, float]] = []
-        self._draw_start: tuple[float, float] | None = None
-        self._draw_end: tuple[float, float] | None = None
+        # Etat runtime (drag) : dessin en cours / déplacement d'annotation (cf. _DragState)
+        self._drag = _DragState()
 
         # Robustesse : empêche une régénération PDF (open_pdf) de tomber au milieu
         # d'une interaction souris (clic-glisser / relâchement). Sinon, on peut
         # perdre l'événement <ButtonRelease> et l'insertion suivante "ne fait rien".
         self._pdf_mouse_down: bool = False
 
-        # Déplacement d'annotations (outil "Déplacer")
-        self._move_active: bool = False
-        self._move_ann_id: str | None = None
-        self._move_anchor: tuple[float, float] | None = None
-        self._move_snapshot: dict | None = None
-        self._move_has_moved: bool = False
+        # Libellés de l'onglet principal / du sous-onglet de visualisation (cf. _refresh_cur_tabs)
+        self._cur_main_tab: str = ""
+        self._cur_subtab: str = ""
+        # Ligne guide "marge" actuellement dessinée sur le canvas (évite des delete Tk inutiles)
+        self._margin_guide_drawn: bool = False
+        # Totaux du barème mémoïsés pour le dict settings["grading_scheme"] courant
+        # (cf. _scheme_totals) ; remis à None par _save_scheme.
+        self._scheme_totals_cache: _SchemeTotals | None = None
+        # Version du barème (cf. _scheme_ver) : clé des caches dérivés (feuilles, libellés…)
+        self._scheme_version: int = 0
+        self._scheme_ver_ref: dict | None = None
+        # (version, valeurs du combo, codes, libellés) en listes parallèles : cf. _leaf_entries
+        self._leaf_cache: tuple[int, list[str], list[str], list[str]] | None = None
+        # Version affichée par le combo + codes/libellés alignés sur ses valeurs (index = current())
+        self._leaf_combo_ver: int = -1
+        self._leaf_codes: list[str] = []
+        self._leaf_labels: list[str] = []
+        # Points (code feuille, résultat) -> points, par version du barème (cf. _points_for)
+        self._points_cache: dict[tuple[str, str], float] = {}
+        self._points_cache_ver: int = -1
+        # Menu contextuel "barème" (clic-droit PDF) réutilisé tant que le barème ne change pas ;
+        # les coordonnées du dernier clic-droit sont lues par _ctx_add.
+        self._ctx_menu: tk.Menu | None = None
+        self._ctx_menu_ver: int = -1
+        self._ctx_page: int = 0
+        self._ctx_x: float = 0.0
+        self._ctx_y: float = 0.0
+
+        # Index id -> annotation (par document) : évite un parcours complet à chaque événement de drag.
+        # Invalidé via _invalidate_ann_index() à chaque ajout/suppression d'annotation.
+        self._ann_by_id: dict[str, dict[str, dict]] = {}
+        # Signature (id(liste), len(liste)) par document : les ids sont normalisés en str à l'ingestion
+        self._ann_ids_sig: dict[str, tuple[int, int]] = {}
+        # Index page -> annotations (par document) pour le hit-test (sélection/déplacement).
+        self._ann_by_page: dict[str, dict[int, list[dict]]] = {}
+        # Index kind -> positions dans la liste (par document), avec la signature (liste, len) de la liste indexée.
+        self._ann_by_kind: dict[str, tuple[list, int, dict[str, list[int]]]] = {}
+        # Boîtes englobantes des tracés "ink", indexées par identité de la liste de points
+        # (un déplacement réassigne une nouvelle liste : pas d'invalidation explicite nécessaire).
+        self._ink_bbox_cache: dict[int, tuple[list, tuple[float, float, float, float]]] = {}
+        # Liste d'annotations validée du document courant : ((projet, doc_id, dict annotations, len), liste).
+        # Raccourci de _annotations_for_current_doc, remis à None par _invalidate_ann_index().
+        self._cur_anns: tuple[tuple, list[dict]] | None = None
+        # Pastilles (score_circle) de cette liste en "colonnes" (indices, x, y, page) pour
+        # _find_nearest_marker ; remis à None dès qu'une pastille bouge (_invalidate_score_soa).
+        self._cur_score_soa: tuple[list[dict], int, tuple] | None = None
+        # Points agrégés par exercice (pastilles / manuels) du document courant (cf. _aggregate_scores)
+        self._scores_agg: tuple[list[dict], int, tuple[dict[str, float], dict[str, float]]] | None = None
+        # Lignes par exercice déjà formatées (récapitulatif / panneau Infos), cf. _ex_score_rows
+        self._ex_rows_cache: tuple[tuple, tuple, tuple] | None = None
+        # Lignes affichées dans info_tree : code exercice -> (texte, valeurs), dans l'ordre d'affichage
+        self._info_tree_rows: dict[str, tuple[str, tuple[str, str]]] = {}
+        # Texte du récapitulatif, associé au résultat de _ex_score_rows dont il est issu
+        self._final_note_cache: tuple[tuple, str] | None = None
 
         # Régénération PDF (debounce) : évite de régénérer trop souvent et améliore la robustesse
         self._regen_after_id = None
+        # Pages à régénérer (régénération incrémentale) ; _dirty_full = document complet.
+        self._dirty_pages: set[int] = set()
+        self._dirty_full: bool = False
+        self._dirty_doc_id: str | None = None
+        # Variante "margin" ayant servi à produire le PDF corrigé courant (par document) :
+        # la régénération page par page n'est possible que si elle n'a pas changé.
+        self._regen_base_by_doc: dict[str, str] = {}
+        # Dimensions des pages d'un PDF de base : chemin -> ((mtime_ns, taille), nb pages, page -> (w, h)).
+        # La signature stat invalide l'entrée dès que la variante est réécrite.
+        self._page_size_cache: dict[str, tuple[tuple[int, int], int, dict[int, tuple[float, float]]]] = {}
+        # Régénération hors du thread Tk (une seule à la fois ; les demandes suivantes sont regroupées).
+        # _regen_seq : incrémenté à chaque PDF corrigé produit, pour écarter un résultat devenu obsolète.
+        self._regen_executor = ThreadPoolExecutor(max_workers=1)
+        self._regen_future = None
+        self._regen_job: dict | None = None
+        self._regen_seq: int = 0
+
+        # Sauvegarde projet différée (debounce) : regroupe les écritures de project.json
+        self._save_dirty: bool = False
+        self._save_after_id = None
+
+        # Ids d'annotations créées dans cette session : nonce aléatoire + compteur (cf. _new_ann_id)
+        self._ann_session: str = secrets.token_hex(8)
+        self._ann_seq = itertools.count(1)
+
+        # Rafraîchissements UI regroupés (after_idle) : cf. _request_refresh
+        self._pending_refresh: set[str] = set()
+        self._refresh_after_id = None
+        # Liste "Marques du document" : liste d'annotations affichée et sa longueur
+        # (permet les mises à jour ligne par ligne, cf. _marks_apply)
+        self._marks_src: list[dict] | None = None
+        self._marks_len: int = 0
 
         # Outil "Image (PNG)" : géré dans un module séparé pour ne pas alourdir app_window.py
         self.image_tool = ImageStampTool(self)
@@ -243,6 +453,7 @@ class AppWindow:
         self._build_tab_synthese_note()
 
         self.nb.bind("<<NotebookTabChanged>>", self._update_click_mode)
+        self._refresh_cur_tabs()
         # Rafraîchit le mode de clic quand l'outil change
         self.ann_tool_var.trace_add("write", lambda *_: self._on_annot_tool_changed())
         self.ann_color_var.trace_add("write", lambda *_: self._update_click_mode())
@@ -253,6 +464,9 @@ class AppWindow:
         self.root.bind_all("<Button-5>", self._on_global_mousewheel_linux, add="+")
         # Raccourci ergonomique : masquer/afficher le panneau de gauche (Correction/Infos) pour agrandir la vue PDF
         self.root.bind("<F8>", lambda _e: self._toggle_view_left_pane(), add="+")
+        # Sauvegarde différée : on écrit tout ce qui est en attente avant de perdre le focus / de quitter
+        self.root.bind("<FocusOut>", self._flush_save, add="+")
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
 
     # ---------------- Annuler (Undo) : pastilles + points manuels ----------------
 
@@ -1205,6 +1419,7 @@ class AppWindow:
 
         with self._suspend_undo():
             anns[:] = non_scores[:insert_pos] + copy.deepcopy(scores) + non_scores[insert_pos:]
+            self._invalidate_ann_index()
             try:
                 assert self.project is not None
                 self.project.save()
@@ -1220,13 +1435,7 @@ class AppWindow:
             except Exception:
                 pass
 
-        for fn_name in ('_refresh_marks_list', '_refresh_files_list', '_refresh_info_panel', '_refresh_correction_totals'):
-            try:
-                fn = getattr(self, fn_name, None)
-                if callable(fn):
-                    fn()
-            except Exception:
-                pass
+        self._request_refresh(("marks", "files", "info", "totals"))
 
         self._update_undo_ui()
 
@@ -1609,6 +1818,7 @@ class AppWindow:
 
         # Affiche/masque la ligne guide d'alignement dans la marge
         try:
+            self.c_align_margin_var.trace_add("write", lambda *_: self._invalidate_margin_cache())
             self.c_align_margin_var.trace_add("write", lambda *_: self._update_margin_guide())
         except Exception:
             pass
@@ -1714,12 +1924,9 @@ class AppWindow:
         assert self.project is not None
 
         style = self._get_pastille_label_style()
-        anns = self._annotations_for_current_doc()
         changed = 0
 
-        for a in anns:
-            if not isinstance(a, dict) or a.get("kind") != "score_circle":
-                continue
+        for a in self._iter_annotations("score_circle"):
             st = a.get("style") or {}
             if not isinstance(st, dict):
                 st = {}
@@ -1734,10 +1941,7 @@ class AppWindow:
 
         self.project.save()
         self.c_regenerate()
-        self._refresh_marks_list()
-        self._refresh_files_list()
-        self._refresh_info_panel()
-        self._refresh_correction_totals()
+        self._request_refresh(("marks", "files", "info", "totals"))
 
         messagebox.showinfo("Correction", f"{changed} pastille(s) mise(s) à jour.")
 
@@ -2407,8 +2611,9 @@ class AppWindow:
                 continue
             b = copy.deepcopy(a)
             # assure unicité des ids
-            b['id'] = str(uuid.uuid4())
+            b['id'] = self._new_ann_id()
             anns.append(b)
+            self._invalidate_ann_index()
             added += 1
 
         try:
@@ -2422,14 +2627,7 @@ class AppWindow:
         except Exception:
             pass
 
-        try:
-            self._refresh_marks_list()
-        except Exception:
-            pass
-        try:
-            self._refresh_info_panel()
-        except Exception:
-            pass
+        self._request_refresh(("marks", "info"))
 
         messagebox.showinfo('GuideCorrection', f"Overlay appliqué au document.\nAnnotations ajoutées : {added}")
 
@@ -2555,7 +2753,20 @@ class AppWindow:
 
 
 
+    def _refresh_cur_tabs(self, _evt=None) -> None:
+        """Met à jour le cache des libellés d'onglets (évite des appels Tk à chaque événement souris)."""
+        try:
+            self._cur_main_tab = str(self.nb.tab(self.nb.select(), "text"))
+        except Exception:
+            self._cur_main_tab = ""
+        try:
+            self._cur_subtab = str(self.view_subtabs.tab(self.view_subtabs.select(), "text"))
+        except Exception:
+            self._cur_subtab = ""
+
     def _update_click_mode(self, _evt=None) -> None:
+        # Appelé sur <<NotebookTabChanged>> (onglet principal et sous-onglets de visualisation)
+        self._refresh_cur_tabs()
         # IMPORTANT: ne pas baser la logique sur le texte des onglets (fragile si renommage).
         # On compare directement les ids Tk des widgets.
         main_sel = ""
@@ -3158,26 +3369,197 @@ class AppWindow:
                 pass
 
     def _reset_draw_state(self) -> None:
-        self._draw_kind = None
-        self._draw_page = None
-        self._draw_points = []
-        self._draw_start = None
-        self._draw_end = None
-
-        self._move_active = False
-        self._move_ann_id = None
-        self._move_anchor = None
-        self._move_snapshot = None
-        self._move_has_moved = False
+        self._drag = _DragState()
+
+    @staticmethod
+    def _move_origin_of(ann: object) -> tuple[str | None, tuple | None]:
+        """Capture les seules coordonnées d'origine utiles au déplacement d'une annotation.
+
+        Retourne (kind, origin) avec origin :
+        - score_circle/manual_score : (x_pt, y_pt, radius_pt)
+        - textbox/image : (x0, y0, x1, y1)
+        - arrow : (sx, sy, ex, ey)
+        - ink : tuple de (x, y)
+        """
+        if not isinstance(ann, dict):
+            return None, None
+        kind = ann.get("kind")
+        try:
+            if kind in ("score_circle", "manual_score"):
+                try:
+                    rad = float((ann.get("style") or {}).get("radius_pt", 0.0) or 0.0)
+                except Exception:
+                    rad = 0.0
+                return kind, (float(ann.get("x_pt", 0.0)), float(ann.get("y_pt", 0.0)), rad)
+            if kind in ("textbox", "image"):
+                rect = ann.get("rect")
+                if isinstance(rect, (list, tuple)) and len(rect) == 4:
+                    return kind, tuple(float(v) for v in rect)
+                return kind, None
+            if kind == "arrow":
+                s = ann.get("start")
+                e = ann.get("end")
+                if isinstance(s, (list, tuple)) and len(s) == 2 and isinstance(e, (list, tuple)) and len(e) == 2:
+                    return kind, (float(s[0]), float(s[1]), float(e[0]), float(e[1]))
+                return kind, None
+            if kind == "ink":
+                pts = ann.get("points")
+                if isinstance(pts, list):
+                    return kind, tuple(
+                        (float(p[0]), float(p[1])) for p in pts if isinstance(p, (list, tuple)) and len(p) == 2
+                    )
+                return kind, None
+        except Exception:
+            return kind, None
+        return kind, ()
+
+    @staticmethod
+    def _translate_rect(orig: tuple, dx: float, dy: float) -> list[float]:
+        """Translate un quadruplet (x0, y0, x1, y1) — rect ou segment de flèche."""
+        x0, y0, x1, y1 = orig
+        return [x0 + dx, y0 + dy, x1 + dx, y1 + dy]
+
+    def _restore_move_origin(self) -> None:
+        """Remet l'annotation déplacée à ses coordonnées d'origine (déplacement sous le seuil)."""
+        if not (self.project and self._drag.ann_id and self._drag.origin is not None):
+            return
+        self._annotations_for_current_doc()
+        target = self._ann_by_id.get(self.project.current_doc_id, {}).get(self._drag.ann_id)
+        if not target:
+            return
+        kind = self._drag.move_kind
+        orig = self._drag.origin
+        if kind in ("score_circle", "manual_score"):
+            target["x_pt"], target["y_pt"] = orig[0], orig[1]
+            self._invalidate_score_soa()
+        elif kind in ("textbox", "image"):
+            target["rect"] = list(orig)
+        elif kind == "arrow":
+            target["start"] = [orig[0], orig[1]]
+            target["end"] = [orig[2], orig[3]]
+
+    def _apply_ink_move_delta(self) -> None:
+        """Applique en une passe le delta mémorisé pendant le drag d'un tracé "ink"."""
+        if not (self.project and self._drag.ann_id and self._drag.origin and self._drag.delta):
+            return
+        self._annotations_for_current_doc()
+        target = self._ann_by_id.get(self.project.current_doc_id, {}).get(self._drag.ann_id)
+        if not target:
+            return
+        dx, dy = self._drag.delta
+        target["points"] = [[px + dx, py + dy] for (px, py) in self._drag.origin]
+
+    # ---------------- Sauvegarde projet (debounce) ----------------
+    def _schedule_save(self, delay_ms: int = 500) -> None:
+        """Planifie une sauvegarde du projet : plusieurs modifications rapprochées -> une seule écriture."""
+        self._save_dirty = True
+        if self._save_after_id is not None:
+            return
+        try:
+            self._save_after_id = self.root.after(max(20, int(delay_ms)), self._flush_save)
+        except Exception:
+            self._flush_save()
+
+    def _flush_save(self, _evt=None) -> None:
+        """Écrit immédiatement le projet si une sauvegarde est en attente."""
+        if self._save_after_id is not None:
+            try:
+                self.root.after_cancel(self._save_after_id)
+            except Exception:
+                pass
+            self._save_after_id = None
+        if not self._save_dirty:
+            return
+        self._save_dirty = False
+        if not self.project:
+            return
+        try:
+            self.project.save()
+        except Exception:
+            pass
+
+    # Rafraîchissements regroupables, dans l'ordre d'exécution
+    _REFRESH_ORDER = (
+        ("marks", "_refresh_marks_list"),
+        ("files", "_refresh_files_list"),
+        ("info", "_refresh_info_panel"),
+        ("totals", "_refresh_correction_totals"),
+    )
+
+    def _request_refresh(self, kinds: Iterable[str]) -> None:
+        """Planifie les rafraîchissements demandés ("marks", "files", "info", "totals").
+
+        Un seul callback after_idle exécute chaque rafraîchissement une fois, même si
+        plusieurs modifications le demandent dans le même cycle d'événements.
+        """
+        self._pending_refresh.update(kinds)
+        if self._refresh_after_id is not None:
+            return
+        try:
+            self._refresh_after_id = self.root.after_idle(self._run_pending_refresh)
+        except Exception:
+            self._run_pending_refresh()
+
+    def _run_pending_refresh(self) -> None:
+        self._refresh_after_id = None
+        pending = self._pending_refresh
+        self._pending_refresh = set()
+        for key, meth in self._REFRESH_ORDER:
+            if key in pending:
+                try:
+                    getattr(self, meth)()
+                except Exception:
+                    pass
+
+    def _save_now(self) -> None:
+        """Sauvegarde synchrone (annule une éventuelle sauvegarde différée, devenue inutile)."""
+        if self._save_after_id is not None:
+            try:
+                self.root.after_cancel(self._save_after_id)
+            except Exception:
+                pass
+            self._save_after_id = None
+        self._save_dirty = False
+        assert self.project is not None
+        self.project.save()
+
+    def _on_close(self) -> None:
+        # Termine la régénération en cours et celles en attente : sinon variants["corrected"]
+        # resterait sur un PDF sans les dernières modifications.
+        try:
+            self._drain_regen()
+        except Exception:
+            pass
+        self._flush_save()
+        try:
+            self._regen_executor.shutdown(wait=True)
+        except Exception:
+            pass
+        try:
+            self.root.destroy()
+        except Exception:
+            pass
 
     # ---------------- Régénération (debounce) ----------------
-    def _schedule_regenerate(self, delay_ms: int = 140) -> None:
+    def _schedule_regenerate(self, delay_ms: int = 140, pages: Iterable[int] | None = None) -> None:
         """Planifie une régénération du PDF corrigé en 'debounce'.
 
         Permet d'enchaîner plusieurs insertions (texte, flèches, images…) sans
         payer le coût d'une régénération complète à chaque clic. Améliore aussi
         la robustesse (moins de rechargements PDF au milieu des interactions).
+
+        `pages` : pages modifiées (régénération page par page). None = document complet.
         """
+        cur_doc_id = self.project.current_doc_id if self.project else None
+        if self._dirty_doc_id != cur_doc_id:
+            self._dirty_pages.clear()
+            self._dirty_full = False
+            self._dirty_doc_id = cur_doc_id
+        if pages is None:
+            self._dirty_full = True
+        else:
+            self._dirty_pages.update(int(p) for p in pages)
+
         try:
             if self._regen_after_id is not None:
                 self.root.after_cancel(self._regen_after_id)
@@ -3195,10 +3577,10 @@ class AppWindow:
                 # Si l'utilisateur est en train de cliquer / glisser dans le PDF,
                 # on décale la régénération : sinon open_pdf(...) peut interrompre
                 # l'interaction et faire "disparaître" les insertions suivantes.
-                if bool(getattr(self, "_pdf_mouse_down", False)) or getattr(self, "_draw_kind", None):
-                    self._schedule_regenerate(delay_ms=120)
+                if bool(getattr(self, "_pdf_mouse_down", False)) or self._drag.kind:
+                    self._schedule_regenerate(delay_ms=120, pages=())
                     return
-                self.c_regenerate()
+                self._submit_regen()
             except Exception:
                 # c_regenerate affiche déjà des messagebox si besoin
                 pass
@@ -3211,6 +3593,172 @@ class AppWindow:
             except Exception:
                 pass
 
+    def _submit_regen(self) -> None:
+        """Lance la régénération des pages en attente dans un thread de travail.
+
+        Seule la préparation (chemins, copie des annotations) se fait dans le thread Tk ;
+        le PDF est produit par apply_annotations(_to_pages) dans le worker, puis
+        _on_regen_done() l'installe dans la vue. Si une régénération tourne déjà, les
+        pages modifiées restent en attente et seront traitées à la fin de celle-ci.
+        """
+        if self._regen_future is not None:
+            return
+        if not self.project:
+            return
+        doc = self.project.get_current_doc()
+        if doc is None or not (self._dirty_pages or self._dirty_full):
+            return
+
+        pages = set(self._dirty_pages)
+        full = self._dirty_full or not pages
+        self._dirty_pages.clear()
+        self._dirty_full = False
+
+        base_rel = doc.variants.get("margin")
+        if not base_rel:
+            # Variante marge à (re)créer : chemin synchrone (dialogues éventuels)
+            self.c_regenerate()
+            return
+        base_pdf = self.project.rel_to_abs(base_rel)
+        if not base_pdf.exists():
+            self.c_regenerate()
+            return
+
+        prev_pdf = None
+        if not full:
+            prev_rel = doc.variants.get("corrected")
+            if prev_rel and self._regen_base_by_doc.get(doc.id) == str(base_rel):
+                prev_pdf = self.project.rel_to_abs(prev_rel)
+                if not prev_pdf.exists():
+                    prev_pdf = None
+            if prev_pdf is None:
+                full = True
+
+        # Copie : le worker ne doit pas lire la liste pendant que l'UI la modifie
+        anns = copy.deepcopy(self._annotations_for_current_doc())
+        out_pdf = self.project.unique_work_path(f"{doc.id}__corrected.pdf")
+        try:
+            # réserve le nom (unique_work_path) tant que le worker n'a pas écrit le fichier
+            out_pdf.touch()
+        except Exception:
+            pass
+        project_root = self.project.root_dir
+
+        def _job():
+            if full:
+                apply_annotations(base_pdf, out_pdf, anns, project_root=project_root)
+            else:
+                apply_annotations_to_pages(base_pdf, prev_pdf, out_pdf, anns, pages, project_root=project_root)
+            return out_pdf
+
+        self._regen_job = {
+            "project": self.project,
+            "doc_id": doc.id,
+            "base_rel": str(base_rel),
+            "out_pdf": out_pdf,
+            "pages": pages,
+            "full": full,
+            "seq": self._regen_seq,
+        }
+        self._regen_future = self._regen_executor.submit(_job)
+        try:
+            self.root.after(30, self._poll_regen)
+        except Exception:
+            pass
+
+    def _drain_regen(self) -> None:
+        """Exécute jusqu'au bout la régénération en cours puis les pages en attente (bloquant)."""
+        if self._regen_after_id is not None:
+            try:
+                self.root.after_cancel(self._regen_after_id)
+            except Exception:
+                pass
+            self._regen_after_id = None
+        while True:
+            fut = self._regen_future
+            if fut is None:
+                if not (self._dirty_pages or self._dirty_full):
+                    return
+                self._submit_regen()
+                if self._regen_future is None:
+                    return
+                continue
+            try:
+                fut.result()
+            except Exception:
+                pass
+            self._on_regen_done(fut)
+
+    @staticmethod
+    def _discard_regen_output(out_pdf) -> None:
+        """Supprime le PDF d'une régénération écartée (erreur ou résultat obsolète)."""
+        try:
+            if out_pdf is not None:
+                Path(out_pdf).unlink(missing_ok=True)
+        except Exception:
+            pass
+
+    def _poll_regen(self) -> None:
+        """Attend la fin du worker sans bloquer Tk (les widgets ne sont touchés que depuis ce thread)."""
+        fut = self._regen_future
+        if fut is None:
+            return
+        if not fut.done():
+            try:
+                self.root.after(30, self._poll_regen)
+            except Exception:
+                pass
+            return
+        self._on_regen_done(fut)
+
+    def _on_regen_done(self, fut) -> None:
+        job = self._regen_job or {}
+        self._regen_future = None
+        self._regen_job = None
+
+        out_pdf = job.get("out_pdf")
+        err = fut.exception()
+        if err is not None:
+            self._discard_regen_output(out_pdf)
+            if not job.get("full"):
+                # Repli : PDF précédent inutilisable -> document complet
+                self._dirty_full = True
+                self._submit_regen()
+            else:
+                messagebox.showerror("Correction", f"Erreur génération corrigé.\n\n{err}")
+            return
+
+        proj = job.get("project")
+        # Résultat obsolète (projet changé ou régénération synchrone intervenue entre-temps)
+        if proj is not self.project or job.get("seq") != self._regen_seq:
+            self._discard_regen_output(out_pdf)
+            self._submit_regen()
+            return
+        doc = None
+        try:
+            doc = next((d for d in proj.documents if d.id == job.get("doc_id")), None)
+        except Exception:
+            doc = None
+        if doc is None:
+            self._discard_regen_output(out_pdf)
+            self._submit_regen()
+            return
+
+        doc.variants["corrected"] = proj.abs_to_rel(out_pdf)
+        self._regen_base_by_doc[doc.id] = str(job.get("base_rel"))
+        self._regen_seq += 1
+        if proj.current_doc_id == doc.id:
+            proj.current_variant = "corrected"
+        try:
+            self._save_now()
+        except Exception:
+            pass
+        if proj.current_doc_id == doc.id:
+            self._after_regenerate(out_pdf)
+
+        # Modifications arrivées pendant la génération
+        self._submit_regen()
+
     # ---------------- Sélection / suppression d'annotations ----------------
     def _update_selection_info(self) -> None:
         n = len(self._selected_ann_ids)
@@ -3227,33 +3775,30 @@ class AppWindow:
         if not self._selected_ann_ids:
             return
         anns = self._annotations_for_current_doc()
-        anns[:] = [a for a in anns if not (isinstance(a, dict) and str(a.get("id", "")) in self._selected_ann_ids)]
+        anns[:] = [a for a in anns if not (isinstance(a, dict) and a.get("id", "") in self._selected_ann_ids)]
+        self._invalidate_ann_index()
 
         assert self.project is not None
         self.project.save()
 
         self.ann_clear_selection()
         self.c_regenerate()
-        self._refresh_marks_list()
-        self._refresh_files_list()
-        self._refresh_info_panel()
-        self._refresh_correction_totals()
+        self._request_refresh(("marks", "files", "info", "totals"))
 
     def _select_annotation_at(self, page_index: int, x_pt: float, y_pt: float) -> None:
         if not self._require_doc():
             return
 
-        anns = self._annotations_for_current_doc()
         best_id = None
         best_d = None
 
-        for a in anns:
+        for a in self._annotations_on_page(page_index):
             d = self._hit_test_ann(a, page_index, x_pt, y_pt)
             if d is None:
                 continue
             if best_d is None or d < best_d:
                 best_d = d
-                best_id = str(a.get("id", ""))
+                best_id = a.get("id", "")
 
         if not best_id:
             if hasattr(self, "_click_hint"):
@@ -3275,10 +3820,9 @@ class AppWindow:
         """Renvoie l'annotation la plus proche (tous types) sur la page, ou None."""
         if not self._require_doc():
             return None
-        anns = self._annotations_for_current_doc()
         best = None
         best_d = None
-        for a in anns:
+        for a in self._annotations_on_page(page_index):
             d = self._hit_test_ann(a, page_index, x_pt, y_pt)
             if d is None:
                 continue
@@ -3380,6 +3924,11 @@ class AppWindow:
             except Exception:
                 w = 3.0
             thr = 10.0 + w * 1.5
+            # Rejet rapide par boîte englobante avant le calcul segment par segment
+            bbox = self._ink_bbox(pts)
+            if bbox is not None:
+                if not ((bbox[0] - thr) <= x_pt <= (bbox[2] + thr) and (bbox[1] - thr) <= y_pt <= (bbox[3] + thr)):
+                    return None
             best = None
             for i in range(len(pts) - 1):
                 try:
@@ -3442,44 +3991,41 @@ class AppWindow:
                     self._reset_draw_state()
                 return
 
-            self._draw_kind = tool
-            self._draw_page = int(page_index)
+            self._drag.kind = tool
+            self._drag.page = int(page_index)
 
             if tool == "ink":
-                self._draw_points = [(float(x_pt), float(y_pt))]
+                self._drag.points = array("d", (float(x_pt), float(y_pt)))
                 return
 
             if tool in ("arrow", "textbox", "image"):
-                self._draw_start = (float(x_pt), float(y_pt))
-                self._draw_end = (float(x_pt), float(y_pt))
+                self._drag.start = (float(x_pt), float(y_pt))
+                self._drag.end = (float(x_pt), float(y_pt))
                 return
 
             return
 
         # 2) Mode sélection : si on clique sur une annotation, on la sélectionne et on prépare un déplacement.
-        sel_on = False
-        try:
-            sel_on = bool(self.sel_mode_var.get())
-        except Exception:
-            sel_on = False
+        sel_on = bool(self.sel_mode_var.get())
 
         if sel_on:
             if not self._require_doc():
                 return
             ann = self._find_nearest_annotation(page_index, x_pt, y_pt)
             if ann:
-                ann_id = str(ann.get("id", "")) if isinstance(ann, dict) else ""
+                ann_id = ann.get("id", "") if isinstance(ann, dict) else ""
                 self._selected_ann_ids = {ann_id} if ann_id else set()
                 self._update_selection_info()
 
                 # Prépare déplacement
-                self._draw_kind = "move"
-                self._draw_page = int(page_index)
-                self._move_active = True
-                self._move_ann_id = ann_id if ann_id else None
-                self._move_anchor = (float(x_pt), float(y_pt))
-                self._move_snapshot = copy.deepcopy(ann) if isinstance(ann, dict) else None
-                self._move_has_moved = False
+                self._drag.kind = "move"
+                self._drag.page = int(page_index)
+                self._drag.move_active = True
+                self._drag.ann_id = ann_id if ann_id else None
+                self._drag.anchor_x = float(x_pt)
+                self._drag.anchor_y = float(y_pt)
+                self._drag.move_kind, self._drag.origin = self._move_origin_of(ann)
+                self._drag.has_moved = False
                 if hasattr(self, "_click_hint"):
                     self._click_hint.configure(text="Mode clic : ON • sélection/déplacement (glisse pour déplacer)")
                 return
@@ -3490,131 +4036,104 @@ class AppWindow:
                     self._update_selection_info()
 
         # 2) sinon: pastilles (Correction V0 uniquement)
-        try:
-            sub = self.view_subtabs.tab(self.view_subtabs.select(), "text")
-        except Exception:
-            sub = ""
+        sub = self._cur_subtab
         if sub == "Correction V0":
             self._on_pdf_click_for_correction(page_index, x_pt, y_pt, x_root=x_root, y_root=y_root)
 
+    # ---- Déplacement (outil sélection) : un handler par type d'annotation ----
+    def _drag_score_circle(self, target: dict, orig: tuple, dx: float, dy: float, page_index: int) -> None:
+        # Option "Aligner dans la marge" (Correction V0) : verrouille X à la distance choisie du bord gauche
+        ox, oy, rad = orig
+        if self._cur_subtab == "Correction V0" and self._corr_align_margin_enabled():
+            target["x_pt"] = float(self._corr_margin_x_pt(page_index, radius_pt=rad))
+        else:
+            target["x_pt"] = ox + dx
+        target["y_pt"] = oy + dy
+        self._invalidate_score_soa()
+
+    def _drag_rect(self, target: dict, orig: tuple, dx: float, dy: float, page_index: int) -> None:
+        target["rect"] = self._translate_rect(orig, dx, dy)
+
+    def _drag_image(self, target: dict, orig: tuple, dx: float, dy: float, page_index: int) -> None:
+        new_rect = self._translate_rect(orig, dx, dy)
+        if self._cur_subtab == "Correction V0" and self._corr_align_margin_enabled():
+            new_rect = self._align_image_rect_center_to_margin(page_index, new_rect)
+        target["rect"] = new_rect
+
+    def _drag_arrow(self, target: dict, orig: tuple, dx: float, dy: float, page_index: int) -> None:
+        new_seg = self._translate_rect(orig, dx, dy)
+        target["start"] = new_seg[:2]
+        target["end"] = new_seg[2:]
+
+    def _drag_ink(self, target: dict, orig: tuple, dx: float, dy: float, page_index: int) -> None:
+        # Rien n'est affiché pendant le drag (la vue est régénérée au relâchement) :
+        # le delta est mémorisé dans _drag.delta, la translation des N points est faite une fois.
+        return
+
+    _DRAG_HANDLERS = {
+        "score_circle": _drag_score_circle,
+        "manual_score": _drag_score_circle,
+        "textbox": _drag_rect,
+        "image": _drag_image,
+        "arrow": _drag_arrow,
+        "ink": _drag_ink,
+    }
+
     def _on_pdf_drag(self, page_index: int, x_pt: float, y_pt: float) -> None:
+        st = self._drag
         # 1) déplacement d'une annotation sélectionnée (si mode sélection actif et clic sur ann)
-        if self._draw_kind == "move":
-            if self._draw_page is None or int(page_index) != int(self._draw_page):
+        if st.kind == "move":
+            if st.page is None or int(page_index) != int(st.page):
                 return
-            if not (self._move_active and self._move_ann_id and self._move_anchor and self._move_snapshot):
+            if not (st.move_active and st.ann_id and st.origin is not None):
                 return
 
-            dx = float(x_pt) - float(self._move_anchor[0])
-            dy = float(y_pt) - float(self._move_anchor[1])
+            dx = float(x_pt) - st.anchor_x
+            dy = float(y_pt) - st.anchor_y
             if abs(dx) > 0.2 or abs(dy) > 0.2:
-                self._move_has_moved = True
+                st.has_moved = True
+            st.delta = (dx, dy)
 
-            anns = self._annotations_for_current_doc()
-            target = None
-            for a in anns:
-                if isinstance(a, dict) and str(a.get("id", "")) == self._move_ann_id:
-                    target = a
-                    break
+            self._annotations_for_current_doc()
+            assert self.project is not None
+            target = self._ann_by_id.get(self.project.current_doc_id, {}).get(st.ann_id)
             if not target:
                 return
 
-            orig = self._move_snapshot
-            kind = orig.get("kind") if isinstance(orig, dict) else None
-            if kind in ("score_circle", "manual_score"):
-                # Option "Aligner dans la marge" (Correction V0) : verrouille X à la distance choisie du bord gauche
-                cx = float(orig.get("x_pt", 0.0)) + dx
-                cy = float(orig.get("y_pt", 0.0)) + dy
-                try:
-                    sub = self.view_subtabs.tab(self.view_subtabs.select(), "text")
-                except Exception:
-                    sub = ""
-                if sub == "Correction V0" and self._corr_align_margin_enabled():
-                    try:
-                        rad = float((orig.get("style") or {}).get("radius_pt", 0.0) or 0.0)
-                    except Exception:
-                        rad = 0.0
-                    target["x_pt"] = float(self._corr_margin_x_pt(page_index, radius_pt=rad))
-                else:
-                    target["x_pt"] = cx
-                target["y_pt"] = cy
-                return
-
-            if kind == "textbox":
-                rect = orig.get("rect")
-                if isinstance(rect, (list, tuple)) and len(rect) == 4:
-                    target["rect"] = [
-                        float(rect[0]) + dx,
-                        float(rect[1]) + dy,
-                        float(rect[2]) + dx,
-                        float(rect[3]) + dy,
-                    ]
-                return
-
-            if kind == "image":
-                rect = orig.get("rect")
-                if isinstance(rect, (list, tuple)) and len(rect) == 4:
-                    new_rect = [
-                        float(rect[0]) + dx,
-                        float(rect[1]) + dy,
-                        float(rect[2]) + dx,
-                        float(rect[3]) + dy,
-                    ]
-                    try:
-                        sub = self.view_subtabs.tab(self.view_subtabs.select(), "text")
-                    except Exception:
-                        sub = ""
-                    if sub == "Correction V0" and self._corr_align_margin_enabled():
-                        new_rect = self._align_image_rect_center_to_margin(page_index, new_rect)
-                    target["rect"] = new_rect
-                return
-
-            if kind == "arrow":
-                s = orig.get("start")
-                e = orig.get("end")
-                if isinstance(s, (list, tuple)) and len(s) == 2 and isinstance(e, (list, tuple)) and len(e) == 2:
-                    target["start"] = [float(s[0]) + dx, float(s[1]) + dy]
-                    target["end"] = [float(e[0]) + dx, float(e[1]) + dy]
-                return
-
-            if kind == "ink":
-                pts = orig.get("points")
-                if isinstance(pts, list) and pts:
-                    new_pts = []
-                    for p in pts:
-                        if isinstance(p, (list, tuple)) and len(p) == 2:
-                            new_pts.append([float(p[0]) + dx, float(p[1]) + dy])
-                    if new_pts:
-                        target["points"] = new_pts
-                return
-
+            handler = self._DRAG_HANDLERS.get(st.move_kind)
+            if handler is not None:
+                handler(self, target, st.origin, dx, dy, page_index)
             return
 
         # 2) dessin (outil combo)
-        # Robustesse : on se base sur l'état de dessin démarré au clic (self._draw_kind)
+        # Robustesse : on se base sur l'état de dessin démarré au clic (self._drag.kind)
         # plutôt que sur la valeur courante de ann_tool_var (qui peut changer entre temps).
-        if self._draw_kind in ("ink", "arrow", "textbox", "image"):
-            if self._draw_page is None or int(page_index) != int(self._draw_page):
+        if st.kind in ("ink", "arrow", "textbox", "image"):
+            if st.page is None or int(page_index) != int(st.page):
                 return
 
-            if self._draw_kind == "ink":
-                if not self._draw_points:
-                    self._draw_points = [(float(x_pt), float(y_pt))]
+            if st.kind == "ink":
+                buf = st.points
+                fx = float(x_pt)
+                fy = float(y_pt)
+                if not buf:
+                    buf.append(fx)
+                    buf.append(fy)
                     return
-                lx, ly = self._draw_points[-1]
-                if math.hypot(float(x_pt) - lx, float(y_pt) - ly) >= 1.2:
-                    self._draw_points.append((float(x_pt), float(y_pt)))
+                dx = fx - buf[-2]
+                dy = fy - buf[-1]
+                # distance >= 1.2 pt, comparée au carré (pas de sqrt par échantillon)
+                if dx * dx + dy * dy >= 1.44:
+                    buf.append(fx)
+                    buf.append(fy)
                 return
 
             # arrow/text/image : on met à jour l'endpoint au fil du drag
-            self._draw_end = (float(x_pt), float(y_pt))
+            st.end = (float(x_pt), float(y_pt))
             return
 
         # 3) pastilles: déplacement éventuel
-        try:
-            sub = self.view_subtabs.tab(self.view_subtabs.select(), "text")
-        except Exception:
-            sub = ""
+        sub = self._cur_subtab
         if sub == "Correction V0":
             self._on_pdf_drag_for_correction(page_index, x_pt, y_pt)
 
@@ -3622,68 +4141,58 @@ class AppWindow:
         # fin interaction souris : important pour ne pas régénérer au milieu d'un clic
         self._pdf_mouse_down = False
         # Fin d'un déplacement (mode sélection)
-        if self._draw_kind == "move":
-            moved = bool(getattr(self, "_move_has_moved", False))
-            if moved and self._require_doc():
+        if self._drag.kind == "move":
+            delta = self._drag.delta
+            moved = bool(self._drag.has_moved) and delta is not None and max(abs(delta[0]), abs(delta[1])) >= MOVE_MIN_PT
+            if not moved:
+                # Simple clic / tremblement : position d'origine, ni sauvegarde ni régénération
+                self._restore_move_origin()
+                self._reset_draw_state()
+                return
+            if self._drag.move_kind == "ink":
+                self._apply_ink_move_delta()
+            if self._require_doc():
                 # Snap X pour les pastilles (score_circle) si "Aligner dans la marge" est coché (Correction V0)
-                try:
-                    sub = self.view_subtabs.tab(self.view_subtabs.select(), "text")
-                except Exception:
-                    sub = ""
+                pi = self._drag.page if self._drag.page is not None else int(page_index)
+                sub = self._cur_subtab
                 if sub == "Correction V0" and self._corr_align_margin_enabled():
-                    try:
-                        anns = self._annotations_for_current_doc()
-                        for a in anns:
-                            if not (isinstance(a, dict) and str(a.get("id", "")) == str(self._move_ann_id)):
-                                continue
-                            pi = int(a.get("page", page_index))
-                            k = a.get("kind")
-                            if k in ("score_circle", "manual_score"):
-                                rad = 0.0
-                                try:
-                                    rad = float((a.get("style") or {}).get("radius_pt", 9.0) or 9.0)
-                                except Exception:
-                                    rad = 9.0
-                                a["x_pt"] = float(self._corr_margin_x_pt(pi, radius_pt=rad))
-                            elif k == "image":
-                                rect = a.get("rect")
-                                if isinstance(rect, (list, tuple)) and len(rect) == 4:
-                                    a["rect"] = self._align_image_rect_center_to_margin(pi, rect)
-                            break
-                    except Exception:
-                        pass
-
-                try:
-                    # persiste et régénère pour voir le résultat dans la vue PDF
-                    self.project.save()
-                except Exception:
-                    pass
-                try:
-                    self._schedule_regenerate()
-                except Exception:
-                    pass
+                    self._annotations_for_current_doc()
+                    a = self._ann_by_id.get(self.project.current_doc_id, {}).get(self._drag.ann_id)
+                    k = self._drag.move_kind
+                    if a is not None and k in ("score_circle", "manual_score"):
+                        # rayon relu au clic (_drag.origin) : pas de re-parsing du style ici
+                        rad = self._drag.origin[2] or 9.0
+                        a["x_pt"] = float(self._corr_margin_x_pt(pi, radius_pt=rad))
+                        self._invalidate_score_soa()
+                    elif a is not None and k == "image":
+                        a["rect"] = self._align_image_rect_center_to_margin(pi, a["rect"])
+
+                # persiste (différé) et régénère pour voir le résultat dans la vue PDF
+                self._schedule_save()
+                self._schedule_regenerate(pages=(pi,))
             self._reset_draw_state()
             return
 
-        kind = self._draw_kind
+        kind = self._drag.kind
         if kind in ("ink", "arrow", "textbox", "image"):
             # Insertion d'annotations (robuste)
             try:
                 if not self._require_doc():
                     return
-                if self._draw_page is None:
+                if self._drag.page is None:
                     return
 
-                start_page = int(self._draw_page)
+                start_page = int(self._drag.page)
                 anns = self._annotations_for_current_doc()
 
                 if kind == "ink":
-                    if len(self._draw_points) >= 2:
+                    buf = self._drag.points
+                    if len(buf) >= 4:
                         ann = {
-                            "id": str(uuid.uuid4()),
+                            "id": self._new_ann_id(),
                             "kind": "ink",
                             "page": int(start_page),
-                            "points": [[p[0], p[1]] for p in self._draw_points],
+                            "points": _simplify_ink_xy(buf, tol_pt=0.3),
                             "style": {
                                 "color": self._color_hex(self.ann_color_var.get(), "bleu"),
                                 "width_pt": float(self.ann_width_var.get()),
@@ -3691,17 +4200,17 @@ class AppWindow:
                             "payload": {},
                         }
                         anns.append(ann)
-                        assert self.project is not None
-                        self.project.save()
-                        self._schedule_regenerate()
+                        self._invalidate_ann_index()
+                        self._schedule_save()
+                        self._schedule_regenerate(pages=(start_page,))
                     return
 
                 if kind == "arrow":
-                    s = self._draw_start
-                    e = self._draw_end or (float(x_pt), float(y_pt))
+                    s = self._drag.start
+                    e = self._drag.end or (float(x_pt), float(y_pt))
                     if s and e:
                         ann = {
-                            "id": str(uuid.uuid4()),
+                            "id": self._new_ann_id(),
                             "kind": "arrow",
                             "page": int(start_page),
                             "start": [float(s[0]), float(s[1])],
@@ -3713,14 +4222,14 @@ class AppWindow:
                             "payload": {},
                         }
                         anns.append(ann)
-                        assert self.project is not None
-                        self.project.save()
-                        self._schedule_regenerate()
+                        self._invalidate_ann_index()
+                        self._schedule_save()
+                        self._schedule_regenerate(pages=(start_page,))
                     return
 
                 if kind == "image":
-                    s = self._draw_start
-                    e = self._draw_end or (float(x_pt), float(y_pt))
+                    s = self._drag.start
+                    e = self._drag.end or (float(x_pt), float(y_pt))
                     if not s or not e:
                         return
 
@@ -3739,11 +4248,10 @@ class AppWindow:
                     if not ann:
                         messagebox.showwarning("Image", "Aucune image sélectionnée (ou bibliothèque vide).")
                         return
+                    # même format d'id que les autres annotations de la session
+                    ann["id"] = self._new_ann_id()
 
-                    try:
-                        sub = self.view_subtabs.tab(self.view_subtabs.select(), "text")
-                    except Exception:
-                        sub = ""
+                    sub = self._cur_subtab
                     if sub == "Correction V0" and self._corr_align_margin_enabled():
                         try:
                             rect = ann.get("rect")
@@ -3753,14 +4261,14 @@ class AppWindow:
                             pass
 
                     anns.append(ann)
-                    assert self.project is not None
-                    self.project.save()
-                    self._schedule_regenerate()
+                    self._invalidate_ann_index()
+                    self._schedule_save()
+                    self._schedule_regenerate(pages=(start_page,))
                     return
 
                 if kind == "textbox":
-                    s = self._draw_start
-                    e = self._draw_end or (float(x_pt), float(y_pt))
+                    s = self._drag.start
+                    e = self._drag.end or (float(x_pt), float(y_pt))
                     if not s or not e:
                         return
 
@@ -3808,7 +4316,7 @@ class AppWindow:
                     rect = [float(x0), float(y0), float(x1), float(y1)]
 
                     ann = {
-                        "id": str(uuid.uuid4()),
+                        "id": self._new_ann_id(),
                         "kind": "textbox",
                         "page": int(start_page),
                         "rect": rect,
@@ -3820,9 +4328,9 @@ class AppWindow:
                         "payload": {},
                     }
                     anns.append(ann)
-                    assert self.project is not None
-                    self.project.save()
-                    self._schedule_regenerate()
+                    self._invalidate_ann_index()
+                    self._schedule_save()
+                    self._schedule_regenerate(pages=(start_page,))
 
                     # Feedback visuel (utile si l'utilisateur pense que "rien ne se passe")
                     try:
@@ -3846,10 +4354,7 @@ class AppWindow:
             return
 
         # pastilles: fin déplacement
-        try:
-            sub = self.view_subtabs.tab(self.view_subtabs.select(), "text")
-        except Exception:
-            sub = ""
+        sub = self._cur_subtab
         if sub == "Correction V0":
             self._on_pdf_release_for_correction(page_index, x_pt, y_pt)
 
@@ -3873,23 +4378,8 @@ class AppWindow:
             messagebox.showwarning('Points manuels', "Aucun exercice défini dans l'onglet Notation.")
             return
 
-        # Max points par exercice principal
-        def total_good(node) -> float:
-            if getattr(node, 'children', None):
-                return float(sum(total_good(c) for c in node.children))
-            try:
-                lvl = int(node.level())
-            except Exception:
-                lvl = 0
-            if lvl in (1, 2):
-                rub = getattr(node, 'rubric', None)
-                if rub is not None:
-                    try:
-                        return float(rub.good)
-                    except Exception:
-                        return 1.0
-                return 1.0
-            return 0.0
+        # Max points par exercice principal (totaux mémoïsés du barème)
+        max_by_ex = self._scheme_totals(scheme).max_by_ex
 
         ex_items = []  # (code, label, max)
         for ex in scheme.exercises:
@@ -3897,8 +4387,8 @@ class AppWindow:
                 code = str(ex.code)
             except Exception:
                 continue
-            label = str(ex.label) if getattr(ex, 'label', None) else f"Exercice {code}"
-            mx = float(total_good(ex))
+            label = str(ex.label) if ex.label else f"Exercice {code}"
+            mx = max_by_ex.get(code, 0.0)
             ex_items.append((code, label, mx))
 
         if not ex_items:
@@ -4039,6 +4529,7 @@ class AppWindow:
                     continue
             kept.append(a)
         anns[:] = kept
+        self._invalidate_ann_index()
 
         x_use = float(x_pt)
         try:
@@ -4049,12 +4540,13 @@ class AppWindow:
             pass
 
         ann = {
-            'id': str(uuid.uuid4()),
+            'id': self._new_ann_id(),
             'kind': 'manual_score',
             'page': int(page_index),
             'x_pt': float(x_use),
             'y_pt': float(y_pt),
             'exercise_code': str(ex_code),
+            'ex_top': _ex_top(str(ex_code)),
             'exercise_label': str(ex_label),
             'points': float(pts),
             'style': {
@@ -4067,6 +4559,7 @@ class AppWindow:
             'payload': {'tag': 'manual_score'},
         }
         anns.append(ann)
+        self._invalidate_ann_index()
 
         try:
             self.project.save()
@@ -4078,19 +4571,8 @@ class AppWindow:
         except Exception:
             pass
 
-        # MAJ UI
-        try:
-            self._refresh_marks_list()
-        except Exception:
-            pass
-        try:
-            self._refresh_correction_totals()
-        except Exception:
-            pass
-        try:
-            self._refresh_info_panel()
-        except Exception:
-            pass
+        # MAJ UI (regroupée)
+        self._request_refresh(("marks", "totals", "info"))
 
     # ---------------- Helpers ----------------
 
@@ -4116,11 +4598,100 @@ class AppWindow:
         self.project.settings["grading_scheme"] = d
         return scheme_from_dict(d)
 
-    def _save_scheme(self, scheme) -> None:
+    def _scheme_ver(self) -> int:
+        """Numéro de version du barème : change dès que settings["grading_scheme"] est remplacé
+        (sauvegarde, import, changement de projet)."""
+        d = self.project.settings.get("grading_scheme") if self.project else None
+        if d is not self._scheme_ver_ref:
+            self._scheme_ver_ref = d
+            self._scheme_version += 1
+        return self._scheme_version
+
+    def _leaf_entries(self) -> tuple[list[str], list[str], list[str]]:
+        """Items notables du barème : (valeurs du combo, codes, libellés), listes parallèles mises en cache par version."""
+        if not self.project:
+            return [], [], []
+        ver = self._scheme_ver()
+        cached = self._leaf_cache
+        if cached is not None and cached[0] == ver:
+            return cached[1], cached[2], cached[3]
+        values: list[str] = []
+        codes: list[str] = []
+        labels: list[str] = []
+        for n in leaf_nodes(self._scheme()):
+            label = n.label or n.code
+            values.append(f"{n.code} — {label}")
+            codes.append(n.code)
+            labels.append(label.strip())
+        # _scheme() peut normaliser le dict stocké : relit la version après coup
+        self._leaf_cache = (self._scheme_ver(), values, codes, labels)
+        return values, codes, labels
+
+    def _points_for(self, code: str, result: str) -> float:
+        """points_for() sur le barème courant, précalculé pour toutes les feuilles × résultats."""
+        ver = self._scheme_ver()
+        if self._points_cache_ver != ver:
+            cache: dict[tuple[str, str], float] = {}
+            for n in leaf_nodes(self._scheme()):
+                rub = n.rubric or Rubric()
+                cache[(n.code, "good")] = float(rub.good)
+                cache[(n.code, "partial")] = float(rub.partial)
+                cache[(n.code, "bad")] = float(rub.bad)
+            self._points_cache = cache
+            self._points_cache_ver = self._scheme_ver()
+        pts = self._points_cache.get((code, result))
+        if pts is None:
+            # code hors feuilles / résultat inattendu : même règle que points_for
+            pts = points_for(self._scheme(), code, result)
+        return pts
+
+    def _scheme_totals(self, scheme=None) -> _SchemeTotals:
+        """Totaux du barème (cf. node_totals), mémoïsés tant que le barème stocké est inchangé.
+
+        Le cache est associé à l'objet dict settings["grading_scheme"] : tout remplacement
+        (sauvegarde, import, changement de projet) l'invalide naturellement.
+        `scheme` : barème déjà lu via _scheme() par l'appelant (évite une seconde désérialisation).
+        Objet partagé : à lire seulement.
+        """
         assert self.project is not None
-        self.project.settings["grading_scheme"] = scheme_to_dict(scheme)
+        d = self.project.settings.get("grading_scheme")
+        cached = self._scheme_totals_cache
+        if cached is not None and cached.scheme_dict is d:
+            return cached
+        if scheme is None:
+            scheme = self._scheme()
+            d = self.project.settings.get("grading_scheme")
+        totals = node_totals(scheme)
+        max_by_ex = {ex.code: totals[ex.code] for ex in scheme.exercises}
+        sorted_codes = tuple(sorted(max_by_ex, key=_ex_sort_key))
+        st = _SchemeTotals(
+            scheme_dict=d,
+            by_node=totals,
+            total=sum(max_by_ex.values(), 0.0),
+            max_by_ex=max_by_ex,
+            sorted_codes=sorted_codes,
+            ex_pos={code: k for k, code in enumerate(sorted_codes)},
+            max_s=tuple(f"{max_by_ex[code]:g}" for code in sorted_codes),
+        )
+        self._scheme_totals_cache = st
+        return st
+
+    def _save_scheme(self, scheme, changed_code: str | None = None) -> None:
+        """Enregistre le barème et rafraîchit l'arbre.
+
+        `changed_code` : seul ce nœud a changé (libellé / barème) -> mise à jour en place de sa
+        ligne et des totaux de ses ancêtres ; sinon (structure modifiée) reconstruction complète.
+        """
+        assert self.project is not None
+        d = scheme_to_dict(scheme)
+        self.project.settings["grading_scheme"] = d
+        self._scheme_totals_cache = None
+        # Nouvelle version du barème, associée au nouveau dict (cf. _scheme_ver)
+        self._scheme_ver_ref = d
+        self._scheme_version += 1
         self.project.save()
-        self.refresh_grading_tree()
+        if changed_code is None or not self._update_grading_rows(scheme, changed_code):
+            self.refresh_grading_tree(refresh_info=False)
         self._refresh_correction_ui()
         self._refresh_info_panel()
         try:
@@ -4130,6 +4701,13 @@ class AppWindow:
 
     def _annotations_for_current_doc(self) -> list[dict]:
         assert self.project is not None
+        cur = self._cur_anns
+        if cur is not None:
+            (proj, doc_id, ann, n), lst = cur
+            if (proj is self.project and doc_id == self.project.current_doc_id
+                    and self.project.settings.get("annotations") is ann
+                    and ann.get(doc_id) is lst and len(lst) == n):
+                return lst
         doc = self.project.get_current_doc()
         if not doc:
             return []
@@ -4151,21 +4729,232 @@ class AppWindow:
         if not isinstance(lst, list):
             lst = []
             ann[doc.id] = lst
+            self._ann_by_id.pop(doc.id, None)
+        sig = (id(lst), len(lst))
+        if self._ann_ids_sig.get(doc.id) != sig:
+            # Ids toujours en str : les chemins chauds comparent directement a.get("id").
+            # Pastilles / points manuels : points en float, code d'exercice en str et exercice
+            # principal (ex_top) précalculé, pour que l'agrégation (_aggregate_scores) lise les
+            # valeurs sans conversion, découpage ni try/except.
+            for a in lst:
+                if not isinstance(a, dict):
+                    continue
+                if "id" in a and not isinstance(a["id"], str):
+                    a["id"] = str(a["id"])
+                if a.get("kind") in ("score_circle", "manual_score"):
+                    pts = a.get("points", 0.0)
+                    if type(pts) is not float:
+                        try:
+                            a["points"] = float(pts or 0.0)
+                        except Exception:
+                            a["points"] = 0.0
+                    code = a.get("exercise_code", "")
+                    if not isinstance(code, str):
+                        code = str(code).strip() if code is not None else ""
+                        a["exercise_code"] = code
+                    top = _ex_top(code)
+                    if a.get("ex_top") != top:
+                        a["ex_top"] = top
+            self._ann_ids_sig[doc.id] = sig
+        if doc.id not in self._ann_by_id:
+            self._ann_by_id[doc.id] = {a.get("id", ""): a for a in lst if isinstance(a, dict)}
+        self._cur_anns = ((self.project, doc.id, ann, len(lst)), lst)
         return lst
 
+    def _score_circle_soa(self, anns: list[dict]) -> tuple[list[int], array, array, dict[int, list[int]]]:
+        """Pastilles (score_circle) de `anns` en colonnes : (indices, xs, ys, par page), mis en cache.
+
+        `par page` : page -> positions k dans les colonnes (seules les pastilles de la page sont parcourues).
+
+        Les positions sont lues une seule fois ici ; tout code qui modifie x_pt/y_pt/page
+        d'une pastille sans passer par _invalidate_ann_index() appelle _invalidate_score_soa().
+        """
+        cached = self._cur_score_soa
+        if cached is not None and cached[0] is anns and cached[1] == len(anns):
+            return cached[2]
+        idx: list[int] = []
+        xs = array("d")
+        ys = array("d")
+        by_page: dict[int, list[int]] = {}
+        for i, a in enumerate(anns):
+            if not isinstance(a, dict) or a.get("kind") != "score_circle":
+                continue
+            try:
+                x = float(a.get("x_pt", 0.0))
+                y = float(a.get("y_pt", 0.0))
+                pg = int(a.get("page", -1))
+            except Exception:
+                continue
+            by_page.setdefault(pg, []).append(len(idx))
+            idx.append(i)
+            xs.append(x)
+            ys.append(y)
+        soa = (idx, xs, ys, by_page)
+        self._cur_score_soa = (anns, len(anns), soa)
+        return soa
+
+    def _invalidate_score_soa(self) -> None:
+        self._cur_score_soa = None
+
+    def _aggregate_scores(self) -> tuple[dict[str, float], dict[str, float]]:
+        """Points du document courant par exercice principal, en un seul parcours des annotations.
+
+        Renvoie (somme des pastilles, points manuels) ; mis en cache jusqu'à la prochaine
+        modification (_invalidate_ann_index, ou _invalidate_scores si des points changent en place).
+        Dicts partagés : à lire seulement.
+        """
+        anns = self._annotations_for_current_doc()
+        cached = self._scores_agg
+        if cached is not None and cached[0] is anns and cached[1] == len(anns):
+            return cached[2]
+        sum_by_ex: dict[str, float] = {}
+        manual_by_ex: dict[str, float] = {}
+        # Seules les pastilles et points manuels sont parcourus (index par type)
+        for kind, dst in (("score_circle", sum_by_ex), ("manual_score", manual_by_ex)):
+            add = kind == "score_circle"
+            # Valeurs déjà normalisées à l'ingestion (_annotations_for_current_doc)
+            for a in self._iter_annotations(kind):
+                get = a.get
+                ex_code = get("ex_top")
+                if not ex_code:
+                    continue
+                pts = get("points", 0.0)
+                dst[ex_code] = (dst.get(ex_code, 0.0) + pts) if add else pts
+        agg = (sum_by_ex, manual_by_ex)
+        self._scores_agg = (anns, len(anns), agg)
+        return agg
+
+    def _invalidate_scores(self) -> None:
+        self._scores_agg = None
+
+    def _ex_score_rows(self) -> tuple[tuple[tuple[str, str, str, bool], ...], float]:
+        """Lignes par exercice principal du barème, dans l'ordre de _scheme_totals().sorted_codes, et total attribué.
+
+        Ligne : (code, attribué formaté, max formaté, points manuels ?). Un point manuel remplace
+        le total des pastilles de son exercice. Recalculé seulement si les points ou le barème changent.
+        """
+        agg = self._aggregate_scores()
+        sc = self._scheme_totals()
+        cached = self._ex_rows_cache
+        if cached is not None and cached[0] is agg and cached[1] is sc:
+            return cached[2]
+        sum_by_ex, manual_by_ex = agg
+        codes, ex_pos, max_s = sc.sorted_codes, sc.ex_pos, sc.max_s
+        # Colonnes parallèles aux codes triés (positions précalculées avec le barème)
+        attrib = [0.0] * len(codes)
+        manual = [False] * len(codes)
+        extra = 0.0  # pastilles d'exercices absents du barème : comptées dans le total seulement
+        for ex_code, pts in sum_by_ex.items():
+            k = ex_pos.get(ex_code)
+            if k is None:
+                extra += pts
+            else:
+                attrib[k] = pts
+        for ex_code, pts in manual_by_ex.items():
+            k = ex_pos.get(ex_code)
+            if k is not None:
+                attrib[k] = pts
+                manual[k] = True
+        rows = tuple(
+            (code, f"{at:g}", mx_s, man)
+            for code, at, mx_s, man in zip(codes, attrib, max_s, manual)
+        )
+        out = (rows, sum(attrib, extra))
+        self._ex_rows_cache = (agg, sc, out)
+        return out
+
+    def _new_ann_id(self) -> str:
+        """Id unique d'une nouvelle annotation (pas d'appel os.urandom par clic, contrairement à uuid4)."""
+        return f"{self._ann_session}-{next(self._ann_seq)}"
+
+    def _invalidate_ann_index(self) -> None:
+        """Invalide les index dérivés des annotations (à appeler après ajout/suppression)."""
+        self._ann_by_id.clear()
+        self._ann_ids_sig.clear()
+        self._ann_by_page.clear()
+        self._ann_by_kind.clear()
+        self._ink_bbox_cache.clear()
+        self._cur_anns = None
+        self._cur_score_soa = None
+        self._scores_agg = None
+
+    def _annotations_on_page(self, page_index: int) -> list[dict]:
+        """Annotations du document courant situées sur la page donnée (index construit à la demande)."""
+        anns = self._annotations_for_current_doc()
+        assert self.project is not None
+        doc_id = self.project.current_doc_id
+        by_page = self._ann_by_page.get(doc_id)
+        if by_page is None:
+            by_page = {}
+            for a in anns:
+                if not isinstance(a, dict):
+                    continue
+                try:
+                    pi = int(a.get("page", -1))
+                except Exception:
+                    continue
+                by_page.setdefault(pi, []).append(a)
+            self._ann_by_page[doc_id] = by_page
+        return by_page.get(int(page_index), [])
+
+    def _ann_indices_of_kind(self, anns: list[dict], kind: str) -> list[int]:
+        """Positions (croissantes) des annotations `kind` dans `anns` (liste du document courant).
+
+        Index construit en un parcours pour tous les types, puis réutilisé jusqu'à _invalidate_ann_index().
+        """
+        assert self.project is not None
+        doc_id = self.project.current_doc_id or ""
+        hit = self._ann_by_kind.get(doc_id)
+        if hit is not None and hit[0] is anns and hit[1] == len(anns):
+            return hit[2].get(kind, [])
+        by_kind: dict[str, list[int]] = {}
+        for i, a in enumerate(anns):
+            if isinstance(a, dict):
+                by_kind.setdefault(a.get("kind"), []).append(i)
+        self._ann_by_kind[doc_id] = (anns, len(anns), by_kind)
+        return by_kind.get(kind, [])
+
+    def _iter_annotations(self, kind: str) -> Iterator[dict]:
+        """Annotations `kind` du document courant, dans l'ordre de la liste (via _ann_indices_of_kind).
+
+        Chaque élément est un dict du bon type : pas de test isinstance / kind côté appelant.
+        """
+        anns = self._annotations_for_current_doc()
+        for i in self._ann_indices_of_kind(anns, kind):
+            yield anns[i]
+
+    def _ink_bbox(self, pts: list) -> tuple[float, float, float, float] | None:
+        """Boîte englobante (x0, y0, x1, y1) d'une liste de points, mise en cache."""
+        hit = self._ink_bbox_cache.get(id(pts))
+        if hit is not None and hit[0] is pts:
+            return hit[1]
+        try:
+            xs = [float(p[0]) for p in pts]
+            ys = [float(p[1]) for p in pts]
+        except Exception:
+            return None
+        if not xs:
+            return None
+        bbox = (min(xs), min(ys), max(xs), max(ys))
+        self._ink_bbox_cache[id(pts)] = (pts, bbox)
+        return bbox
+
     def _refresh_files_list(self) -> None:
         self.files_list.delete(0, tk.END)
         self._doc_ids.clear()
         if not self.project:
             return
-        for i, doc in enumerate(self.project.documents, start=1):
-            label = f"{i}. {doc.original_name}"
-            if "margin" in doc.variants:
-                label += "  [marge]"
-            if "corrected" in doc.variants:
-                label += "  [corrigé]"
-            self.files_list.insert(tk.END, label)
-            self._doc_ids.append(doc.id)
+        docs = self.project.documents
+        labels = [
+            f"{i}. {doc.original_name}"
+            + ("  [marge]" if "margin" in doc.variants else "")
+            + ("  [corrigé]" if "corrected" in doc.variants else "")
+            for i, doc in enumerate(docs, start=1)
+        ]
+        # Un seul appel Tcl pour toute la liste (au lieu d'un insert par document)
+        if labels:
+            self.files_list.insert(tk.END, *labels)
+        self._doc_ids[:] = [doc.id for doc in docs]
 
         if self.project.current_doc_id and self.project.current_doc_id in self._doc_ids:
             idx = self._doc_ids.index(self.project.current_doc_id)
@@ -4275,8 +5064,10 @@ class AppWindow:
         if not parent:
             return
 
+        self._flush_save()
         try:
             self.project = Project.create(Path(parent), name=name)
+            self._invalidate_ann_index()
         except Exception as e:
             messagebox.showerror("Projet", f"Impossible de créer le projet.\n\n{e}")
             return
@@ -4331,8 +5122,10 @@ class AppWindow:
 
     def _open_project_from_path(self, path: Path) -> None:
         """Ouvre un projet à partir d'un chemin (dossier ou project.json)."""
+        self._flush_save()
         try:
             self.project = Project.load_any(Path(path))
+            self._invalidate_ann_index()
         except Exception as e:
             messagebox.showerror("Projet", f"Impossible d'ouvrir le projet.\n\n{e}")
             return
@@ -4459,6 +5252,8 @@ class AppWindow:
     # ---------------- Ligne guide : alignement marge (Correction V0) ----------------
     def _clear_margin_guide(self) -> None:
         """Supprime la ligne guide d'alignement (si présente)."""
+        if not self._margin_guide_drawn:
+            return
         try:
             v = getattr(self, "viewer", None)
             if v is None:
@@ -4467,31 +5262,23 @@ class AppWindow:
             if c is None:
                 return
             c.delete("margin_guide")
+            self._margin_guide_drawn = False
         except Exception:
             pass
 
     def _update_margin_guide(self) -> None:
         """Affiche/masque la ligne guide verticale à la distance choisie (si 'Aligner dans la marge' est coché)."""
-        # Toujours commencer par nettoyer
+        # Toujours commencer par nettoyer (no-op Tk si aucun guide n'est dessiné)
         self._clear_margin_guide()
 
         # Conditions d'affichage : onglet Visualisation PDF + sous-onglet Correction V0 + option cochée
-        try:
-            main = self.nb.tab(self.nb.select(), "text")
-        except Exception:
-            main = ""
-        try:
-            sub = self.view_subtabs.tab(self.view_subtabs.select(), "text")
-        except Exception:
-            sub = ""
+        main = self._cur_main_tab
+        sub = self._cur_subtab
 
         if main != "Visualisation PDF" or sub != "Correction V0":
             return
 
-        try:
-            if not bool(self.c_align_margin_var.get()):
-                return
-        except Exception:
+        if not self._corr_align_margin_enabled():
             return
 
         v = getattr(self, "viewer", None)
@@ -4505,37 +5292,26 @@ class AppWindow:
         if not layout:
             return
 
-        try:
-            zoom = float(v.get_zoom()) if hasattr(v, "get_zoom") else float(getattr(v, "_zoom", 1.0) or 1.0)
-        except Exception:
-            zoom = 1.0
+        zoom = float(v.get_zoom())
 
+        # Marqué avant le premier create_line : si la boucle échoue en cours de route,
+        # _clear_margin_guide supprimera quand même les lignes déjà dessinées.
+        self._margin_guide_drawn = True
         # X en pixels : distance choisie depuis le bord gauche (points -> pixels via zoom)
+        # (layout construit par PDFViewer : clés toujours présentes, pas de try par page)
         for info in layout:
-            try:
-                pi = int(info.get("page_index", 0))
-            except Exception:
-                pi = 0
-            try:
-                x_px = float(self._corr_margin_x_pt(pi, radius_pt=9.0)) * zoom + float(info.get("x0", 0.0) or 0.0)
-            except Exception:
-                continue
-            try:
-                y0 = float(info.get("y0", 0.0))
-                y1 = y0 + float(info.get("h_px", 0.0))
-            except Exception:
-                continue
-            try:
-                canvas.create_line(
-                    x_px, y0, x_px, y1,
-                    fill="#2F81F7",
-                    width=2,
-                    dash=(6, 4),
-                    tags=("margin_guide",),
-                    state="disabled",
-                )
-            except Exception:
-                pass
+            pi = info["page_index"]
+            x_px = self._corr_margin_x_pt(pi, radius_pt=9.0) * zoom + float(info["x0"])
+            y0 = float(info["y0"])
+            y1 = y0 + float(info["h_px"])
+            canvas.create_line(
+                x_px, y0, x_px, y1,
+                fill="#2F81F7",
+                width=2,
+                dash=(6, 4),
+                tags=("margin_guide",),
+                state="disabled",
+            )
 
 
 
@@ -4730,6 +5506,7 @@ class AppWindow:
                 self._undo_by_doc.pop(str(d), None)
         except Exception:
             pass
+        self._invalidate_ann_index()
 
         # Supprime (en cas de multiples, on ignore les erreurs sur un doc spécifique)
         for doc_id in doc_ids:
@@ -4767,6 +5544,7 @@ class AppWindow:
     def export_current_locked(self) -> None:
         if not self._require_doc():
             return
+        self._flush_save()
         assert self.project is not None
         doc = self.project.get_current_doc()
         assert doc is not None
@@ -4804,60 +5582,88 @@ class AppWindow:
             messagebox.showerror("Export", f"Erreur export.\n\n{e}")
 
     # ---------------- Notation : affichage + calcul totaux ----------------
-    def refresh_grading_tree(self):
-        for iid in self.gr_tree.get_children(""):
-            self.gr_tree.delete(iid)
+    def refresh_grading_tree(self, refresh_info: bool = True):
+        """Reconstruit l'arbre du barème ; `refresh_info=False` : l'appelant rafraîchit lui-même le panneau d'infos."""
+        roots = self.gr_tree.get_children("")
+        if roots:
+            self.gr_tree.delete(*roots)
 
         if not self.project:
             self.total_general_var.set("—")
             return
 
         scheme = self._scheme()
+        st = self._scheme_totals(scheme)
+        totals = st.by_node
 
-        def total_good(node) -> float:
-            if node.children:
-                return sum(total_good(c) for c in node.children)
-            if node.level() in (1, 2):
-                if node.rubric:
-                    return float(node.rubric.good)
-                return 1.0
-            return 0.0
+        self.total_general_var.set(f"{st.total:g}")
 
-        total_general = sum(total_good(ex) for ex in scheme.exercises)
-        self.total_general_var.set(f"{total_general:g}")
+        tree = self.gr_tree
+        row_values = self._grading_row_values
 
-        def insert_node(parent_iid: str, node):
-            total = total_good(node)
+        # Chaque exercice est construit détaché (hors de l'arbre affiché) puis rattaché
+        # en bloc : la liste des lignes visibles n'est recalculée qu'au rattachement.
+        # Parcours en profondeur par pile explicite ; open=True à l'insertion (tout déplié).
+        ex_codes = []
+        for ex in scheme.exercises:
+            tree.insert("", "end", iid=ex.code, text=ex.code,
+                        values=row_values(ex, totals[ex.code]), open=True)
+            tree.detach(ex.code)
+            stack = [(ex.code, ch) for ch in reversed(ex.children)]
+            while stack:
+                parent_iid, node = stack.pop()
+                tree.insert(
+                    parent_iid, "end",
+                    iid=node.code,
+                    text=node.code,
+                    values=row_values(node, totals[node.code]),
+                    open=True,
+                )
+                stack.extend((node.code, ch) for ch in reversed(node.children))
+            ex_codes.append(ex.code)
+        for i, code in enumerate(ex_codes):
+            tree.move(code, "", i)
 
-            is_leaf = (not node.children) and (node.level() in (1, 2))
-            if is_leaf and node.rubric:
-                good = f"{node.rubric.good:g}"
-                partial = f"{node.rubric.partial:g}"
-                bad = f"{node.rubric.bad:g}"
-            else:
-                good = partial = bad = ""
+        if refresh_info:
+            self._refresh_info_panel()
 
-            total_s = f"{total:g}" if total > 0 else ""
+    @staticmethod
+    def _grading_row_values(node, total: float) -> tuple[str, str, str, str, str]:
+        """Colonnes (label, good, partial, bad, total) d'une ligne de l'arbre du barème."""
+        is_leaf = (not node.children) and (node.level() in (1, 2))
+        if is_leaf and node.rubric:
+            good = f"{node.rubric.good:g}"
+            partial = f"{node.rubric.partial:g}"
+            bad = f"{node.rubric.bad:g}"
+        else:
+            good = partial = bad = ""
 
-            self.gr_tree.insert(
-                parent_iid, "end",
-                iid=node.code,
-                text=node.code,
-                values=(node.label, good, partial, bad, total_s)
-            )
-            for ch in node.children:
-                insert_node(node.code, ch)
+        total_s = f"{total:g}" if total > 0 else ""
+        return (node.label, good, partial, bad, total_s)
 
-        for ex in scheme.exercises:
-            insert_node("", ex)
+    def _update_grading_rows(self, scheme, code: str) -> bool:
+        """Met à jour en place la ligne `code` et la colonne total de ses ancêtres.
 
-        self._expand_all_tree("")
-        self._refresh_info_panel()
+        Retourne False si l'arbre affiché ne correspond pas (l'appelant fait alors un rebuild).
+        """
+        found = find_node(scheme, code)
+        if not found or not self.gr_tree.exists(code):
+            return False
+        node, _ = found
+        st = self._scheme_totals(scheme)
+        totals = st.by_node
+
+        self.gr_tree.item(code, text=code, values=self._grading_row_values(node, totals[code]))
+        iid = self.gr_tree.parent(code)
+        while iid:
+            t = totals.get(iid)
+            if t is None:
+                return False
+            self.gr_tree.set(iid, "total", f"{t:g}" if t > 0 else "")
+            iid = self.gr_tree.parent(iid)
 
-    def _expand_all_tree(self, parent: str = "") -> None:
-        for iid in self.gr_tree.get_children(parent):
-            self.gr_tree.item(iid, open=True)
-            self._expand_all_tree(iid)
+        self.total_general_var.set(f"{st.total:g}")
+        return True
 
     def _selected_code(self) -> str | None:
         sel = self.gr_tree.selection()
@@ -4968,7 +5774,7 @@ class AppWindow:
 
         def save():
             set_label(scheme, code, var.get())
-            self._save_scheme(scheme)
+            self._save_scheme(scheme, changed_code=code)
             dlg.destroy()
 
         ttk.Button(dlg, text="Enregistrer", command=save).pack(pady=12)
@@ -5034,7 +5840,7 @@ class AppWindow:
                 messagebox.showwarning("Notation", str(e))
                 return
 
-            self._save_scheme(scheme)
+            self._save_scheme(scheme, changed_code=code)
             dlg.destroy()
 
         ttk.Button(frm, text="Enregistrer", command=save).grid(row=3, column=0, columnspan=2, pady=18)
@@ -5055,8 +5861,11 @@ class AppWindow:
         if not out:
             return
         try:
-            with open(out, "w", encoding="utf-8") as f:
-                json.dump(scheme_to_dict(scheme), f, ensure_ascii=False, indent=2)
+            if orjson is not None:
+                Path(out).write_bytes(orjson.dumps(scheme_to_dict(scheme), option=orjson.OPT_INDENT_2))
+            else:
+                with open(out, "w", encoding="utf-8") as f:
+                    json.dump(scheme_to_dict(scheme), f, ensure_ascii=False, indent=2)
             messagebox.showinfo("Barème", f"Barème exporté :\n{out}")
         except Exception as e:
             messagebox.showerror("Barème", f"Erreur export barème.\n\n{e}")
@@ -5072,8 +5881,11 @@ class AppWindow:
         if not inp:
             return
         try:
-            with open(inp, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            if orjson is not None:
+                data = orjson.loads(Path(inp).read_bytes())
+            else:
+                with open(inp, "r", encoding="utf-8") as f:
+                    data = json.load(f)
             self.project.settings["grading_scheme"] = ensure_scheme_dict(data)
             self.project.save()
             self.refresh_grading_tree()
@@ -5089,15 +5901,20 @@ class AppWindow:
             return
         if not self.project:
             self.c_item_combo.configure(values=[])
+            self._leaf_combo_ver = -1
+            self._leaf_codes = []
+            self._leaf_labels = []
             self.c_item_var.set("")
             self.c_marks.delete(0, tk.END)
             self.c_points_lbl.configure(text="Points : —")
             return
 
-        scheme = self._scheme()
-        leaves = leaf_nodes(scheme)
-        values = [f"{n.code} — {n.label or n.code}" for n in leaves]
-        self.c_item_combo.configure(values=values)
+        values, codes, labels = self._leaf_entries()
+        if self._leaf_combo_ver != self._scheme_version:
+            self.c_item_combo.configure(values=values)
+            self._leaf_combo_ver = self._scheme_version
+            self._leaf_codes = codes
+            self._leaf_labels = labels
         if not self.c_item_var.get() and values:
             self.c_item_var.set(values[0])
 
@@ -5105,13 +5922,27 @@ class AppWindow:
         self._refresh_marks_list()
         self._refresh_correction_totals()
 
+    def _selected_leaf_index(self) -> int:
+        """Index de l'item choisi dans le combo (aligné sur _leaf_codes/_leaf_labels), -1 sinon."""
+        try:
+            i = int(self.c_item_combo.current())
+        except Exception:
+            return -1
+        return i if 0 <= i < len(self._leaf_codes) else -1
+
     def _selected_leaf_code(self) -> str | None:
+        i = self._selected_leaf_index()
+        if i >= 0:
+            return self._leaf_codes[i]
         v = self.c_item_var.get().strip()
         if not v:
             return None
         return v.split("—")[0].strip()
 
     def _selected_leaf_label(self) -> str:
+        i = self._selected_leaf_index()
+        if i >= 0:
+            return self._leaf_labels[i]
         v = self.c_item_var.get().strip()
         if not v:
             return ""
@@ -5128,9 +5959,8 @@ class AppWindow:
         if not code:
             self.c_points_lbl.configure(text="Points : —")
             return
-        scheme = self._scheme()
         result = self.c_result_var.get()
-        pts = points_for(scheme, code, result)
+        pts = self._points_for(code, result)
         self.c_points_lbl.configure(text=f"Points : {pts:g}")
 
 
@@ -5148,6 +5978,7 @@ class AppWindow:
             return
         self.c_marks.delete(0, tk.END)
         self._marks_list_map = []
+        self._marks_src = None
 
         if not self.project:
             return
@@ -5156,73 +5987,112 @@ class AppWindow:
             return
 
         # Max par exercice principal (pour afficher /max sur les points manuels)
-        max_by_ex: dict[str, float] = {}
         try:
-            scheme = self._scheme()
-
-            def total_good(node) -> float:
-                if getattr(node, 'children', None):
-                    return float(sum(total_good(c) for c in node.children))
-                try:
-                    lvl = int(node.level())
-                except Exception:
-                    lvl = 0
-                if lvl in (1, 2):
-                    rub = getattr(node, 'rubric', None)
-                    if rub is not None:
-                        try:
-                            return float(rub.good)
-                        except Exception:
-                            return 1.0
-                    return 1.0
-                return 0.0
-
-            for ex in getattr(scheme, 'exercises', []) or []:
-                try:
-                    ex_code = str(ex.code)
-                except Exception:
-                    continue
-                max_by_ex[ex_code] = float(total_good(ex))
+            max_by_ex = self._scheme_totals().max_by_ex
         except Exception:
             max_by_ex = {}
 
         anns = self._annotations_for_current_doc()
+        lines: list[str] = []
+        mapping: list[int] = []
         for i, a in enumerate(anns):
             if not isinstance(a, dict):
                 continue
-            kind = a.get('kind')
+            line = self._mark_row_text(a, max_by_ex)
+            if line is not None:
+                lines.append(line)
+                mapping.append(i)
+        if lines:
+            self.c_marks.insert(tk.END, *lines)
+        self._marks_list_map = mapping
+        self._marks_src = anns
+        self._marks_len = len(anns)
 
-            if kind == 'score_circle':
-                code = a.get('exercise_code', '?')
-                label = a.get('exercise_label') or ''
-                res = a.get('result', '?')
-                try:
-                    pts = float(a.get('points', 0.0))
-                except Exception:
-                    pts = 0.0
-                page = int(a.get('page', 0))
-                if label:
-                    self.c_marks.insert(tk.END, f"p{page+1} • {code} • {label} • {res} • {pts:g}")
-                else:
-                    self.c_marks.insert(tk.END, f"p{page+1} • {code} • {res} • {pts:g}")
-                self._marks_list_map.append(i)
-
-            elif kind == 'manual_score':
-                code = str(a.get('exercise_code', '') or '').strip()
-                if code:
-                    code = code.split('.', 1)[0]
-                label = a.get('exercise_label') or (f"Exercice {code}" if code else 'Exercice')
-                try:
-                    pts = float(a.get('points', 0.0))
-                except Exception:
-                    pts = 0.0
-                page = int(a.get('page', 0))
-                mx = float(max_by_ex.get(code, 0.0)) if code else 0.0
-                if mx > 0:
-                    self.c_marks.insert(tk.END, f"p{page+1} • Ex {code} • {label} • MANUEL • {pts:g}/{mx:g}")
-                else:
-                    self.c_marks.insert(tk.END, f"p{page+1} • Ex {code} • {label} • MANUEL • {pts:g}")
-                self._marks_list_map.append(i)
+    @staticmethod
+    def _mark_row_text(a: dict, max_by_ex: dict[str, float] | None = None) -> str | None:
+        """Ligne de la liste 'Marques du document' pour une annotation (None si elle n'y figure pas)."""
+        kind = a.get('kind')
+
+        if kind == 'score_circle':
+            code = a.get('exercise_code', '?')
+            label = a.get('exercise_label') or ''
+            res = a.get('result', '?')
+            try:
+                pts = float(a.get('points', 0.0))
+            except Exception:
+                pts = 0.0
+            page = int(a.get('page', 0))
+            if label:
+                return f"p{page+1} • {code} • {label} • {res} • {pts:g}"
+            return f"p{page+1} • {code} • {res} • {pts:g}"
+
+        if kind == 'manual_score':
+            code = str(a.get('exercise_code', '') or '').strip()
+            if code:
+                code = code.split('.', 1)[0]
+            label = a.get('exercise_label') or (f"Exercice {code}" if code else 'Exercice')
+            try:
+                pts = float(a.get('points', 0.0))
+            except Exception:
+                pts = 0.0
+            page = int(a.get('page', 0))
+            mx = (max_by_ex or {}).get(code, 0.0) if code else 0.0
+            if mx > 0:
+                return f"p{page+1} • Ex {code} • {label} • MANUEL • {pts:g}/{mx:g}"
+            return f"p{page+1} • Ex {code} • {label} • MANUEL • {pts:g}"
+
+        return None
+
+    def _marks_apply(self, op: str, ann_index: int) -> None:
+        """Met à jour une seule ligne de 'Marques du document' après modification d'une pastille.
+
+        op : "add" (annotation ajoutée en fin de liste), "update" (modifiée en place) ou
+        "delete" (supprimée, `ann_index` = son ancien index). Si la liste affichée n'est plus
+        synchrone avec les annotations, on retombe sur une reconstruction complète (différée).
+        """
+        delta = {"add": 1, "update": 0, "delete": -1}[op]
+        ok = False
+        try:
+            anns = self._annotations_for_current_doc() if self.project else None
+            if (hasattr(self, 'c_marks') and anns is not None and self._marks_src is anns
+                    and len(anns) == self._marks_len + delta):
+                ok = self._marks_apply_row(op, anns, int(ann_index))
+        except Exception:
+            ok = False
+        if ok:
+            self._marks_len = len(anns)
+        else:
+            self._request_refresh(("marks",))
+
+    def _marks_apply_row(self, op: str, anns: list[dict], ann_index: int) -> bool:
+        mapping = self._marks_list_map
+        # mapping trié par index d'annotation : position de la ligne par bisection
+        r = bisect_left(mapping, ann_index)
+        found = r < len(mapping) and mapping[r] == ann_index
+
+        if op == "delete":
+            if found:
+                self.c_marks.delete(r)
+                del mapping[r]
+            for k in range(r, len(mapping)):
+                mapping[k] -= 1
+            return True
+
+        a = anns[ann_index]
+        if not isinstance(a, dict) or a.get('kind') != 'score_circle':
+            return False  # points manuels : /max dépend du barème -> reconstruction complète
+        line = self._mark_row_text(a)
+        if op == "add":
+            if ann_index != len(anns) - 1:
+                return False
+            self.c_marks.insert(tk.END, line)
+            mapping.append(ann_index)
+            return True
+        if not found:
+            return False
+        self.c_marks.delete(r)
+        self.c_marks.insert(r, line)
+        return True
 
     def _on_marks_double_click(self, event=None) -> None:
         """Double-clic dans la liste 'Marques du document'.
@@ -5298,22 +6168,7 @@ class AppWindow:
             return
 
         # Max points par exercice principal (même logique que _add_manual_score_at)
-        def total_good(node) -> float:
-            if getattr(node, 'children', None):
-                return float(sum(total_good(c) for c in node.children))
-            try:
-                lvl = int(node.level())
-            except Exception:
-                lvl = 0
-            if lvl in (1, 2):
-                rub = getattr(node, 'rubric', None)
-                if rub is not None:
-                    try:
-                        return float(rub.good)
-                    except Exception:
-                        return 1.0
-                return 1.0
-            return 0.0
+        max_by_ex = self._scheme_totals(scheme).max_by_ex
 
         ex_items = []  # (code, label, max)
         for ex in scheme.exercises:
@@ -5321,8 +6176,8 @@ class AppWindow:
                 code = str(ex.code)
             except Exception:
                 continue
-            label = str(ex.label) if getattr(ex, 'label', None) else f"Exercice {code}"
-            mx = float(total_good(ex))
+            label = str(ex.label) if ex.label else f"Exercice {code}"
+            mx = max_by_ex.get(code, 0.0)
             ex_items.append((code, label, mx))
 
         if not ex_items:
@@ -5451,6 +6306,7 @@ class AppWindow:
 
         # Mise à jour du marqueur (position conservée)
         cur['exercise_code'] = str(ex_code)
+        cur['ex_top'] = _ex_top(str(ex_code))
         cur['exercise_label'] = str(ex_label)
         cur['points'] = float(pts)
 
@@ -5474,6 +6330,7 @@ class AppWindow:
                     continue
             new_anns.append(a)
         anns[:] = new_anns
+        self._invalidate_ann_index()
 
         try:
             self.project.save()
@@ -5485,37 +6342,15 @@ class AppWindow:
         except Exception:
             pass
 
-        # MAJ UI
-        try:
-            self._refresh_marks_list()
-        except Exception:
-            pass
-        try:
-            self._refresh_correction_totals()
-        except Exception:
-            pass
-        try:
-            self._refresh_info_panel()
-        except Exception:
-            pass
+        # MAJ UI (regroupée)
+        self._request_refresh(("marks", "totals", "info"))
 
 
 
     def _scheme_max_total(self) -> float:
         if not self.project:
             return 0.0
-        scheme = self._scheme()
-
-        def total_good(node) -> float:
-            if node.children:
-                return sum(total_good(c) for c in node.children)
-            if node.level() in (1, 2):
-                if node.rubric:
-                    return float(node.rubric.good)
-                return 1.0
-            return 0.0
-
-        return float(sum(total_good(ex) for ex in scheme.exercises))
+        return self._scheme_totals().total
 
 
     def _doc_attrib_total(self) -> float:
@@ -5531,47 +6366,15 @@ class AppWindow:
         doc = self.project.get_current_doc()
         if not doc:
             return 0.0
-        ann = self.project.settings.get("annotations", {})
-        anns = ann.get(doc.id, []) if isinstance(ann, dict) else []
-        if not isinstance(anns, list):
-            return 0.0
 
-        sum_by_ex: dict[str, float] = {}
-        manual_by_ex: dict[str, float] = {}
+        sum_by_ex, manual_by_ex = self._aggregate_scores()
 
-        for a in anns:
-            if not isinstance(a, dict):
-                continue
-            kind = a.get('kind')
-            if kind == 'score_circle':
-                code = str(a.get('exercise_code', '') or '').strip()
-                if not code:
-                    continue
-                ex_code = code.split('.', 1)[0]
-                try:
-                    pts = float(a.get('points', 0.0))
-                except Exception:
-                    pts = 0.0
-                sum_by_ex[ex_code] = sum_by_ex.get(ex_code, 0.0) + float(pts)
-            elif kind == 'manual_score':
-                code = str(a.get('exercise_code', '') or '').strip()
-                if not code:
-                    continue
-                ex_code = code.split('.', 1)[0]
-                try:
-                    pts = float(a.get('points', 0.0))
-                except Exception:
-                    pts = 0.0
-                manual_by_ex[ex_code] = float(pts)
-
-        total = 0.0
-        all_ex = set(sum_by_ex.keys()) | set(manual_by_ex.keys())
-        for ex_code in all_ex:
-            if ex_code in manual_by_ex:
-                total += float(manual_by_ex.get(ex_code, 0.0))
-            else:
-                total += float(sum_by_ex.get(ex_code, 0.0))
-        return float(total)
+        # Valeurs déjà en float (normalisées à l'ingestion) : pas de conversion ici
+        total = sum(manual_by_ex.values(), 0.0)
+        for ex_code, pts in sum_by_ex.items():
+            if ex_code not in manual_by_ex:
+                total += pts
+        return total
 
     def _refresh_correction_totals(self) -> None:
         if not hasattr(self, "c_total_var"):
@@ -5583,11 +6386,30 @@ class AppWindow:
         mx = self._scheme_max_total()
         self.c_total_var.set(f"Total attribué : {attrib:g} / {mx:g}")
 
+    def _invalidate_margin_cache(self) -> None:
+        self._cached_align_margin = None
+        self._cached_margin_x_pt = None
+
+    def _on_corr_margin_cm_written(self) -> None:
+        self._invalidate_margin_cache()
+        # settings["corr_margin_cm"] suit la saisie : _annotations_for_current_doc ne le
+        # resynchronise plus à chaque appel (raccourci _cur_anns).
+        if getattr(self, "project", None):
+            try:
+                self.project.settings["corr_margin_cm"] = float(self._corr_margin_cm())
+            except Exception:
+                pass
+
     def _corr_align_margin_enabled(self) -> bool:
+        cached = self._cached_align_margin
+        if cached is not None:
+            return cached
         try:
-            return bool(getattr(self, "c_align_margin_var", None).get())
+            cached = bool(getattr(self, "c_align_margin_var", None).get())
         except Exception:
             return False
+        self._cached_align_margin = cached
+        return cached
 
     def _corr_margin_cm(self) -> float:
         """Distance (en cm) depuis le bord gauche pour l'alignement dans la marge."""
@@ -5747,8 +6569,11 @@ class AppWindow:
 
         La valeur est clampée pour rester dans la largeur de la page (évite de sortir de la feuille).
         """
-        cm = self._corr_margin_cm()
-        x_pt = float((cm / 2.54) * 72.0)
+        x_pt = self._cached_margin_x_pt
+        if x_pt is None:
+            cm = self._corr_margin_cm()
+            x_pt = float(cm) * CM_TO_PT
+            self._cached_margin_x_pt = x_pt
         return float(self._clamp_x_pt_to_page(page_index, x_pt, radius_pt=radius_pt))
 
 
@@ -5759,31 +6584,26 @@ class AppWindow:
         if not self.project:
             return None, None
         anns = self._annotations_for_current_doc()
-        best_idx = None
-        best_ann = None
-        best_d2 = None
-        for i, a in enumerate(anns):
-            if not isinstance(a, dict) or a.get("kind") != "score_circle":
-                continue
-            if int(a.get("page", -1)) != int(page_index):
-                continue
-            try:
-                ax = float(a.get("x_pt", 0.0))
-                ay = float(a.get("y_pt", 0.0))
-            except Exception:
-                continue
-            dx = ax - x_pt
-            dy = ay - y_pt
+        idx, xs, ys, by_page = self._score_circle_soa(anns)
+        # Conversions faites une fois, hors boucle
+        xq = float(x_pt)
+        yq = float(y_pt)
+        best_k = -1
+        best_d2 = threshold_pt * threshold_pt
+        # Boucle purement numérique sur les pastilles de la page (pas d'accès dict / conversion)
+        for k in by_page.get(int(page_index), ()):
+            dx = xs[k] - xq
+            dy = ys[k] - yq
             d2 = dx*dx + dy*dy
-            if best_d2 is None or d2 < best_d2:
+            if d2 < best_d2 or (best_k < 0 and d2 == best_d2):
                 best_d2 = d2
-                best_idx = i
-                best_ann = a
-        if best_idx is None or best_ann is None:
+                best_k = k
+                if d2 < 1.0:
+                    break  # moins d'un point : impossible de faire mieux à l'écran
+        if best_k < 0:
             return None, None
-        if best_d2 is not None and best_d2 <= threshold_pt*threshold_pt:
-            return best_idx, best_ann
-        return None, None
+        i = idx[best_k]
+        return i, anns[i]
 
 
     def _popup_choose_pastille_result(self, x_root: int | None, y_root: int | None, current: str = "good") -> str | None:
@@ -5925,9 +6745,8 @@ class AppWindow:
 
                 code0 = str(ann_hit.get('exercise_code', '') or '')
                 # recalcul points selon le barème
-                scheme = self._scheme()
                 try:
-                    pts0 = float(points_for(scheme, code0, choice))
+                    pts0 = float(self._points_for(code0, choice))
                 except Exception:
                     pts0 = float(ann_hit.get('points', 0.0) or 0.0)
 
@@ -5937,6 +6756,7 @@ class AppWindow:
                     pass
                 ann_hit['result'] = choice
                 ann_hit['points'] = float(pts0)
+                self._invalidate_scores()
 
                 st = ann_hit.setdefault('style', {})
                 if isinstance(st, dict):
@@ -5945,17 +6765,12 @@ class AppWindow:
                     st.setdefault('label_dx_pt', 15.0)
                     st['label_style'] = self._get_pastille_label_style()
 
-                try:
-                    self.project.save()
-                except Exception:
-                    pass
+                self._schedule_save(300)
 
-                # regen + UI
-                self.c_regenerate()
-                self._refresh_marks_list()
-                self._refresh_files_list()
-                self._refresh_info_panel()
-                self._refresh_correction_totals()
+                # regen (page de la pastille seulement, hors thread Tk) + UI
+                self._schedule_regenerate(delay_ms=20, pages=(int(page_index),))
+                self._marks_apply("update", idx_hit)
+                self._request_refresh(("info", "totals"))
 
                 if hasattr(self, '_click_hint'):
                     self._click_hint.configure(text=f"Mode clic : ON • modif {code0} ({choice})")
@@ -5969,17 +6784,17 @@ class AppWindow:
             return
 
         label = self._selected_leaf_label() or code
-        scheme = self._scheme()
         result = self.c_result_var.get()
-        pts = points_for(scheme, code, result)
+        pts = self._points_for(code, result)
 
         ann = {
-            "id": str(uuid.uuid4()),
+            "id": self._new_ann_id(),
             "kind": "score_circle",
             "page": int(page_index),
             "x_pt": float(self._corr_margin_x_pt(page_index, radius_pt=9.0) if self._corr_align_margin_enabled() else x_pt),
             "y_pt": float(y_pt),
             "exercise_code": code,
+            "ex_top": _ex_top(code),
             "exercise_label": label,
             "result": result,
             "points": float(pts),
@@ -6000,17 +6815,46 @@ class AppWindow:
 
         anns = self._annotations_for_current_doc()
         anns.append(ann)
-        self.project.save()
+        self._invalidate_ann_index()
+        self._schedule_save(300)  # la régénération sauvegarde aussi : une seule écriture au final
 
-        self.c_regenerate()
-        self._refresh_marks_list()
-        self._refresh_files_list()
-        self._refresh_info_panel()
-        self._refresh_correction_totals()
+        # Régénération de la page en arrière-plan (le clic rend la main immédiatement)
+        self._schedule_regenerate(delay_ms=20, pages=(int(page_index),))
+        self._marks_apply("add", len(anns) - 1)
+        self._request_refresh(("files", "info", "totals"))
 
         if hasattr(self, "_click_hint"):
             self._click_hint.configure(text=f"Mode clic : ON • ajout {code} ({result})")
     def _on_pdf_drag_for_correction(self, page_index: int, x_pt: float, y_pt: float) -> None:
+        if not self._drag_active or self._drag_target_idx is None:
+            return
+        # Les événements de mouvement peuvent arriver à 100-200 Hz : on ne garde que le dernier,
+        # appliqué au plus toutes les 16 ms (~60 Hz) par _apply_drag.
+        self._drag_pending = (page_index, x_pt, y_pt)
+        if self._drag_tick is None:
+            try:
+                self._drag_tick = self.root.after(16, self._apply_drag)
+            except Exception:
+                self._apply_drag()
+
+    def _cancel_drag_tick(self) -> None:
+        """Annule l'application différée d'un déplacement en attente (la position finale est posée au relâchement)."""
+        if self._drag_tick is not None:
+            try:
+                self.root.after_cancel(self._drag_tick)
+            except Exception:
+                pass
+        self._drag_tick = None
+        self._drag_pending = None
+
+    def _apply_drag(self) -> None:
+        """Applique la dernière position reçue pendant le glisser d'une pastille."""
+        self._drag_tick = None
+        pending = self._drag_pending
+        self._drag_pending = None
+        if pending is None:
+            return
+        page_index, x_pt, y_pt = pending
         if not (hasattr(self, "c_move_var") and self.c_move_var.get()):
             return
         if not self._drag_active or self._drag_target_idx is None:
@@ -6019,20 +6863,24 @@ class AppWindow:
             return
 
         anns = self._annotations_for_current_doc()
-        if self._drag_target_idx < 0 or self._drag_target_idx >= len(anns):
+        i = self._drag_target_idx
+        if i < 0 or i >= len(anns):
             return
-        ann = anns[self._drag_target_idx]
-        if not isinstance(ann, dict) or ann.get("kind") != "score_circle":
+        ann = anns[i]
+        if not isinstance(ann, dict):
             return
-        if int(ann.get("page", -1)) != int(page_index):
+        get = ann.get
+        if get("kind") != "score_circle" or int(get("page", -1)) != int(page_index):
             return
 
         x_use = self._corr_margin_x_pt(page_index, radius_pt=9.0) if self._corr_align_margin_enabled() else x_pt
 
-
         ann["x_pt"] = float(x_use)
         ann["y_pt"] = float(y_pt)
+        self._invalidate_score_soa()
+
     def _on_pdf_release_for_correction(self, page_index: int, x_pt: float, y_pt: float) -> None:
+        self._cancel_drag_tick()
         if not (hasattr(self, "c_move_var") and self.c_move_var.get()):
             return
         if not self._drag_active or self._drag_target_idx is None:
@@ -6042,6 +6890,9 @@ class AppWindow:
 
         assert self.project is not None
 
+        # Pages touchées : ancienne et nouvelle page de la pastille (régénération partielle)
+        pages = {int(page_index)}
+
         # Applique la position finale au relâchement (plus robuste que dépendre uniquement de <B1-Motion>)
         try:
             anns = self._annotations_for_current_doc()
@@ -6050,20 +6901,22 @@ class AppWindow:
                 ann = anns[idx]
                 if isinstance(ann, dict) and ann.get("kind") == "score_circle":
                     x_use = self._corr_margin_x_pt(page_index, radius_pt=9.0) if self._corr_align_margin_enabled() else x_pt
+                    pages.add(int(ann.get("page", page_index)))
                     ann["page"] = int(page_index)
                     ann["x_pt"] = float(x_use)
                     ann["y_pt"] = float(y_pt)
+                    self._invalidate_ann_index()
         except Exception:
             pass
 
-        self.project.save()
+        self._schedule_save(300)
 
-        # Re-génère pour appliquer le déplacement dans le PDF
-        self.c_regenerate()
-        self._refresh_marks_list()
-        self._refresh_files_list()
-        self._refresh_info_panel()
-        self._refresh_correction_totals()
+        # Re-génère (pages concernées, en arrière-plan) pour appliquer le déplacement dans le PDF
+        self._schedule_regenerate(delay_ms=20, pages=pages)
+        # déplacement en place : aucun fichier ne change, pas de rafraîchissement de la liste des fichiers
+        if self._drag_target_idx is not None:
+            self._marks_apply("update", int(self._drag_target_idx))
+        self._request_refresh(("info", "totals"))
 
         self._drag_active = False
         self._drag_target_idx = None
@@ -6076,16 +6929,16 @@ class AppWindow:
         if not self._require_doc():
             return
         assert self.project is not None
-        scheme = self._scheme()
-        pts = points_for(scheme, code, result)
+        pts = self._points_for(code, result)
 
         ann = {
-            "id": str(uuid.uuid4()),
+            "id": self._new_ann_id(),
             "kind": "score_circle",
             "page": int(page_index),
             "x_pt": float(self._corr_margin_x_pt(page_index, radius_pt=9.0) if self._corr_align_margin_enabled() else x_pt),
             "y_pt": float(y_pt),
             "exercise_code": code,
+            "ex_top": _ex_top(code),
             "exercise_label": label or code,
             "result": result,
             "points": float(pts),
@@ -6106,38 +6959,22 @@ class AppWindow:
 
         anns = self._annotations_for_current_doc()
         anns.append(ann)
-        self.project.save()
+        self._invalidate_ann_index()
+        self._schedule_save(300)
 
-        self.c_regenerate()
-        self._refresh_marks_list()
-        self._refresh_files_list()
-        self._refresh_info_panel()
-        self._refresh_correction_totals()
+        self._schedule_regenerate(delay_ms=20, pages=(int(page_index),))
+        self._marks_apply("add", len(anns) - 1)
+        self._request_refresh(("files", "info", "totals"))
 
 
     def _corr_refresh_after_change(self) -> None:
-        """Sauvegarde + regeneration + rafraichissement UI (Correction V0)."""
-        try:
-            assert self.project is not None
-            self.project.save()
-        except Exception:
-            pass
+        """Sauvegarde (différée) + regeneration + rafraichissement UI (Correction V0)."""
+        self._schedule_save(300)
         try:
             self.c_regenerate()
         except Exception:
             pass
-        for fn_name in (
-            '_refresh_marks_list',
-            '_refresh_files_list',
-            '_refresh_info_panel',
-            '_refresh_correction_totals',
-        ):
-            try:
-                fn = getattr(self, fn_name, None)
-                if callable(fn):
-                    fn()
-            except Exception:
-                pass
+        self._request_refresh(("marks", "files", "info", "totals"))
 
     def _corr_edit_pastille_at_index(self, ann_index: int, x_root: int | None = None, y_root: int | None = None) -> None:
         """Edition rapide d'une pastille existante (palette vert/orange/rouge)."""
@@ -6162,14 +6999,14 @@ class AppWindow:
             return
 
         code0 = str(ann.get('exercise_code', '') or '').strip()
-        scheme = self._scheme()
         try:
-            pts = float(points_for(scheme, code0, choice))
+            pts = float(self._points_for(code0, choice))
         except Exception:
             pts = float(ann.get('points', 0.0) or 0.0)
 
         ann['result'] = choice
         ann['points'] = float(pts)
+        self._invalidate_scores()
 
         st = ann.setdefault('style', {})
         if isinstance(st, dict):
@@ -6203,6 +7040,7 @@ class AppWindow:
             pass
         try:
             del anns[ann_index]
+            self._invalidate_ann_index()
         except Exception:
             return
         self._corr_refresh_after_change()
@@ -6224,10 +7062,9 @@ class AppWindow:
             pass
 
         import copy as _copy
-        import uuid as _uuid
 
         dup = _copy.deepcopy(base)
-        dup['id'] = str(_uuid.uuid4())
+        dup['id'] = self._new_ann_id()
 
         # Decale legerement pour rendre la duplication visible
         try:
@@ -6252,6 +7089,7 @@ class AppWindow:
             anns.insert(ann_index + 1, dup)
         except Exception:
             anns.append(dup)
+        self._invalidate_ann_index()
 
         self._corr_refresh_after_change()
 
@@ -6283,19 +7121,7 @@ class AppWindow:
             return
 
         # Total auto (pastilles) pour cet exercice principal
-        total_auto = 0.0
-        for a in anns:
-            if not (isinstance(a, dict) and a.get('kind') == 'score_circle'):
-                continue
-            c = str(a.get('exercise_code', '') or '').strip()
-            if not c:
-                continue
-            if c.split('.', 1)[0] != ex_code:
-                continue
-            try:
-                total_auto += float(a.get('points', 0.0) or 0.0)
-            except Exception:
-                pass
+        total_auto = self._aggregate_scores()[0].get(ex_code, 0.0)
 
         # Position (sur la pastille cliqued)
         try:
@@ -6316,12 +7142,8 @@ class AppWindow:
 
         # Cherche un manuel existant pour cet exercice
         ms_idx = None
-        for i, a in enumerate(anns):
-            if not (isinstance(a, dict) and a.get('kind') == 'manual_score'):
-                continue
-            c = str(a.get('exercise_code', '') or '').strip()
-            c = c.split('.', 1)[0] if c else ''
-            if c == ex_code:
+        for i in self._ann_indices_of_kind(anns, 'manual_score'):
+            if anns[i].get('ex_top') == ex_code:
                 ms_idx = i
                 break
 
@@ -6334,6 +7156,7 @@ class AppWindow:
                 anns[ms_idx]['points'] = float(total_auto)
             except Exception:
                 pass
+            self._invalidate_ann_index()
             try:
                 self.project.save()
             except Exception:
@@ -6363,8 +7186,8 @@ class AppWindow:
                 ex_label = f"Exercice {ex_code}"
                 try:
                     for ex in self._scheme().exercises:
-                        if str(getattr(ex, 'code', '')) == str(ex_code):
-                            ex_label = str(getattr(ex, 'label', ex_label) or ex_label)
+                        if ex.code == str(ex_code):
+                            ex_label = str(ex.label or ex_label)
                             break
                 except Exception:
                     pass
@@ -6379,15 +7202,16 @@ class AppWindow:
                             continue
                     kept.append(a)
                 anns[:] = kept
+                self._invalidate_ann_index()
 
-                import uuid as _uuid
                 anns.append({
-                    'id': str(_uuid.uuid4()),
+                    'id': self._new_ann_id(),
                     'kind': 'manual_score',
                     'page': int(page_index),
                     'x_pt': float(x_use),
                     'y_pt': float(y_use),
                     'exercise_code': str(ex_code),
+                    'ex_top': _ex_top(str(ex_code)),
                     'exercise_label': str(ex_label),
                     'points': float(total_auto),
                     'style': {
@@ -6399,6 +7223,7 @@ class AppWindow:
                     },
                     'payload': {'tag': 'manual_score'},
                 })
+                self._invalidate_ann_index()
 
                 try:
                     self.project.save()
@@ -6412,6 +7237,7 @@ class AppWindow:
             try:
                 anns = self._annotations_for_current_doc()
                 anns[:] = [a for a in anns if not (isinstance(a, dict) and a.get('kind') == 'score_circle' and str(a.get('exercise_code', '') or '').strip().split('.', 1)[0] == ex_code)]
+                self._invalidate_ann_index()
                 self.project.save()
             except Exception:
                 pass
@@ -6426,8 +7252,6 @@ class AppWindow:
         if not self.project:
             return
 
-        scheme = self._scheme()
-
         # Evite la fuite de ressources Tk (Windows) : si on recrée des menus sans les détruire,
         # on finit par atteindre la limite "No more menus can be allocated".
         # On détruit donc explicitement l'ancien menu (si présent) et on détruit aussi
@@ -6446,6 +7270,33 @@ class AppWindow:
         except Exception:
             pass
 
+        move_mode = hasattr(self, 'c_move_var') and self.c_move_var.get()
+
+        # Actions rapides : clic-droit sur une pastille existante
+        idx_hit, ann_hit = None, None
+        if not move_mode:
+            try:
+                idx_hit, ann_hit = self._find_nearest_marker(page_index, x_pt, y_pt, threshold_pt=18.0)
+            except Exception:
+                idx_hit, ann_hit = None, None
+
+        # Cas courant (poser une pastille) : menu du barème en cache, seules les coordonnées changent
+        if not move_mode and not (idx_hit is not None and isinstance(ann_hit, dict)):
+            self._ctx_page, self._ctx_x, self._ctx_y = int(page_index), float(x_pt), float(y_pt)
+            menu = self._scheme_ctx_menu()
+            try:
+                menu.entryconfigure(0, state='normal' if self._can_undo() else 'disabled')
+            except Exception:
+                pass
+            try:
+                menu.tk_popup(x_root, y_root)
+            finally:
+                try:
+                    menu.grab_release()
+                except Exception:
+                    pass
+            return
+
         menu = tk.Menu(self.root, tearoff=0)
         self._pdf_ctx_menu = menu
 
@@ -6487,7 +7338,7 @@ class AppWindow:
             pass
 
         # Si mode déplacer actif : on affiche seulement Annuler (évite les conflits)
-        if hasattr(self, 'c_move_var') and self.c_move_var.get():
+        if move_mode:
             menu.add_command(label='Fermer', command=_destroy_ctx_menu)
             try:
                 menu.tk_popup(x_root, y_root)
@@ -6498,12 +7349,7 @@ class AppWindow:
                     pass
             return
 
-        # Actions rapides : clic-droit sur une pastille existante
-        try:
-            idx_hit, ann_hit = self._find_nearest_marker(page_index, x_pt, y_pt, threshold_pt=18.0)
-        except Exception:
-            idx_hit, ann_hit = None, None
-
+        # Clic-droit sur une pastille existante
         if idx_hit is not None and isinstance(ann_hit, dict):
             ex_code = str(ann_hit.get('exercise_code', '') or '').strip()
             ex_code = ex_code.split('.', 1)[0] if ex_code else ''
@@ -6544,36 +7390,56 @@ class AppWindow:
                     pass
             return
 
+    def _scheme_ctx_menu(self) -> tk.Menu:
+        """Menu clic-droit hiérarchique Exercice -> Sous-niveau -> (sous-sous) -> Bonne/Partielle/Mauvaise.
+
+        Construit une fois par version du barème (cf. _scheme_ver) puis réutilisé : il n'est
+        pas détruit à la fermeture, et l'ancien est détruit (avec ses sous-menus) à la reconstruction.
+        """
+        ver = self._scheme_ver()
+        menu = self._ctx_menu
+        if menu is not None and self._ctx_menu_ver == ver:
+            try:
+                if menu.winfo_exists():
+                    return menu
+            except Exception:
+                pass
+        if menu is not None:
+            try:
+                menu.destroy()
+            except Exception:
+                pass
+            self._ctx_menu = None
+
+        scheme = self._scheme()
+
+        def _dark(m: tk.Menu) -> tk.Menu:
+            # tentative thème sombre (sur certains OS, le menu reste natif)
+            try:
+                m.configure(bg=DARK_BG_2, fg="white", activebackground="#2F81F7", activeforeground="white")
+            except Exception:
+                pass
+            return m
+
+        menu = _dark(tk.Menu(self.root, tearoff=0))
+
+        # Entrée 0 : Annuler (état mis à jour à chaque affichage)
+        accel = 'Cmd+Z' if sys.platform == 'darwin' else 'Ctrl+Z'
+        menu.add_command(label=f'Annuler ({accel})', command=self.undo_last_action)
+        menu.add_separator()
+
         if not scheme.exercises:
             menu.add_command(label="(Aucun barème défini)", state="disabled")
         else:
             def add_leaf(parent_menu: tk.Menu, code: str, label: str):
-                leaf_menu = tk.Menu(parent_menu, tearoff=0)
-                try:
-                    leaf_menu.configure(bg=DARK_BG_2, fg="white", activebackground="#2F81F7", activeforeground="white")
-                except Exception:
-                    pass
-
-                leaf_menu.add_command(
-                    label="Bonne (vert)",
-                    command=lambda c=code, l=label: self._add_score_circle_at(page_index, x_pt, y_pt, c, l, "good")
-                )
-                leaf_menu.add_command(
-                    label="Partielle (orange)",
-                    command=lambda c=code, l=label: self._add_score_circle_at(page_index, x_pt, y_pt, c, l, "partial")
-                )
-                leaf_menu.add_command(
-                    label="Mauvaise (rouge)",
-                    command=lambda c=code, l=label: self._add_score_circle_at(page_index, x_pt, y_pt, c, l, "bad")
-                )
+                leaf_menu = _dark(tk.Menu(parent_menu, tearoff=0))
+                leaf_menu.add_command(label="Bonne (vert)", command=partial(self._ctx_add, code, label, "good"))
+                leaf_menu.add_command(label="Partielle (orange)", command=partial(self._ctx_add, code, label, "partial"))
+                leaf_menu.add_command(label="Mauvaise (rouge)", command=partial(self._ctx_add, code, label, "bad"))
                 parent_menu.add_cascade(label=f"{code} — {label}", menu=leaf_menu)
 
             for ex in scheme.exercises:
-                ex_menu = tk.Menu(menu, tearoff=0)
-                try:
-                    ex_menu.configure(bg=DARK_BG_2, fg="white", activebackground="#2F81F7", activeforeground="white")
-                except Exception:
-                    pass
+                ex_menu = _dark(tk.Menu(menu, tearoff=0))
 
                 # niveaux 1 : ex.children
                 if not ex.children:
@@ -6582,11 +7448,7 @@ class AppWindow:
                 else:
                     for sub in ex.children:
                         if sub.children:
-                            sub_menu = tk.Menu(ex_menu, tearoff=0)
-                            try:
-                                sub_menu.configure(bg=DARK_BG_2, fg="white", activebackground="#2F81F7", activeforeground="white")
-                            except Exception:
-                                pass
+                            sub_menu = _dark(tk.Menu(ex_menu, tearoff=0))
                             for sub2 in sub.children:
                                 add_leaf(sub_menu, sub2.code, sub2.label)
                             ex_menu.add_cascade(label=f"{sub.code} — {sub.label}", menu=sub_menu)
@@ -6595,19 +7457,16 @@ class AppWindow:
 
                 menu.add_cascade(label=f"{ex.code} — {ex.label}", menu=ex_menu)
 
-        # Option pratique : si tu veux juste sélectionner dans le panneau sans poser
         menu.add_separator()
-        menu.add_command(label="Fermer", command=_destroy_ctx_menu)
-
-        try:
-            menu.tk_popup(x_root, y_root)
-        finally:
-            try:
-                menu.grab_release()
-            except Exception:
-                pass
+        menu.add_command(label="Fermer", command=menu.unpost)
 
+        self._ctx_menu = menu
+        self._ctx_menu_ver = self._scheme_ver()
+        return menu
 
+    def _ctx_add(self, code: str, label: str, result: str) -> None:
+        """Commande du menu barème : pastille à la position du dernier clic-droit."""
+        self._add_score_circle_at(self._ctx_page, self._ctx_x, self._ctx_y, code, label, result)
 
 
         # ---------------- Launch ----------------
@@ -6641,8 +7500,14 @@ class AppWindow:
 
         doc.variants["corrected"] = self.project.abs_to_rel(out_pdf)
         self.project.current_variant = "corrected"
-        self.project.save()
+        self._save_now()
+        self._regen_base_by_doc[doc.id] = str(doc.variants["margin"])
+        self._regen_seq += 1
 
+        self._after_regenerate(out_pdf)
+
+    def _after_regenerate(self, out_pdf: Path) -> None:
+        """Ré-ouvre le PDF corrigé dans la vue après une régénération."""
         # Rafraîchissement robuste (important en version packagée .exe : les exceptions Tk peuvent être silencieuses)
         def _open_corrected_after_regen():
             try:
@@ -6690,13 +7555,15 @@ class AppWindow:
                 self._push_scores_undo('Supprimer dernière')
         except Exception:
             pass
-        anns.pop()
+        removed = anns.pop()
+        self._invalidate_ann_index()
         assert self.project is not None
-        self.project.save()
-        self.c_regenerate()
-        self._refresh_marks_list()
-        self._refresh_files_list()
-        self._refresh_info_panel()
+        self._schedule_save(300)
+        # Régénération de la page concernée en arrière-plan (comme pour l'ajout / le déplacement)
+        pages = (int(removed.get("page", 0)),) if isinstance(removed, dict) else None
+        self._schedule_regenerate(delay_ms=20, pages=pages)
+        self._marks_apply("delete", len(anns))
+        self._request_refresh(("files", "info"))
 
     def c_delete_selected(self) -> None:
         """Supprime la marque sélectionnée dans la liste Correction V0.
@@ -6725,7 +7592,7 @@ class AppWindow:
 
         # Fallback (ancienne logique) : uniquement pastilles
         if ann_idx is None:
-            score_idxs = [i for i, a in enumerate(anns) if isinstance(a, dict) and a.get('kind') == 'score_circle']
+            score_idxs = self._ann_indices_of_kind(anns, 'score_circle')
             if idx < 0 or idx >= len(score_idxs):
                 return
             ann_idx = score_idxs[idx]
@@ -6739,17 +7606,18 @@ class AppWindow:
             pass
 
         try:
-            del anns[ann_idx]
+            removed = anns.pop(ann_idx)
+            self._invalidate_ann_index()
         except Exception:
             return
 
         assert self.project is not None
-        self.project.save()
-        self.c_regenerate()
-        self._refresh_marks_list()
-        self._refresh_files_list()
-        self._refresh_info_panel()
-        self._refresh_correction_totals()
+        self._schedule_save(300)
+        # Régénération de la page concernée en arrière-plan (comme pour l'ajout / le déplacement)
+        pages = (int(removed.get("page", 0)),) if isinstance(removed, dict) else None
+        self._schedule_regenerate(delay_ms=20, pages=pages)
+        self._marks_apply("delete", ann_idx)
+        self._request_refresh(("files", "info", "totals"))
 
     # ---------------- Infos : points attribués / max ----------------
 
@@ -6757,107 +7625,38 @@ class AppWindow:
 
     def _remove_final_note_annotations(self, anns: list[dict]) -> int:
         """Supprime les annotations de type 'note finale' (tag final_note). Retourne le nombre supprimé."""
-        removed = 0
-        kept: list[dict] = []
-        for a in anns:
-            try:
-                if isinstance(a, dict) and a.get("kind") == "textbox":
-                    payload = a.get("payload") or {}
-                    if isinstance(payload, dict) and payload.get("tag") in ("final_note", "final_note_marker"):
-                        removed += 1
-                        continue
-            except Exception:
-                pass
-            kept.append(a)
-        anns[:] = kept
-        return removed
+        # Seules les zones de texte sont examinées ; suppression en place, de la fin vers le début
+        drop: list[int] = []
+        for i in self._ann_indices_of_kind(anns, "textbox"):
+            payload = anns[i].get("payload") or {}
+            if isinstance(payload, dict) and payload.get("tag") in ("final_note", "final_note_marker"):
+                drop.append(i)
+        for i in reversed(drop):
+            del anns[i]
+        if drop:
+            self._invalidate_ann_index()
+        return len(drop)
 
     def _build_final_note_text(self) -> str:
         """Construit le texte du récapitulatif (points par exercice + total + note /20)."""
         if not self.project or not self.project.get_current_doc():
             return ""
 
-        scheme = self._scheme()
-
-        def total_good(node) -> float:
-            if getattr(node, "children", None):
-                return float(sum(total_good(c) for c in node.children))
-            try:
-                lvl = int(node.level())
-            except Exception:
-                lvl = 0
-            if lvl in (1, 2):
-                rub = getattr(node, "rubric", None)
-                if rub is not None:
-                    try:
-                        return float(rub.good)
-                    except Exception:
-                        return 1.0
-                return 1.0
-            return 0.0
-
-        max_by_ex: dict[str, float] = {}
-        for ex in scheme.exercises:
-            try:
-                ex_code = str(ex.code)
-            except Exception:
-                continue
-            max_by_ex[ex_code] = float(total_good(ex))
-
-        # Attribué depuis les pastilles
-        attrib_by_ex: dict[str, float] = {k: 0.0 for k in max_by_ex.keys()}
-        anns = self._annotations_for_current_doc()
-        for a in anns:
-            if not isinstance(a, dict) or a.get("kind") != "score_circle":
-                continue
-            code = str(a.get("exercise_code", "")).strip()
-            if not code:
-                continue
-            ex_code = code.split(".", 1)[0]
-            try:
-                pts = float(a.get("points", 0.0))
-            except Exception:
-                pts = 0.0
-            attrib_by_ex[ex_code] = attrib_by_ex.get(ex_code, 0.0) + pts
-
-        # Points manuels: remplace le total des pastilles pour l'exercice principal
-        manual_set: set[str] = set()
-        for a in anns:
-            if not isinstance(a, dict) or a.get("kind") != "manual_score":
-                continue
-            code = str(a.get("exercise_code", "")).strip()
-            if not code:
-                continue
-            ex_code = code.split(".", 1)[0]
-            if ex_code not in attrib_by_ex:
-                continue
-            try:
-                pts = float(a.get("points", 0.0))
-            except Exception:
-                pts = 0.0
-            attrib_by_ex[ex_code] = float(pts)
-            manual_set.add(ex_code)
-
-        def sort_key_ex(s: str):
-            try:
-                return (0, int(s))
-            except Exception:
-                return (1, s)
-
-        max_total = float(sum(max_by_ex.values()))
-        attrib_total = float(sum(attrib_by_ex.values()))
-
-        lines: list[str] = []
-        lines.append("RÉCAPITULATIF")
-        for ex_code in sorted(max_by_ex.keys(), key=sort_key_ex):
-            mx = float(max_by_ex.get(ex_code, 0.0))
-            at = float(attrib_by_ex.get(ex_code, 0.0))
-            # format compact (préserve la largeur de la marge)
-            prefix = f"Ex {ex_code}"
-            # Marque de points manuels: indique par "*" dans le récapitulatif
-            if 'manual_set' in locals() and ex_code in manual_set:
-                prefix = f"{prefix}*"
-            lines.append(f"{prefix} : {at:g}/{mx:g}")
+        # Lignes par exercice (chaînes déjà formatées, partagées avec le panneau Infos).
+        # Même résultat (objet mis en cache) que lors du dernier appel -> même texte.
+        ex_rows = self._ex_score_rows()
+        cached = self._final_note_cache
+        if cached is not None and cached[0] is ex_rows:
+            return cached[1]
+        rows, attrib_total = ex_rows
+        max_total = self._scheme_totals().total
+
+        lines: list[str] = ["RÉCAPITULATIF"]
+        # format compact (préserve la largeur de la marge) ; "*" = points manuels
+        lines.extend(
+            f"Ex {ex_code}{'*' if manual else ''} : {at_s}/{mx_s}"
+            for ex_code, at_s, mx_s, manual in rows
+        )
 
         lines.append("")
         lines.append(f"Total : {attrib_total:g}/{max_total:g}")
@@ -6865,13 +7664,53 @@ class AppWindow:
         if max_total > 0:
             note20 = round(20.0 * attrib_total / max_total, 2)
             # joli : 14.0 -> 14
-            if abs(note20 - round(note20)) < 1e-9:
-                note20_s = f"{int(round(note20))}"
-            else:
-                note20_s = f"{note20:g}"
+            int_note20 = int(note20)
+            note20_s = str(int_note20) if int_note20 == note20 else f"{note20:g}"
             lines.append(f"Note : {note20_s}/20")
 
-        return "\n".join(lines).strip()
+        text = "\n".join(lines).strip()
+        self._final_note_cache = (ex_rows, text)
+        return text
+    def _pdf_page_size(self, pdf_path: Path, page_index: int) -> tuple[int, float, float]:
+        """(page effective, largeur, hauteur) en points d'une page du PDF, sans rouvrir un fichier inchangé.
+
+        Page hors bornes -> première page. Lève une exception si le PDF est illisible.
+        """
+        key = str(pdf_path)
+        st = os.stat(key)
+        sig = (st.st_mtime_ns, st.st_size)
+        hit = self._page_size_cache.get(key)
+        if hit is None or hit[0] != sig:
+            hit = (sig, -1, {})
+        page_count, sizes = hit[1], hit[2]
+        if page_count >= 0:
+            if page_index < 0 or page_index >= page_count:
+                page_index = 0
+            wh = sizes.get(page_index)
+            if wh is not None:
+                return page_index, wh[0], wh[1]
+        with closing(fitz.open(key)) as pdf:
+            page_count = int(pdf.page_count)
+            if page_index < 0 or page_index >= page_count:
+                page_index = 0
+            r = pdf.load_page(page_index).rect
+            sizes[page_index] = (float(r.width), float(r.height))
+        self._page_size_cache[key] = (sig, page_count, sizes)
+        w, h = sizes[page_index]
+        return page_index, w, h
+
+    # Styles de la note finale et de son marqueur : copiés (copie superficielle) à chaque insertion
+    _FINAL_NOTE_STYLE = {
+        "color": "rouge",
+        "fontsize": 11.0,
+        "fontname": "Helvetica",
+        "border_color": "rouge",
+        "border_width_pt": 1.3,
+        "padding_pt": 5.0,
+        "bold_total": True,
+    }
+    _FINAL_NOTE_MARKER_STYLE = {"color": "#FFFFFF", "fontsize": 1.0, "fontname": "Helvetica", "padding_pt": 0.0}
+
     def c_insert_final_note(self) -> None:
         if not self._require_doc():
             return
@@ -6913,8 +7752,8 @@ class AppWindow:
 
         # Marges disponibles (cm)
         left_cm, right_cm = self._get_project_margins_lr()
-        left_pt = (left_cm / 2.54) * 72.0
-        right_pt = (right_cm / 2.54) * 72.0
+        left_pt = left_cm * CM_TO_PT
+        right_pt = right_cm * CM_TO_PT
 
         # Choix du placement :
         # - si une marge est suffisamment large, on place le cadre dedans
@@ -6927,19 +7766,11 @@ class AppWindow:
         elif right_pt >= MIN_MARGIN_PT:
             placement = "right_margin"
 
-        # Dimensions page
+        # Dimensions page (mises en cache tant que le PDF marge n'est pas réécrit)
         try:
-            pdf = fitz.open(str(base_pdf))
-            try:
-                if page_index < 0 or page_index >= pdf.page_count:
-                    page_index = 0
-                page = pdf.load_page(page_index)
-                w = float(page.rect.width)
-                h = float(page.rect.height)
-            finally:
-                pdf.close()
+            page_index, w, h = self._pdf_page_size(base_pdf, page_index)
         except Exception:
-            w, h = 595.0, 842.0  # A4 portrait approx.
+            w, h = A4_PORTRAIT
 
         pad = 10.0
         y0 = 20.0
@@ -6983,22 +7814,14 @@ class AppWindow:
         anns = self._annotations_for_current_doc()
         self._remove_final_note_annotations(anns)
 
-        ann_style = {
-            "color": "rouge",
-            "fontsize": 11.0,
-            "fontname": "Helvetica",
-            "border_color": "rouge",
-            "border_width_pt": 1.3,
-            "padding_pt": 5.0,
-            "bold_total": True,
-        }
+        ann_style = self._FINAL_NOTE_STYLE.copy()
         if bg_color is not None:
             ann_style["bg_color"] = bg_color
         if bg_opacity is not None:
             ann_style["fill_opacity"] = float(bg_opacity)
 
         ann = {
-            "id": str(uuid.uuid4()),
+            "id": self._new_ann_id(),
             "kind": "textbox",
             "page": int(page_index),
             "rect": rect,
@@ -7013,22 +7836,22 @@ class AppWindow:
         my0 = float(rect[1] + 2.0)
         marker_rect = [mx0, my0, mx0 + 80.0, my0 + 10.0]
         marker_ann = {
-            "id": str(uuid.uuid4()),
+            "id": self._new_ann_id(),
             "kind": "textbox",
             "page": int(page_index),
             "rect": marker_rect,
             "text": "NOTE_FINALE_BOX",
-            "style": {"color": "#FFFFFF", "fontsize": 1.0, "fontname": "Helvetica", "padding_pt": 0.0},
+            "style": self._FINAL_NOTE_MARKER_STYLE.copy(),
             "payload": {"tag": "final_note_marker"},
         }
         anns.append(marker_ann)
+        self._invalidate_ann_index()
 
-        self.project.save()
+        self._schedule_save()
 
-        self.c_regenerate()
-        self._refresh_marks_list()
-        self._refresh_correction_totals()
-        self._refresh_info_panel()
+        # Régénération en arrière-plan (l'ancienne note a pu être sur une autre page : document complet)
+        self._schedule_regenerate(delay_ms=20)
+        self._request_refresh(("marks", "totals", "info"))
 
 
     def c_delete_final_note(self) -> None:
@@ -7040,115 +7863,70 @@ class AppWindow:
             messagebox.showinfo("Correction", "Aucune note finale à supprimer.")
             return
         assert self.project is not None
-        self.project.save()
-        self.c_regenerate()
-        self._refresh_marks_list()
-        self._refresh_correction_totals()
-        self._refresh_info_panel()
+        self._schedule_save()
+        self._schedule_regenerate(delay_ms=20)
+        self._request_refresh(("marks", "totals", "info"))
 
     def _refresh_info_panel(self) -> None:
         if not hasattr(self, "info_tree"):
             return
 
-        for iid in self.info_tree.get_children(""):
-            self.info_tree.delete(iid)
-
         if not self.project:
+            self._info_tree_sync([])
             self.info_doc_var.set("Document : —")
             self.info_total_var.set("— / —")
             return
 
         scheme = self._scheme()
+        st = self._scheme_totals(scheme)
+        max_by_ex = st.max_by_ex
+        label_by_ex: dict[str, str] = {ex.code: ex.label or f"Exercice {ex.code}" for ex in scheme.exercises}
 
-        def total_good(node) -> float:
-            if node.children:
-                return sum(total_good(c) for c in node.children)
-            if node.level() in (1, 2):
-                if node.rubric:
-                    return float(node.rubric.good)
-                return 1.0
-            return 0.0
-
-        max_by_ex: dict[str, float] = {}
-        label_by_ex: dict[str, str] = {}
-        for ex in scheme.exercises:
-            ex_code = ex.code
-            max_by_ex[ex_code] = float(total_good(ex))
-            label_by_ex[ex_code] = ex.label or f"Exercice {ex_code}"
-
-        max_total = sum(max_by_ex.values())
+        max_total = st.total
 
         doc = self.project.get_current_doc()
         if not doc:
             self.info_doc_var.set("Document : — (aucun sélectionné)")
-            for ex_code in sorted(max_by_ex.keys(), key=lambda s: int(s) if s.isdigit() else 9999):
-                self.info_tree.insert("", "end", text=label_by_ex.get(ex_code, f"Exercice {ex_code}"),
-                                      values=("", f"{max_by_ex[ex_code]:g}"))
+            self._info_tree_sync([
+                (ex_code, label_by_ex.get(ex_code, f"Exercice {ex_code}"), ("", f"{max_by_ex[ex_code]:g}"))
+                for ex_code in st.sorted_codes
+            ])
             self.info_total_var.set(f"— / {max_total:g}")
             return
 
         self.info_doc_var.set(f"Document : {doc.original_name}")
 
-        ann = self.project.settings.get("annotations", {})
-        anns = ann.get(doc.id, []) if isinstance(ann, dict) else []
-
-        attrib_by_ex: dict[str, float] = {k: 0.0 for k in max_by_ex.keys()}
-        if isinstance(anns, list):
-            for a in anns:
-                if not isinstance(a, dict):
-                    continue
-                if a.get("kind") != "score_circle":
-                    continue
-                code = str(a.get("exercise_code", "")).strip()
-                if not code:
-                    continue
-                ex_code = code.split(".", 1)[0]
-                try:
-                    pts = float(a.get("points", 0.0))
-                except Exception:
-                    pts = 0.0
-                attrib_by_ex[ex_code] = attrib_by_ex.get(ex_code, 0.0) + pts
-
-        # Points manuels: remplace le total des pastilles pour l'exercice principal
-        manual_set: set[str] = set()
-        if isinstance(anns, list):
-            for a in anns:
-                if not isinstance(a, dict):
-                    continue
-                if a.get("kind") != "manual_score":
-                    continue
-                code = str(a.get("exercise_code", "")).strip()
-                if not code:
-                    continue
-                ex_code = code.split(".", 1)[0]
-                if ex_code not in max_by_ex:
-                    continue
-                try:
-                    pts = float(a.get("points", 0.0))
-                except Exception:
-                    pts = 0.0
-                attrib_by_ex[ex_code] = float(pts)
-                manual_set.add(ex_code)
-
-        attrib_total = sum(attrib_by_ex.values())
-
-        def sort_key_ex(s: str):
-            try:
-                return int(s)
-            except Exception:
-                return 9999
-
-        for ex_code in sorted(max_by_ex.keys(), key=sort_key_ex):
-            attrib = attrib_by_ex.get(ex_code, 0.0)
-            mx = max_by_ex.get(ex_code, 0.0)
+        rows, attrib_total = self._ex_score_rows()
+        out = []
+        for ex_code, at_s, mx_s, manual in rows:
             base_label = label_by_ex.get(ex_code, f"Exercice {ex_code}")
-            if 'manual_set' in locals() and ex_code in manual_set:
+            if manual:
                 base_label = f"{base_label} (manuel)"
-            self.info_tree.insert("", "end", text=base_label,
-                                  values=(f"{attrib:g}", f"{mx:g}"))
+            out.append((ex_code, base_label, (at_s, mx_s)))
+        self._info_tree_sync(out)
 
         self.info_total_var.set(f"{attrib_total:g} / {max_total:g}")
 
+    def _info_tree_sync(self, rows: list[tuple[str, str, tuple[str, str]]]) -> None:
+        """Met info_tree en accord avec `rows` (code, texte, valeurs) sans tout reconstruire.
+
+        Même liste d'exercices (cas courant) : seules les lignes dont le texte ou les valeurs
+        changent sont mises à jour (item). Sinon, l'arbre est reconstruit.
+        """
+        tree = self.info_tree
+        shown = self._info_tree_rows
+        if list(shown) == [r[0] for r in rows]:
+            for code, text, values in rows:
+                if shown[code] != (text, values):
+                    tree.item(f"ex:{code}", text=text, values=values)
+                    shown[code] = (text, values)
+            return
+        tree.delete(*tree.get_children(""))
+        shown.clear()
+        for code, text, values in rows:
+            tree.insert("", "end", iid=f"ex:{code}", text=text, values=values)
+            shown[code] = (text, values)
+
 def run_app() -> None:
     root = tk.Tk()
     AppWindow(root)
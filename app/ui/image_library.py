@@ -26,20 +26,34 @@ Compat :
   on normalise automatiquement.
 """
 
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
+import functools
 import hashlib
 import json
 import os
+import re
 import shutil
 import sys
 import tempfile
+import threading
 import uuid
 import zipfile
 import unicodedata
 
 from PIL import Image
 
+try:
+    import blake3  # type: ignore  # optionnel : empreintes de contenu plus rapides (dédoublonnage)
+except Exception:
+    blake3 = None  # type: ignore
+
+try:
+    import orjson  # optionnel : (dé)sérialisation JSON plus rapide (library.json)
+except Exception:
+    orjson = None  # type: ignore
+
 from app.core.project import Project
 
 
@@ -56,24 +70,26 @@ GLOBAL_LIB_APP_NAME = "Pdf_correction"
 LEGACY_LIB_APP_NAME = "FredC"
 GLOBAL_LIB_SUBDIR = "ImageLibrary"
 GLOBAL_LIB_SETTINGS = "library.json"
+MIGRATION_SENTINEL = ".migrated_from_fredc"
 
 
+@functools.lru_cache(maxsize=4)
 def _user_data_dir_for(app_name: str) -> Path:
-    """Retourne un dossier de données utilisateur (cross-platform) pour `app_name`."""
-    try:
-        if sys.platform.startswith("win"):
-            base = os.getenv("APPDATA") or os.getenv("LOCALAPPDATA")
-            if not base:
-                base = str(Path.home() / "AppData" / "Roaming")
-            return (Path(base) / app_name).resolve()
-        if sys.platform == "darwin":
-            return (Path.home() / "Library" / "Application Support" / app_name).resolve()
-        base = os.getenv("XDG_DATA_HOME")
-        if base:
-            return (Path(base) / app_name).resolve()
-        return (Path.home() / ".local" / "share" / app_name).resolve()
-    except Exception:
-        return (Path.home() / f".{app_name.lower()}").resolve()
+    """Retourne un dossier de données utilisateur (cross-platform) pour `app_name`.
+
+    Chemin non résolu (les appelants résolvent le dossier final) ; mémorisé.
+    """
+    if sys.platform.startswith("win"):
+        base = os.getenv("APPDATA") or os.getenv("LOCALAPPDATA")
+        if not base:
+            base = str(Path.home() / "AppData" / "Roaming")
+        return Path(base) / app_name
+    if sys.platform == "darwin":
+        return Path.home() / "Library" / "Application Support" / app_name
+    base = os.getenv("XDG_DATA_HOME")
+    if base:
+        return Path(base) / app_name
+    return Path.home() / ".local" / "share" / app_name
 
 
 def _user_data_dir() -> Path:
@@ -89,17 +105,35 @@ def _legacy_user_data_dir() -> Path:
 def _maybe_migrate_global_library(new_root: Path) -> None:
     """Migration douce : copie l'ancienne bibliothèque (FredC) vers Pdf_correction si besoin."""
     try:
-        legacy_root = (_legacy_user_data_dir() / GLOBAL_LIB_SUBDIR).resolve()
-        if not (legacy_root / GLOBAL_LIB_SETTINGS).exists():
+        # Migration déjà faite (marqueur) ou nouvelle bibliothèque déjà en place :
+        # tests les moins coûteux d'abord, l'ancien dossier n'est consulté qu'ensuite.
+        if (new_root / MIGRATION_SENTINEL).exists():
             return
-        # Si le nouveau n'a pas encore de settings, on copie/merge.
         if (new_root / GLOBAL_LIB_SETTINGS).exists():
             return
+        legacy_root = (_legacy_user_data_dir() / GLOBAL_LIB_SUBDIR).resolve()
+        if not (legacy_root / GLOBAL_LIB_SETTINGS).exists():
+            return
         new_root.parent.mkdir(parents=True, exist_ok=True)
         shutil.copytree(legacy_root, new_root, dirs_exist_ok=True)
+        try:
+            (new_root / MIGRATION_SENTINEL).touch()
+        except Exception:
+            pass
     except Exception:
         pass
 
+# Dossiers déjà créés dans ce processus (évite des mkdir répétés).
+_dirs_created: set[Path] = set()
+
+
+def _mkdir_once(p: Path) -> None:
+    if p in _dirs_created:
+        return
+    p.mkdir(parents=True, exist_ok=True)
+    _dirs_created.add(p)
+
+
 class _GlobalImageProject:
     """Pseudo-Project minimal pour réutiliser les helpers de bibliothèque d'images.
 
@@ -109,55 +143,127 @@ class _GlobalImageProject:
     def __init__(self, root_dir: Path):
         self.root_dir = Path(root_dir).expanduser().resolve()
         self.settings: Dict[str, Any] = {}
+        # mtime de library.json lors du dernier chargement/enregistrement
+        self._mtime_ns: Optional[int] = None
+        # contenu du dernier enregistrement (save() sans changement => no-op)
+        self._saved_bytes: Optional[bytes] = None
 
     @property
     def settings_file(self) -> Path:
-        return (self.root_dir / GLOBAL_LIB_SETTINGS).resolve()
+        # root_dir est déjà résolu (__init__)
+        return self.root_dir / GLOBAL_LIB_SETTINGS
 
     def save(self) -> None:
-        self.root_dir.mkdir(parents=True, exist_ok=True)
+        _mkdir_once(self.root_dir)
         data = {
             "version": 1,
             "image_categories": self.settings.get("image_categories", [DEFAULT_CATEGORY]),
             "image_library": self.settings.get("image_library", []),
+            "sha_cache_algo": _HASH_ALGO,
+            "sha_cache": _sha_cache_dump(self.root_dir),
         }
-        with self.settings_file.open("w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        if orjson is not None:
+            payload = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+        else:
+            payload = json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+
+        target = self.settings_file
+        if payload == self._saved_bytes:
+            try:
+                if target.stat().st_mtime_ns == self._mtime_ns:
+                    return
+            except Exception:
+                pass
+
+        # Écriture atomique : fichier temporaire dans le même dossier puis os.replace
+        # (un seul write ; library.json jamais laissé à moitié écrit).
+        fd, tmp = tempfile.mkstemp(prefix=".library-", suffix=".tmp", dir=str(self.root_dir))
+        try:
+            try:
+                mv = memoryview(payload)
+                while mv:
+                    mv = mv[os.write(fd, mv):]
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+            try:
+                os.chmod(tmp, 0o644)  # mkstemp crée en 0600
+            except Exception:
+                pass
+            os.replace(tmp, target)
+        except Exception:
+            try:
+                os.unlink(tmp)
+            except Exception:
+                pass
+            raise
+        self._saved_bytes = payload
+        try:
+            self._mtime_ns = target.stat().st_mtime_ns
+        except Exception:
+            self._mtime_ns = None
 
 
 _GLOBAL_CACHE: Optional[_GlobalImageProject] = None
 
 
+def _load_global_settings(gl: _GlobalImageProject) -> None:
+    """(Re)charge library.json dans gl.settings (défauts si absent/illisible)."""
+    gl.settings["image_categories"] = [DEFAULT_CATEGORY]
+    gl.settings["image_library"] = []
+    try:
+        st = gl.settings_file.stat()
+    except Exception:
+        gl._mtime_ns = None
+        return
+    try:
+        if orjson is not None:
+            data = orjson.loads(gl.settings_file.read_bytes())
+        else:
+            with gl.settings_file.open("r", encoding="utf-8") as f:
+                data = json.load(f)
+        if isinstance(data, dict):
+            gl.settings["image_categories"] = data.get("image_categories", [DEFAULT_CATEGORY])
+            gl.settings["image_library"] = data.get("image_library", [])
+            # cache calculé avec un autre algorithme => ignoré
+            if data.get("sha_cache_algo", "sha256") == _HASH_ALGO:
+                _sha_cache_load(gl.root_dir, data.get("sha_cache"))
+    except Exception:
+        gl.settings["image_categories"] = [DEFAULT_CATEGORY]
+        gl.settings["image_library"] = []
+    gl._mtime_ns = st.st_mtime_ns
+
+
 def get_global_library() -> _GlobalImageProject:
-    """Charge (ou crée) la bibliothèque globale d'images."""
+    """Charge (ou crée) la bibliothèque globale d'images.
+
+    L'instance est conservée ; library.json n'est relu que si son mtime a
+    changé (ex. modifié par une autre instance de l'application).
+    """
     global _GLOBAL_CACHE
-    if _GLOBAL_CACHE is not None:
-        return _GLOBAL_CACHE
+    gl = _GLOBAL_CACHE
+    if gl is not None:
+        try:
+            mtime = gl.settings_file.stat().st_mtime_ns
+        except Exception:
+            mtime = None
+        if mtime is None or mtime == gl._mtime_ns:
+            return gl
+        _load_global_settings(gl)
+        _invalidate_resolve_cache()
+        _ensure_categories_list(gl)  # type: ignore[arg-type]
+        _ensure_library_list(gl)     # type: ignore[arg-type]
+        return gl
 
     root = (_user_data_dir() / GLOBAL_LIB_SUBDIR).resolve()
     # Migration douce depuis l'ancien dossier (FredC -> Pdf_correction)
     _maybe_migrate_global_library(root)
     gl = _GlobalImageProject(root)
-    root.mkdir(parents=True, exist_ok=True)
-    (root / "assets" / "images").mkdir(parents=True, exist_ok=True)
+    _mkdir_once(root)
+    _mkdir_once(root / "assets" / "images")
 
-    if gl.settings_file.exists():
-        try:
-            with gl.settings_file.open("r", encoding="utf-8") as f:
-                data = json.load(f)
-            if isinstance(data, dict):
-                gl.settings["image_categories"] = data.get("image_categories", [DEFAULT_CATEGORY])
-                gl.settings["image_library"] = data.get("image_library", [])
-        except Exception:
-            gl.settings["image_categories"] = [DEFAULT_CATEGORY]
-            gl.settings["image_library"] = []
-    else:
-        gl.settings["image_categories"] = [DEFAULT_CATEGORY]
-        gl.settings["image_library"] = []
-        try:
-            gl.save()
-        except Exception:
-            pass
+    # (si absent : défauts en mémoire, écrits par le save() ci-dessous)
+    _load_global_settings(gl)
 
     # normalise
     _ensure_categories_list(gl)  # type: ignore[arg-type]
@@ -167,6 +273,9 @@ def get_global_library() -> _GlobalImageProject:
     # utilisant "-" au lieu de "_" pour le suffixe, ou chemins contenant des quotes).
     try:
         _repair_missing_image_files(gl)  # type: ignore[arg-type]
+    except Exception:
+        pass
+    try:
         gl.save()
     except Exception:
         pass
@@ -174,52 +283,192 @@ def get_global_library() -> _GlobalImageProject:
     return gl
 
 
-def _sha_index(project_like: Any) -> Tuple[Dict[str, str], set[tuple[str, str, str]]]:
-    """Indexe les fichiers présents en SHA256.
+# ASCII : lettres/chiffres/"-"/"_"/espace conservés, le reste supprimé.
+_SAFE_ASCII_TBL = {
+    i: (None if not (chr(i).isalnum() or chr(i) in "-_ ") else i) for i in range(128)
+}
 
-    Retourne:
-      - sha_to_rel: sha256 -> rel
-      - trio_set: (sha256, category, name)
+
+@functools.lru_cache(maxsize=1024)
+def _safe_stem(stem: str, default: str = "image") -> str:
+    """Nom de fichier sûr : alphanumériques, "-", "_" ; espaces -> "_"."""
+    if stem.isascii():
+        safe = stem.translate(_SAFE_ASCII_TBL).strip()
+    else:
+        # caractères non ASCII : isalnum() Unicode (accents conservés)
+        safe = "".join(ch for ch in stem if (ch.isalnum() or ch in ("-", "_", " "))).strip()
+    return safe.replace(" ", "_") or default
+
+
+# Réserve d'octets aléatoires : un os.urandom pour de nombreux noms/identifiants
+# (au lieu d'un uuid4() - donc d'un urandom - par fichier copié / entrée créée).
+_RAND_POOL = bytearray()
+_RAND_POOL_SIZE = 4096
+_RAND_LOCK = threading.Lock()
+
+
+def _rand_hex(nbytes: int) -> str:
+    """nbytes octets aléatoires en hexadécimal (2*nbytes caractères)."""
+    global _RAND_POOL
+    with _RAND_LOCK:
+        if len(_RAND_POOL) < nbytes:
+            _RAND_POOL = bytearray(os.urandom(max(_RAND_POOL_SIZE, nbytes)))
+        out = _RAND_POOL[-nbytes:]
+        del _RAND_POOL[-nbytes:]
+    return out.hex()
+
+
+_IMAGES_REL_PREFIX = IMAGES_DIR_REL + "/"
+
+
+def _new_png_name(stem: str) -> str:
+    """Nom de fichier unique "<stem sûr>_<hex6>.png"."""
+    return f"{_safe_stem((stem or '').strip() or 'image')}_{_rand_hex(3)}.png"
+
+
+def _copy_png(src: Path, dest_dir: Path, stem: str) -> Tuple[str, str]:
+    """Copie src dans dest_dir sous un nom unique "<stem sûr>_<hex6>.png".
+
+    dest_dir doit être déjà résolu (ensure_images_dir). Retourne
+    (chemin absolu, rel "assets/images/...") en str. Lève en cas d'échec.
+    """
+    dest_name = _new_png_name(stem)
+    dest = os.path.join(str(dest_dir), dest_name)
+    _fast_copy(src, dest)
+    return dest, _IMAGES_REL_PREFIX + dest_name
+
+
+def _fast_copy(src: Any, dst: Any) -> None:
+    """Copie src -> dst en laissant le noyau faire le travail, puis copie les métadonnées.
+
+    - Linux : os.copy_file_range (reflink sur btrfs/XFS, copie côté noyau sinon) ;
+    - sinon / en cas d'échec : shutil.copyfile (sendfile, fcopyfile ou CopyFile selon l'OS).
+    """
+    done = False
+    cfr = getattr(os, "copy_file_range", None)
+    if cfr is not None:
+        try:
+            with open(src, "rb") as f_src, open(dst, "wb") as f_dst:
+                size = os.fstat(f_src.fileno()).st_size
+                off = 0
+                while off < size:
+                    n = cfr(f_src.fileno(), f_dst.fileno(), size - off)
+                    if not n:
+                        break
+                    off += n
+            done = off >= size
+        except OSError:
+            done = False
+    if not done:
+        shutil.copyfile(src, dst)
+    try:
+        shutil.copystat(src, dst)
+    except Exception:
+        pass
+
+
+def _images_dir_listing(project_like: Any) -> Tuple[str, set[str]]:
+    """(dossier images résolu, noms des fichiers qu'il contient) : un seul scandir."""
+    names: set[str] = set()
+    try:
+        img_dir = os.path.realpath(Path(getattr(project_like, "root_dir", ".")) / IMAGES_DIR_REL)
+    except Exception:
+        return "", names
+    try:
+        with os.scandir(img_dir) as it:
+            for de in it:
+                try:
+                    if de.is_file():
+                        names.add(de.name)
+                except Exception:
+                    continue
+    except Exception:
+        pass
+    return img_dir, names
+
+
+def _is_listed_file(ap: Path, listing: Tuple[str, set[str]]) -> bool:
+    """ap existe et est un fichier ? (lookup dans le listing, stat sinon)."""
+    img_dir, names = listing
+    if img_dir and str(ap.parent) == img_dir:
+        return ap.name in names
+    return ap.is_file()
+
+
+def _library_files(project_like: Any) -> Tuple[List[Dict[str, Any]], List[str], List[Path]]:
+    """Une passe sur la bibliothèque : entrées dont le fichier existe, avec rel et chemin.
+
+    Cas courant ("assets/images/<nom>" présent dans le listing du dossier) traité
+    sans passer par resolve_image_abs.
     """
-    sha_to_rel: Dict[str, str] = {}
-    trio_set: set[tuple[str, str, str]] = set()
     lib = _ensure_library_list(project_like)  # type: ignore[arg-type]
+    listing = _images_dir_listing(project_like)
+    img_dir, names = listing
+    prefix = _IMAGES_REL_PREFIX
+    plen = len(prefix)
+    items: List[Dict[str, Any]] = []
+    rels: List[str] = []
+    paths: List[Path] = []
     for it in lib:
         try:
-            rel = str(it.get("rel") or "")
+            rel = it["rel"] if "rel" in it else ""
             if not rel:
                 continue
-            ap = resolve_image_abs(project_like, rel)  # type: ignore[arg-type]
-            if not ap.exists() or not ap.is_file():
-                continue
-            sha = _sha256_file(ap)
-            if sha:
-                sha_to_rel.setdefault(sha, rel)
-                cat = str(it.get("category") or DEFAULT_CATEGORY)
-                name = str(it.get("name") or Path(rel).stem)
-                trio_set.add((sha, cat, name))
+            fname = rel[plen:] if rel.startswith(prefix) else ""
+            if img_dir and fname and "/" not in fname and fname in names:
+                ap = Path(img_dir, fname)
+            else:
+                ap = resolve_image_abs(project_like, rel)  # type: ignore[arg-type]
+                if not _is_listed_file(ap, listing):
+                    continue
+            items.append(it)
+            rels.append(rel)
+            paths.append(ap)
         except Exception:
             continue
+    return items, rels, paths
+
+
+def _hashed_library_files(project_like: Any) -> List[Tuple[Dict[str, Any], str, Path, str]]:
+    """(entrée, rel, chemin, empreinte) pour chaque fichier présent : une passe + hachage parallèle."""
+    items, rels, paths = _library_files(project_like)
+    return list(zip(items, rels, paths, _hash_many(paths)))
+
+
+def _sha_index(
+    project_like: Any,
+    files: Optional[List[Tuple[Dict[str, Any], str, Path, str]]] = None,
+) -> Tuple[Dict[str, str], set[tuple[str, str, str]]]:
+    """Indexe les fichiers présents par empreinte de contenu.
+
+    files : résultat de _hashed_library_files, s'il est déjà calculé.
+
+    Retourne:
+      - sha_to_rel: empreinte -> rel
+      - trio_set: (empreinte, category, name)
+    """
+    sha_to_rel: Dict[str, str] = {}
+    trio_set: set[tuple[str, str, str]] = set()
+    if files is None:
+        files = _hashed_library_files(project_like)
+    for it, rel, _ap, sha in files:
+        if sha:
+            sha_to_rel.setdefault(sha, rel)
+            cat = str(it.get("category") or DEFAULT_CATEGORY)
+            name = str(it.get("name") or Path(rel).stem)
+            trio_set.add((sha, cat, name))
     return sha_to_rel, trio_set
 
 
-def _trio_to_entry_map(project: Project) -> Dict[tuple[str, str, str], Dict[str, Any]]:
+def _trio_to_entry_map(
+    project: Project,
+    files: Optional[List[Tuple[Dict[str, Any], str, Path, str]]] = None,
+) -> Dict[tuple[str, str, str], Dict[str, Any]]:
     """Retourne un mapping (sha, cat, name) -> entrée (dict) pour un projet."""
     out: Dict[tuple[str, str, str], Dict[str, Any]] = {}
-    lib = _ensure_library_list(project)
-    for it in lib:
-        if not isinstance(it, dict):
-            continue
-        rel = str(it.get("rel") or "")
-        if not rel:
-            continue
-        ap = resolve_image_abs(project, rel)
-        if not ap.exists() or not ap.is_file():
-            continue
-        try:
-            sha = _sha256_file(ap)
-        except Exception:
-            continue
+    if files is None:
+        files = _hashed_library_files(project)
+    for it, _rel, ap, sha in files:
         if not sha:
             continue
         cat = _normalize_category(str(it.get("category") or DEFAULT_CATEGORY))
@@ -244,6 +493,8 @@ def sync_project_library_to_global(project: Project) -> None:
     g_sha_to_rel, g_trios = _sha_index(gl)
     dest_dir = ensure_images_dir(gl)  # type: ignore[arg-type]
     g_lib = _ensure_library_list(gl)  # type: ignore[arg-type]
+    listing = _images_dir_listing(project)
+    _sha_cache_restore_project(project)
 
     # parcourt les entrées du projet
     for it in list_library(project):
@@ -253,10 +504,10 @@ def sync_project_library_to_global(project: Project) -> None:
         if not rel:
             continue
         src = resolve_image_abs(project, rel)
-        if not src.exists() or not src.is_file():
+        if not _is_listed_file(src, listing):
             continue
         try:
-            sha = _sha256_file(src)
+            sha = _content_hash_cached(src)
         except Exception:
             sha = ""
         if not sha:
@@ -270,16 +521,10 @@ def sync_project_library_to_global(project: Project) -> None:
         if sha in g_sha_to_rel:
             g_rel = g_sha_to_rel[sha]
         else:
-            stem = src.stem.strip() or "image"
-            safe_stem = "".join(ch for ch in stem if (ch.isalnum() or ch in ("-", "_", " "))).strip()
-            safe_stem = safe_stem.replace(" ", "_") or "image"
-            dest_name = f"{safe_stem}_{uuid.uuid4().hex[:6]}.png"
-            dest = (dest_dir / dest_name).resolve()
             try:
-                shutil.copy2(src, dest)
+                _dest, g_rel = _copy_png(src, dest_dir, src.stem)
             except Exception:
                 continue
-            g_rel = Path(IMAGES_DIR_REL, dest_name).as_posix()
             g_sha_to_rel[sha] = g_rel
 
         trio = (sha, cat, name)
@@ -288,7 +533,7 @@ def sync_project_library_to_global(project: Project) -> None:
 
         g_trios.add(trio)
         g_lib.append({
-            "id": uuid.uuid4().hex,
+            "id": _rand_hex(16),
             "name": name,
             "rel": g_rel,
             "category": cat,
@@ -297,6 +542,8 @@ def sync_project_library_to_global(project: Project) -> None:
         })
 
     gl.settings["image_library"] = g_lib
+    _invalidate_resolve_cache()
+    _sha_cache_store_project(project)
     _ensure_categories_list(gl)  # type: ignore[arg-type]
     _ensure_library_list(gl)     # type: ignore[arg-type]
     try:
@@ -317,10 +564,13 @@ def sync_global_library_to_project(project: Project) -> None:
     for c in list_categories(gl):  # type: ignore[arg-type]
         add_category(project, c)
 
-    p_sha_to_rel, p_trios = _sha_index(project)
-    trio_to_entry = _trio_to_entry_map(project)
+    _sha_cache_restore_project(project)
+    p_files = _hashed_library_files(project)
+    p_sha_to_rel, p_trios = _sha_index(project, p_files)
+    trio_to_entry = _trio_to_entry_map(project, p_files)
     dest_dir = ensure_images_dir(project)
     p_lib = _ensure_library_list(project)
+    listing = _images_dir_listing(gl)
 
     for it in list_library(gl):  # type: ignore[arg-type]
         if not isinstance(it, dict):
@@ -329,10 +579,10 @@ def sync_global_library_to_project(project: Project) -> None:
         if not rel:
             continue
         src = resolve_image_abs(gl, rel)  # type: ignore[arg-type]
-        if not src.exists() or not src.is_file():
+        if not _is_listed_file(src, listing):
             continue
         try:
-            sha = _sha256_file(src)
+            sha = _content_hash_cached(src)
         except Exception:
             sha = ""
         if not sha:
@@ -342,26 +592,20 @@ def sync_global_library_to_project(project: Project) -> None:
         name = str(it.get("name") or src.stem)
         add_category(project, cat)
 
-        # assure le fichier
+        # assure le fichier (après ce bloc, sha est toujours dans p_sha_to_rel)
         if sha in p_sha_to_rel:
             p_rel = p_sha_to_rel[sha]
         else:
-            stem = src.stem.strip() or "image"
-            safe_stem = "".join(ch for ch in stem if (ch.isalnum() or ch in ("-", "_", " "))).strip()
-            safe_stem = safe_stem.replace(" ", "_") or "image"
-            dest_name = f"{safe_stem}_{uuid.uuid4().hex[:6]}.png"
-            dest = (dest_dir / dest_name).resolve()
             try:
-                shutil.copy2(src, dest)
+                _dest, p_rel = _copy_png(src, dest_dir, src.stem)
             except Exception:
                 continue
-            p_rel = Path(IMAGES_DIR_REL, dest_name).as_posix()
             p_sha_to_rel[sha] = p_rel
 
         trio = (sha, cat, name)
 
         # Si une entrée existe déjà (même contenu + même catégorie + même nom),
-        # on la complète (global_id) et on s'assure que le fichier est présent.
+        # on la complète (global_id). Le fichier est déjà présent (bloc ci-dessus).
         existing_entry = trio_to_entry.get(trio)
         if isinstance(existing_entry, dict):
             try:
@@ -369,25 +613,11 @@ def sync_global_library_to_project(project: Project) -> None:
                     existing_entry["global_id"] = str(it.get("id") or "")
             except Exception:
                 pass
-            # Si le fichier n'existe pas encore dans le projet, on le copie.
-            if sha not in p_sha_to_rel:
-                stem = src.stem.strip() or "image"
-                safe_stem = "".join(ch for ch in stem if (ch.isalnum() or ch in ("-", "_", " "))).strip()
-                safe_stem = safe_stem.replace(" ", "_") or "image"
-                dest_name = f"{safe_stem}_{uuid.uuid4().hex[:6]}.png"
-                dest = (dest_dir / dest_name).resolve()
-                try:
-                    shutil.copy2(src, dest)
-                    p_rel = Path(IMAGES_DIR_REL, dest_name).as_posix()
-                    existing_entry["rel"] = p_rel
-                    p_sha_to_rel[sha] = p_rel
-                except Exception:
-                    pass
             continue
 
         p_trios.add(trio)
         new_entry = {
-            "id": uuid.uuid4().hex,
+            "id": _rand_hex(16),
             "name": name,
             "rel": p_rel,
             "category": cat,
@@ -399,6 +629,8 @@ def sync_global_library_to_project(project: Project) -> None:
         trio_to_entry[trio] = new_entry
 
     project.settings["image_library"] = p_lib
+    _invalidate_resolve_cache()
+    _sha_cache_store_project(project)
     _ensure_categories_list(project)
     _ensure_library_list(project)
     try:
@@ -408,18 +640,30 @@ def sync_global_library_to_project(project: Project) -> None:
 
 
 def ensure_images_dir(project: Project) -> Path:
-    p = (project.root_dir / IMAGES_DIR_REL).resolve()
-    p.mkdir(parents=True, exist_ok=True)
+    # mémorisé sur le projet (clé : root_dir), appelé plusieurs fois par sync
+    cached = getattr(project, "_images_dir_cache", None)
+    if cached is not None and cached[0] == project.root_dir:
+        _mkdir_once(cached[1])
+        return cached[1]
+    p = _resolved(project.root_dir / IMAGES_DIR_REL)
+    _mkdir_once(p)
+    try:
+        project._images_dir_cache = (project.root_dir, p)  # type: ignore[attr-defined]
+    except Exception:
+        pass
     return p
 
 
+@functools.lru_cache(maxsize=256)
 def _normalize_category(name: str) -> str:
+    # peu de catégories distinctes : résultat mémorisé et internalisé
+    # (clés de dict / trios comparés par identité en priorité)
     s = (name or "").strip()
     if not s:
         return DEFAULT_CATEGORY
     # évite des catégories "vides" ou trop longues
     s = " ".join(s.split())
-    return s[:48]
+    return sys.intern(s[:48])
 
 
 def _ensure_categories_list(project: Project) -> List[str]:
@@ -509,6 +753,13 @@ def _ensure_library_list(project: Project) -> List[Dict[str, Any]]:
         lib = []
         project.settings["image_library"] = lib
 
+    # Déjà normalisée : même liste (identité) et même longueur que lors de la
+    # dernière normalisation. Les ajouts du module passent par des entrées déjà
+    # normalisées, mais changent la longueur => renormalisation prudente.
+    sig = getattr(project, "_img_lib_sig", None)
+    if sig is not None and sig[0] is lib and sig[1] == len(lib):
+        return lib
+
     _ensure_categories_list(project)
 
     out: List[Dict[str, Any]] = []
@@ -526,6 +777,10 @@ def _ensure_library_list(project: Project) -> List[Dict[str, Any]]:
         out.append(entry)
 
     project.settings["image_library"] = out
+    try:
+        project._img_lib_sig = (out, len(out))  # type: ignore[attr-defined]
+    except Exception:
+        pass
     return out
 
 
@@ -541,16 +796,112 @@ def resolve_image_abs(project: Project, rel_or_path: str) -> Path:
     p = Path(s)
     if p.is_absolute():
         return p
+    return Path(_resolve_cached(str(project.root_dir), s))
 
-    base = (project.root_dir / s).resolve()
+
+@functools.lru_cache(maxsize=4096)
+def _resolve_cached(root_str: str, s: str) -> str:
+    """Résolution mémorisée par (dossier racine, chemin relatif).
+
+    Évite de refaire les variantes/globs "best-effort" à chaque appel (sync,
+    index SHA...). Les fonctions qui copient/suppriment des fichiers vident le
+    cache via _invalidate_resolve_cache() ; les appelants vérifient de toute
+    façon exists() sur le résultat.
+    """
+    return str(_resolve_image_abs_uncached(Path(root_str), s))
+
+
+def _invalidate_resolve_cache() -> None:
+    try:
+        _resolve_cached.cache_clear()
+        _dir_index.cache_clear()
+        _realpath_cached.cache_clear()
+    except Exception:
+        pass
+
+
+@functools.lru_cache(maxsize=4096)
+def _realpath_cached(s: str) -> str:
+    return os.path.realpath(s)
+
+
+def _resolved(p: Any) -> Path:
+    """Équivalent de Path(p).resolve() avec os.path.realpath mémorisé."""
+    return Path(_realpath_cached(os.fspath(p)))
+
+
+_DIR_INDEX_KEY_LEN = 3
+
+
+@functools.lru_cache(maxsize=64)
+def _dir_index(dir_str: str) -> Dict[str, List[Tuple[str, str]]]:
+    """Index des .png d'un dossier (un seul scandir).
+
+    Clé : début (normcase) du nom de fichier ; valeur : [(nom normcase, chemin)].
+    Remplace les glob("prefixe*.png") répétés de la résolution best-effort.
+    """
+    out: Dict[str, List[Tuple[str, str]]] = {}
+    try:
+        with os.scandir(dir_str) as it:
+            for de in it:
+                try:
+                    nm = os.path.normcase(de.name)
+                    if not nm.endswith(".png") or not de.is_file():
+                        continue
+                    out.setdefault(nm[:_DIR_INDEX_KEY_LEN], []).append((nm, os.path.realpath(de.path)))
+                except Exception:
+                    continue
+    except Exception:
+        pass
+    return out
+
+
+# Motifs de la résolution best-effort (compilés une fois)
+_RE_SWAP = re.compile(r"^(.*?)([-_])([0-9a-fA-F]{6})(\.png)$")
+_RE_HEX_SFX = re.compile(r"^(.*?)([-_])([0-9a-fA-F]{4,})$")
+_RE_ALNUM_SFX = re.compile(r"^(.*?)([-_])([0-9A-Za-z]{4,16})$")
+_RE_HEX6_END = re.compile(r".*[-_][0-9a-fA-F]{6}$")
+_NORM_KEY_CLEAN = re.compile(r"([-_])[0-9A-Za-z]{4,16}$")
+_NORM_KEY_STRIP = re.compile(r"[^0-9A-Za-z]+")
+_RE_SUFFIX_32 = re.compile(r"([-_])[0-9A-Za-z]{4,32}$")
+_QUOTE_TBL = str.maketrans("", "", "'\"")
+
+
+@functools.lru_cache(maxsize=1024)
+def _norm_key(txt: str) -> str:
+    """Clé de comparaison "fuzzy" d'un nom (sans quotes, suffixe ni ponctuation)."""
+    t = (txt or "")
+    t = t.translate(_QUOTE_TBL)
+    if not t.isascii():
+        t = unicodedata.normalize("NFKD", t)
+    t = _NORM_KEY_CLEAN.sub("", t)
+    t = _NORM_KEY_STRIP.sub("", t)
+    return t.lower()
+
+
+@functools.lru_cache(maxsize=1024)
+def _fold_ascii(txt: str) -> str:
+    """Supprime les accents (NFKD -> ASCII) ; mémorisé."""
+    if txt.isascii():
+        # cas courant : rien à normaliser
+        return txt
+    try:
+        return sys.intern(unicodedata.normalize("NFKD", txt).encode("ascii", "ignore").decode("ascii"))
+    except Exception:
+        return txt
+
+
+def _resolve_image_abs_uncached(root_dir: Path, s: str) -> Path:
+    p = Path(s)
+    base = _resolved(root_dir / s)
     if base.exists():
         return base
 
     # Fallback: de nombreuses bibliothèques stockent les PNG dans assets/images
     # mais certaines anciennes entrées ne contiennent que le nom de fichier.
     try:
-        img_dir = (project.root_dir / IMAGES_DIR_REL).resolve()
-        alt = (img_dir / p.name).resolve()
+        img_dir = _resolved(root_dir / IMAGES_DIR_REL)
+        alt = _resolved(img_dir / p.name)
         if alt.exists() and alt.is_file():
             return alt
     except Exception:
@@ -571,16 +922,14 @@ def resolve_image_abs(project: Project, rel_or_path: str) -> Path:
         name = rel_p.name
 
         # Nettoyage simple
-        cleaned = name.replace("'", "").replace('"', "")
+        cleaned = name.translate(_QUOTE_TBL)
 
         candidates = []
         if cleaned and cleaned != name:
             candidates.append(cleaned)
 
-        import re
-
         # Swap ciblé sur le dernier séparateur avant un suffixe hex de 6 chars
-        m = re.match(r"^(.*?)([-_])([0-9a-fA-F]{6})(\.png)$", cleaned)
+        m = _RE_SWAP.match(cleaned)
         if m:
             alt_sep = "_" if m.group(2) == "-" else "-"
             candidates.append(f"{m.group(1)}{alt_sep}{m.group(3)}{m.group(4)}")
@@ -596,9 +945,9 @@ def resolve_image_abs(project: Project, rel_or_path: str) -> Path:
                 continue
             seen.add(cand)
             if parent:
-                alt = (project.root_dir / parent / cand).resolve()
+                alt = _resolved(root_dir / parent / cand)
             else:
-                alt = (project.root_dir / cand).resolve()
+                alt = _resolved(root_dir / cand)
             if alt.exists() and alt.is_file():
                 return alt
 
@@ -607,12 +956,12 @@ def resolve_image_abs(project: Project, rel_or_path: str) -> Path:
         try:
             # parent vide => on préfère assets/images s'il existe
             if parent:
-                parent_dir = (project.root_dir / parent).resolve()
+                parent_dir = _resolved(root_dir / parent)
             else:
                 try:
-                    parent_dir = (project.root_dir / IMAGES_DIR_REL).resolve()
+                    parent_dir = _resolved(root_dir / IMAGES_DIR_REL)
                 except Exception:
-                    parent_dir = (project.root_dir / "").resolve()
+                    parent_dir = _resolved(root_dir / "")
             if parent_dir.exists() and parent_dir.is_dir():
                 stem = Path(cleaned).stem
                 # 1) Construction de préfixes candidates :
@@ -633,58 +982,42 @@ def resolve_image_abs(project: Project, rel_or_path: str) -> Path:
                     pass
 
                 # suffixe hex classique (nos versions récentes)
-                mm_hex = re.match(r"^(.*?)([-_])([0-9a-fA-F]{4,})$", stem)
+                mm_hex = _RE_HEX_SFX.match(stem)
                 if mm_hex:
                     bases.append(mm_hex.group(1))
 
                 # suffixe alphanum (anciennes versions / variantes)
-                mm_alnum = re.match(r"^(.*?)([-_])([0-9A-Za-z]{4,16})$", stem)
+                mm_alnum = _RE_ALNUM_SFX.match(stem)
                 if mm_alnum:
                     bases.append(mm_alnum.group(1))
 
-                def _fold(txt: str) -> str:
-                    try:
-                        return unicodedata.normalize("NFKD", txt).encode("ascii", "ignore").decode("ascii")
-                    except Exception:
-                        return txt
-
                 # collecte candidats .png dont le nom commence par un de ces préfixes
+                # (index du dossier construit une seule fois, au lieu d'un glob par variante)
+                index = _dir_index(str(parent_dir))
                 cands: list[Path] = []
                 seen_fp: set[str] = set()
                 for bp in bases:
                     bp = (bp or "").strip()
                     if not bp:
                         continue
-                    for bp2 in {bp, bp.replace(" ", "_"), bp.replace("_", "-"), bp.replace("-", "_"), _fold(bp)}:
-                        bp2 = (bp2 or "").strip()
+                    for bp2 in {bp, bp.replace(" ", "_"), bp.replace("_", "-"), bp.replace("-", "_"), _fold_ascii(bp)}:
+                        bp2 = os.path.normcase((bp2 or "").strip())
                         if not bp2:
                             continue
-                        try:
-                            for fp in parent_dir.glob(f"{bp2}*.png"):
-                                try:
-                                    if fp.exists() and fp.is_file():
-                                        key = str(fp.resolve())
-                                        if key not in seen_fp:
-                                            seen_fp.add(key)
-                                            cands.append(fp)
-                                except Exception:
-                                    continue
-                        except Exception:
-                            continue
+                        if len(bp2) >= _DIR_INDEX_KEY_LEN:
+                            bucket = index.get(bp2[:_DIR_INDEX_KEY_LEN], ())
+                        else:
+                            bucket = [x for k, lst in index.items() if k.startswith(bp2) for x in lst]
+                        for nm, fps in bucket:
+                            if nm.startswith(bp2) and fps not in seen_fp:
+                                seen_fp.add(fps)
+                                cands.append(Path(fps))
 
                 if len(cands) == 1:
-                    return cands[0].resolve()
+                    return _resolved(cands[0])
 
                 if cands:
-                    def _norm_key(txt: str) -> str:
-                        t = (txt or "")
-                        t = t.replace("'", "").replace('"', "")
-                        t = unicodedata.normalize("NFKD", t)
-                        t = re.sub(r"([-_])[0-9A-Za-z]{4,16}$", "", t)
-                        t = re.sub(r"[^0-9A-Za-z]+", "", t)
-                        return t.lower()
-
-                    target_keys = {_norm_key(stem), _norm_key(_fold(stem))}
+                    target_keys = {_norm_key(stem), _norm_key(_fold_ascii(stem))}
 
                     best_fp: Path | None = None
                     best_score = -1
@@ -692,7 +1025,7 @@ def resolve_image_abs(project: Project, rel_or_path: str) -> Path:
                         try:
                             st = fp.stem
                             k1 = _norm_key(st)
-                            k2 = _norm_key(_fold(st))
+                            k2 = _norm_key(_fold_ascii(st))
                             score = 0
                             if k1 in target_keys or k2 in target_keys:
                                 score += 100
@@ -701,7 +1034,7 @@ def resolve_image_abs(project: Project, rel_or_path: str) -> Path:
                                     score += 15
                                 if tk and (k2.startswith(tk) or tk.startswith(k2)):
                                     score += 15
-                            if re.match(r".*[-_][0-9a-fA-F]{6}$", st):
+                            if _RE_HEX6_END.match(st):
                                 score += 5
                             try:
                                 score += int(fp.stat().st_mtime) // 100000
@@ -714,7 +1047,7 @@ def resolve_image_abs(project: Project, rel_or_path: str) -> Path:
                             best_fp = fp
 
                     if best_fp is not None and best_score >= 15:
-                        return best_fp.resolve()
+                        return _resolved(best_fp)
         except Exception:
             pass
     except Exception:
@@ -725,7 +1058,11 @@ def resolve_image_abs(project: Project, rel_or_path: str) -> Path:
 
 
 
-def resolve_entry_abs(project_like: object, entry: dict) -> Path:
+def resolve_entry_abs(
+    project_like: object,
+    entry: dict,
+    candidates: Optional[_ImagesDirScan] = None,
+) -> Path:
     """Résout un fichier image à partir d'une entrée de bibliothèque.
 
     Objectif : être robuste même si entry['rel'] est cassé (suffixe différent, renommage, etc.).
@@ -751,8 +1088,8 @@ def resolve_entry_abs(project_like: object, entry: dict) -> Path:
 
     # dossier images
     try:
-        root = Path(getattr(project_like, 'root_dir', '.')).resolve()
-        img_dir = (root / IMAGES_DIR_REL).resolve()
+        root = _resolved(Path(getattr(project_like, 'root_dir', '.')))
+        img_dir = _resolved(root / IMAGES_DIR_REL)
     except Exception:
         img_dir = None
         root = Path('.')
@@ -766,22 +1103,22 @@ def resolve_entry_abs(project_like: object, entry: dict) -> Path:
         cand = (img_dir / f"{eid}.png")
         if cand.exists() and cand.is_file():
             try:
-                entry['rel'] = cand.resolve().relative_to(root).as_posix()
+                entry['rel'] = _resolved(cand).relative_to(root).as_posix()
             except Exception:
                 entry['rel'] = Path(IMAGES_DIR_REL, cand.name).as_posix()
-            return cand.resolve()
+            return _resolved(cand)
         short = eid[:8]
         if short:
-            try:
-                for fp in img_dir.glob(f"*{short}*.png"):
-                    if fp.exists() and fp.is_file():
-                        try:
-                            entry['rel'] = fp.resolve().relative_to(root).as_posix()
-                        except Exception:
-                            entry['rel'] = Path(IMAGES_DIR_REL, fp.name).as_posix()
-                        return fp.resolve()
-            except Exception:
-                pass
+            if candidates is None:
+                candidates = _scan_images_dir(img_dir)
+            for st, _k, fps, _mt in candidates.items:
+                if short in st:
+                    fp = _resolved(Path(fps))
+                    try:
+                        entry['rel'] = fp.relative_to(root).as_posix()
+                    except Exception:
+                        entry['rel'] = Path(IMAGES_DIR_REL, fp.name).as_posix()
+                    return fp
 
     # 3) recherche par préfixe safe_stem (nom utilisateur)
     if img_dir:
@@ -794,20 +1131,19 @@ def resolve_entry_abs(project_like: object, entry: dict) -> Path:
                 stem0 = Path(nm0).stem.strip() or nm0.strip()
             except Exception:
                 stem0 = nm0.strip()
-            safe = "".join(ch for ch in stem0 if (ch.isalnum() or ch in ('-', '_', ' '))).strip()
-            safe = safe.replace(' ', '_') or ''
+            safe = _safe_stem(stem0, '')
             if safe:
-                for pat in (f"{safe}__*.png", f"{safe}_*.png", f"{safe}-*.png", f"{safe}*.png"):
-                    try:
-                        for fp in img_dir.glob(pat):
-                            if fp.exists() and fp.is_file():
-                                try:
-                                    entry['rel'] = fp.resolve().relative_to(root).as_posix()
-                                except Exception:
-                                    entry['rel'] = Path(IMAGES_DIR_REL, fp.name).as_posix()
-                                return fp.resolve()
-                    except Exception:
-                        continue
+                if candidates is None:
+                    candidates = _scan_images_dir(img_dir)
+                for prefix in (f"{safe}__", f"{safe}_", f"{safe}-", safe):
+                    for st, _k, fps, _mt in candidates.items:
+                        if st.startswith(prefix):
+                            fp = _resolved(Path(fps))
+                            try:
+                                entry['rel'] = fp.relative_to(root).as_posix()
+                            except Exception:
+                                entry['rel'] = Path(IMAGES_DIR_REL, fp.name).as_posix()
+                            return fp
 
     # 4) best-effort par nom logique
     base = ''
@@ -818,68 +1154,113 @@ def resolve_entry_abs(project_like: object, entry: dict) -> Path:
     if (not base) and rel:
         base = Path(rel).name
 
-    ap2 = _best_effort_find_png_by_basename(project_like, base)
+    ap2 = _best_effort_find_png_by_basename(project_like, base, candidates)
     if ap2 is not None and ap2.exists() and ap2.is_file():
         try:
-            entry['rel'] = ap2.resolve().relative_to(root).as_posix()
+            entry['rel'] = _resolved(ap2).relative_to(root).as_posix()
         except Exception:
             entry['rel'] = Path(IMAGES_DIR_REL, ap2.name).as_posix()
-        return ap2.resolve()
+        return _resolved(ap2)
 
     if rel:
         return resolve_image_abs(project_like, rel)  # type: ignore[arg-type]
     return Path("")
 
 
-def _best_effort_find_png_by_basename(project_like: object, base_name: str) -> "Path | None":
-    """Recherche un PNG dans assets/images en se basant sur un nom (préfixe/nom logique).
+@functools.lru_cache(maxsize=4096)
+def _norm_base(stem: str) -> str:
+    """Nom "logique" d'un fichier : sans accents, suffixe aléatoire ni ponctuation."""
+    s = (stem or '').strip().translate(_QUOTE_TBL)
+    s = _fold_ascii(s)
+    s = _RE_SUFFIX_32.sub("", s)
+    s = _NORM_KEY_STRIP.sub("", s)
+    return s.lower()
 
-    Sert à réparer les entrées dont 'rel' pointe vers un fichier renommé (suffixe aléatoire différent).
+
+class _ImagesDirScan:
+    """Contenu PNG d'un dossier : liste [(stem, _norm_base(stem), chemin, mtime)]
+    et index exact par nom normalisé (collisions conservées en liste)."""
+
+    def __init__(self, items: List[Tuple[str, str, str, float]]):
+        self.items = items
+        self.by_norm: Dict[str, List[Tuple[str, str, str, float]]] = {}
+        for rec in items:
+            if rec[1]:
+                self.by_norm.setdefault(rec[1], []).append(rec)
+
+
+def _scan_images_dir(img_dir: Path) -> _ImagesDirScan:
+    """Un seul scandir du dossier images (voir _ImagesDirScan).
+
+    À calculer une fois puis passer à _best_effort_find_png_by_basename
+    lorsqu'on cherche plusieurs noms dans le même dossier (réparation).
     """
+    out: List[Tuple[str, str, str, float]] = []
     try:
-        root = Path(getattr(project_like, 'root_dir', '.')).resolve()
-        img_dir = (root / IMAGES_DIR_REL).resolve()
+        with os.scandir(img_dir) as it:
+            for de in it:
+                try:
+                    name = de.name
+                    if name[-4:].lower() != '.png' or not de.is_file():
+                        continue
+                    st = name[:-4]
+                    try:
+                        mtime = de.stat().st_mtime
+                    except Exception:
+                        mtime = 0.0
+                    out.append((st, _norm_base(st), de.path, mtime))
+                except Exception:
+                    continue
+    except Exception:
+        pass
+    return _ImagesDirScan(out)
+
+
+def _images_dir_of(project_like: object) -> "Path | None":
+    try:
+        root = _resolved(Path(getattr(project_like, 'root_dir', '.')))
+        img_dir = _resolved(root / IMAGES_DIR_REL)
         if not img_dir.exists() or not img_dir.is_dir():
             return None
     except Exception:
         return None
+    return img_dir
 
-    import re
 
-    def _fold(s: str) -> str:
-        try:
-            import unicodedata as _ud
-        except Exception:
-            _ud = None
-        try:
-            if _ud is not None:
-                return _ud.normalize('NFKD', s).encode('ascii', 'ignore').decode('ascii')
-        except Exception:
-            pass
-        try:
-            import unicodedata as _ud2
-            return _ud2.normalize('NFKD', s).encode('ascii', 'ignore').decode('ascii')
-        except Exception:
-            return s
+def _best_effort_find_png_by_basename(
+    project_like: object,
+    base_name: str,
+    candidates: Optional[_ImagesDirScan] = None,
+) -> "Path | None":
+    """Recherche un PNG dans assets/images en se basant sur un nom (préfixe/nom logique).
 
-    def _norm_base(stem: str) -> str:
-        s = (stem or '').strip().replace("'", '').replace('"', '')
-        s = _fold(s)
-        s = re.sub(r"([-_])[0-9A-Za-z]{4,32}$", "", s)
-        s = re.sub(r"[^0-9A-Za-z]+", "", s)
-        return s.lower()
+    Sert à réparer les entrées dont 'rel' pointe vers un fichier renommé (suffixe aléatoire différent).
+    candidates : résultat de _scan_images_dir (sinon le dossier est parcouru ici).
+    """
+    if candidates is None:
+        img_dir = _images_dir_of(project_like)
+        if img_dir is None:
+            return None
+        candidates = _scan_images_dir(img_dir)
 
     target = _norm_base(Path(base_name).stem)
     if not target:
         return None
 
+    def _bonus(st: str, mtime: float) -> int:
+        return (2 if _RE_HEX6_END.match(st) else 0) + int(mtime) // 100000
+
+    # Nom normalisé identique : réponse directe (plus récent / suffixe hex en cas de collision)
+    exact = candidates.by_norm.get(target)
+    if exact:
+        rec = max(exact, key=lambda r: _bonus(r[0], r[3]))
+        return _resolved(Path(rec[2]))
+
     best = None
     best_score = -1
 
-    for fp in img_dir.glob('*.png'):
+    for st, k, fps, mtime in candidates.items:
         try:
-            st = fp.stem
-            k = _norm_base(st)
             if not k:
                 continue
             score = 0
@@ -889,21 +1270,16 @@ def _best_effort_find_png_by_basename(project_like: object, base_name: str) -> "
                 score += 40
             elif target in k:
                 score += 15
-            if re.match(r".*[-_][0-9a-fA-F]{6}$", st):
-                score += 2
-            try:
-                score += int(fp.stat().st_mtime) // 100000
-            except Exception:
-                pass
+            score += _bonus(st, mtime)
         except Exception:
             continue
 
         if score > best_score:
             best_score = score
-            best = fp
+            best = fps
 
     if best is not None and best_score >= 15:
-        return best.resolve()
+        return _resolved(Path(best))
     return None
 def _repair_missing_image_files(project_like: Any) -> None:
     """Répare (best-effort) les entrées de bibliothèque dont le fichier rel est cassé.
@@ -920,6 +1296,9 @@ def _repair_missing_image_files(project_like: Any) -> None:
     except Exception:
         return
 
+    # un seul parcours du dossier images pour toutes les entrées à réparer
+    candidates: Optional[_ImagesDirScan] = None
+
     changed = False
     for it in lib:
         if not isinstance(it, dict):
@@ -929,12 +1308,16 @@ def _repair_missing_image_files(project_like: Any) -> None:
             continue
 
         # Chemin direct
-        direct = (Path(getattr(project_like, "root_dir", ".")) / rel).resolve()
+        direct = _resolved(Path(getattr(project_like, "root_dir", ".")) / rel)
         if direct.exists() and direct.is_file():
             continue
 
+        if candidates is None:
+            img_dir = _images_dir_of(project_like)
+            candidates = _scan_images_dir(img_dir) if img_dir is not None else _ImagesDirScan([])
+
         # Résolution best-effort (inclut recherche par ID et nom logique)
-        ap = resolve_entry_abs(project_like, it)
+        ap = resolve_entry_abs(project_like, it, candidates)
         if (not ap.exists()) or (not ap.is_file()):
             ap = resolve_image_abs(project_like, rel)  # type: ignore[arg-type]
         if (not ap.exists() or not ap.is_file()):
@@ -943,15 +1326,15 @@ def _repair_missing_image_files(project_like: Any) -> None:
                 nm = str(it.get('name') or '')
             except Exception:
                 nm = ''
-            ap2 = _best_effort_find_png_by_basename(project_like, nm or Path(rel).name)
+            ap2 = _best_effort_find_png_by_basename(project_like, nm or Path(rel).name, candidates)
             if ap2 is not None and ap2.exists() and ap2.is_file():
                 ap = ap2
 
         if ap.exists() and ap.is_file():
             # On normalise le rel vers le fichier réellement présent
             try:
-                root = Path(getattr(project_like, "root_dir", ".")).resolve()
-                new_rel = ap.resolve().relative_to(root).as_posix()
+                root = _resolved(Path(getattr(project_like, "root_dir", ".")))
+                new_rel = _resolved(ap).relative_to(root).as_posix()
             except Exception:
                 new_rel = Path(IMAGES_DIR_REL, ap.name).as_posix()
 
@@ -1009,8 +1392,7 @@ def add_images_to_library(
             w_px, h_px = 0, 0
 
         stem = src.stem.strip() or "image"
-        safe_stem = "".join(ch for ch in stem if (ch.isalnum() or ch in ("-", "_", " "))).strip()
-        safe_stem = safe_stem.replace(" ", "_") or "image"
+        safe_stem = _safe_stem(stem)
 
         entry_id = uuid.uuid4().hex
         dest_name = f"{safe_stem}__{entry_id[:8]}.png"
@@ -1033,6 +1415,8 @@ def add_images_to_library(
         created.append(entry)
 
     project.settings["image_library"] = lib
+    if created:
+        _invalidate_resolve_cache()
     return created
 
 
@@ -1052,27 +1436,185 @@ def _is_rel_used_in_annotations(project: Project, image_rel: str) -> bool:
     return False
 
 
-def _count_rel_in_library(project: Project, image_rel: str) -> int:
-    """Compte combien d'entrées de bibliothèque pointent vers un même fichier rel."""
+def _rel_used_by_other_entry(project: Project, image_rel: str, exclude_id: Optional[str] = None) -> bool:
+    """True si une entrée de bibliothèque (autre que exclude_id) pointe vers ce fichier rel.
+
+    S'arrête à la première entrée trouvée.
+    """
     lib = _ensure_library_list(project)
     rel = str(image_rel or "").replace("\\", "/")
     if not rel:
-        return 0
-    n = 0
-    for it in lib:
-        if isinstance(it, dict) and str(it.get("rel") or "").replace("\\", "/") == rel:
-            n += 1
-    return n
+        return False
+    return any(
+        isinstance(it, dict)
+        and str(it.get("rel") or "").replace("\\", "/") == rel
+        and (exclude_id is None or str(it.get("id", "")) != exclude_id)
+        for it in lib
+    )
+
+
+def _hash_buf_size() -> int:
+    try:
+        n = int(os.environ.get("PDF_CORR_HASH_BUF", "") or 0)
+    except Exception:
+        n = 0
+    return n if n > 0 else 4 * 1024 * 1024
+
+
+_HASH_BUF_SIZE = _hash_buf_size()
+_HASH_TLS = threading.local()
+
+
+def _feed_hasher(h: Any, path: Path) -> None:
+    """Lit le fichier dans un tampon réutilisable (par thread) et alimente h."""
+    buf = getattr(_HASH_TLS, "buf", None)
+    if buf is None:
+        buf = bytearray(_HASH_BUF_SIZE)
+        _HASH_TLS.buf = buf
+    mv = memoryview(buf)
+    with open(path, "rb", buffering=0) as f:
+        while True:
+            n = f.readinto(buf)
+            if not n:
+                break
+            h.update(mv[:n])
 
 
 def _sha256_file(path: Path) -> str:
+    """SHA-256 du fichier : champ "sha256" du manifeste d'export (format historique)."""
     h = hashlib.sha256()
-    with path.open("rb") as f:
-        for chunk in iter(lambda: f.read(1024 * 1024), b""):
-            h.update(chunk)
+    _feed_hasher(h, path)
+    return h.hexdigest()
+
+
+# Empreinte de dédoublonnage (non cryptographique au sens "intégrité") :
+# BLAKE3 si disponible, sinon BLAKE2b-256 (hashlib, ~2x SHA-256). L'algorithme
+# est noté à côté des empreintes persistées (caches, manifeste d'export).
+_HASH_ALGO = "blake3" if blake3 is not None else "blake2b"
+
+
+def _new_content_hasher() -> Any:
+    if blake3 is not None:
+        return blake3.blake3()
+    return hashlib.blake2b(digest_size=32)
+
+
+def _content_hash_file(path: Path) -> str:
+    h = _new_content_hasher()
+    _feed_hasher(h, path)
     return h.hexdigest()
 
 
+# Cache des empreintes : (chemin, taille, mtime_ns) -> empreinte.
+# Une modification du fichier change taille/mtime => nouvelle clé, donc pas
+# d'invalidation explicite nécessaire.
+_SHA_CACHE: Dict[Tuple[str, int, int], str] = {}
+_SHA_CACHE_MAX = 8192
+
+
+def _content_hash_cached(path: Path) -> str:
+    """Empreinte de contenu (_content_hash_file) mémorisée par (chemin, taille, mtime)."""
+    st = os.stat(path)
+    key = (str(path), int(st.st_size), int(st.st_mtime_ns))
+    sha = _SHA_CACHE.get(key)
+    if sha:
+        return sha
+    sha = _content_hash_file(Path(path))
+    if len(_SHA_CACHE) >= _SHA_CACHE_MAX:
+        _SHA_CACHE.clear()
+    _SHA_CACHE[key] = sha
+    return sha
+
+
+def _hash_or_empty(path: Path) -> str:
+    try:
+        return _content_hash_cached(path)
+    except Exception:
+        return ""
+
+
+def _sha256_or_empty(path: Path) -> str:
+    try:
+        return _sha256_file(path)
+    except Exception:
+        return ""
+
+
+def _hash_many(paths: List[Path], hash_fn: Any = _hash_or_empty) -> List[str]:
+    """Empreintes de plusieurs fichiers, en parallèle (I/O + hashlib libèrent le GIL).
+
+    Même ordre que paths ; "" pour un fichier illisible.
+    """
+    if len(paths) < 2:
+        return [hash_fn(p) for p in paths]
+    workers = min(8, os.cpu_count() or 4, len(paths))
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        return list(ex.map(hash_fn, paths))
+
+
+def _sha_cache_dump(root_dir: Path) -> List[List[Any]]:
+    """Entrées du cache situées sous root_dir, en chemins relatifs (dossier déplaçable).
+
+    Les entrées dont le fichier a disparu ou changé (taille/mtime) sont écartées.
+    """
+    prefix = os.path.join(str(root_dir), "")
+    plen = len(prefix)
+    out: List[List[Any]] = []
+    for (p, size, mtime_ns), sha in list(_SHA_CACHE.items()):
+        if not p.startswith(prefix):
+            continue
+        try:
+            st = os.stat(p)
+        except OSError:
+            continue
+        if st.st_size != size or st.st_mtime_ns != mtime_ns:
+            continue
+        out.append([p[plen:].replace(os.sep, "/"), size, mtime_ns, sha])
+    return out
+
+
+def _sha_cache_load(root_dir: Path, records: Any) -> None:
+    """Recharge des entrées persistées (format de _sha_cache_dump) relatives à root_dir."""
+    if not isinstance(records, list):
+        return
+    root = str(root_dir)
+    for rec in records:
+        try:
+            rel, size, mtime_ns, sha = rec
+            if isinstance(sha, str) and sha:
+                p = os.path.join(root, *str(rel).split("/"))
+                _SHA_CACHE[(p, int(size), int(mtime_ns))] = sha
+        except Exception:
+            continue
+
+
+PROJECT_SHA_CACHE_KEY = "_image_sha_cache"
+
+
+def _sha_cache_restore_project(project: Any) -> None:
+    """Recharge (une fois par objet) le cache persisté dans project.settings."""
+    if getattr(project, "_sha_cache_restored", False):
+        return
+    try:
+        data = project.settings.get(PROJECT_SHA_CACHE_KEY)
+        if isinstance(data, dict) and data.get("algo") == _HASH_ALGO:
+            _sha_cache_load(Path(project.root_dir).resolve(), data.get("entries"))
+        project._sha_cache_restored = True
+    except Exception:
+        pass
+
+
+def _sha_cache_store_project(project: Any) -> None:
+    """Persiste dans project.settings les entrées du cache propres au projet."""
+    try:
+        project.settings[PROJECT_SHA_CACHE_KEY] = {
+            "algo": _HASH_ALGO,
+            "entries": _sha_cache_dump(Path(project.root_dir).resolve()),
+        }
+    except Exception:
+        pass
+
+
 def remove_image_from_library(project: Project, image_id: str) -> Tuple[bool, str]:
     """Supprime une entrée de bibliothèque.
 
@@ -1111,10 +1653,11 @@ def remove_image_from_library(project: Project, image_id: str) -> Tuple[bool, st
     # supprime le fichier (best-effort) uniquement si plus aucune autre entrée
     # ne pointe dessus (sinon on casserait d'autres catégories/entrées).
     try:
-        if rel and _count_rel_in_library(project, rel) <= 0:
+        if rel and not _rel_used_by_other_entry(project, rel, iid):
             p = resolve_image_abs(project, rel)
             if p.exists() and p.is_file():
                 p.unlink()
+                _invalidate_resolve_cache()
     except Exception:
         pass
 
@@ -1158,18 +1701,30 @@ def export_library_to_zip(
 
     manifest = {
         "version": 1,
+        # "sha256" : SHA-256 (format historique, lu par les versions précédentes) ;
+        # "digest" : empreinte de dédoublonnage, calculée avec hash_algo
+        "hash_algo": _HASH_ALGO,
         "categories": export_cats,
         "images": [],
     }
+    _sha_cache_restore_project(project)
+
+    # Résolution puis hachage (en parallèle) des fichiers présents, avant l'écriture du ZIP
+    resolved: List[Tuple[Dict[str, Any], str, Path, bool]] = []
+    for it in selected:
+        rel = str(it.get("rel") or "")
+        if not rel:
+            continue
+        abs_path = resolve_image_abs(project, rel)
+        resolved.append((it, rel, abs_path, abs_path.exists() and abs_path.is_file()))
+    present = [ap for (_it, _rel, ap, ok) in resolved if ok]
+    sha_by_path = dict(zip(present, _hash_many(present)))
+    sha256_by_path = dict(zip(present, _hash_many(present, _sha256_or_empty)))
 
     # On stocke les fichiers sous images/<filename>
     with zipfile.ZipFile(dest, "w", compression=zipfile.ZIP_DEFLATED) as zf:
-        for it in selected:
-            rel = str(it.get("rel") or "")
-            if not rel:
-                continue
-            abs_path = resolve_image_abs(project, rel)
-            if not abs_path.exists() or not abs_path.is_file():
+        for it, rel, abs_path, ok in resolved:
+            if not ok:
                 # on conserve l'entrée mais marque "missing"
                 rec = {
                     "name": str(it.get("name") or ""),
@@ -1177,6 +1732,7 @@ def export_library_to_zip(
                     "rel": rel,
                     "filename": Path(rel).name,
                     "sha256": "",
+                    "digest": "",
                     "w_px": int(it.get("w_px") or 0),
                     "h_px": int(it.get("h_px") or 0),
                     "missing": True,
@@ -1184,11 +1740,7 @@ def export_library_to_zip(
                 manifest["images"].append(rec)
                 continue
 
-            sha = ""
-            try:
-                sha = _sha256_file(abs_path)
-            except Exception:
-                sha = ""
+            sha = sha_by_path.get(abs_path, "")
 
             arcname = Path("images") / abs_path.name
             zf.write(abs_path, arcname.as_posix())
@@ -1197,7 +1749,8 @@ def export_library_to_zip(
                 "name": str(it.get("name") or abs_path.stem),
                 "category": str(it.get("category") or DEFAULT_CATEGORY),
                 "filename": abs_path.name,
-                "sha256": sha,
+                "sha256": sha256_by_path.get(abs_path, ""),
+                "digest": sha,
                 "w_px": int(it.get("w_px") or 0),
                 "h_px": int(it.get("h_px") or 0),
             }
@@ -1205,6 +1758,7 @@ def export_library_to_zip(
 
         zf.writestr(EXPORT_MANIFEST_NAME, json.dumps(manifest, ensure_ascii=False, indent=2))
 
+    _sha_cache_store_project(project)
     return True, "Bibliothèque exportée."
 
 
@@ -1224,7 +1778,7 @@ def import_library_from_zip(
           - si fourni, force toutes les images importées dans cette catégorie.
 
     Notes:
-        - Déduplication : si un fichier importé a le même sha256 qu'un fichier existant,
+        - Déduplication : si un fichier importé a la même empreinte de contenu qu'un fichier existant,
           on réutilise le même fichier (rel) mais on crée une nouvelle entrée de bibliothèque
           si la catégorie diffère.
     """
@@ -1257,86 +1811,93 @@ def import_library_from_zip(
                 if isinstance(c, str) and c.strip():
                     add_category(project, c)
 
-        # index existant par sha256 et par rel
+        # index existant par empreinte et par rel
         existing = _ensure_library_list(project)
+        _sha_cache_restore_project(project)
         sha_to_rel: Dict[str, str] = {}
+        rels: List[str] = []
+        paths: List[Path] = []
         for it in existing:
             rel = str(it.get("rel") or "")
             if not rel:
                 continue
             ap = resolve_image_abs(project, rel)
             if ap.exists() and ap.is_file():
-                try:
-                    sha = _sha256_file(ap)
-                    if sha:
-                        sha_to_rel.setdefault(sha, rel)
-                except Exception:
-                    pass
+                rels.append(rel)
+                paths.append(ap)
+        for rel, sha in zip(rels, _hash_many(paths)):
+            if sha:
+                sha_to_rel.setdefault(sha, rel)
 
         created = 0
         skipped_missing = 0
 
-        with tempfile.TemporaryDirectory() as td:
-            tmp = Path(td)
-            for rec in manifest.get("images", []):
-                if not isinstance(rec, dict):
-                    continue
-                if rec.get("missing") is True:
-                    skipped_missing += 1
-                    continue
+        zip_names = set(zf.namelist())
+        for rec in manifest.get("images", []):
+            if not isinstance(rec, dict):
+                continue
+            if rec.get("missing") is True:
+                skipped_missing += 1
+                continue
 
-                filename = str(rec.get("filename") or "").strip()
-                if not filename:
-                    continue
-                zpath = Path("images") / filename
-                if zpath.as_posix() not in zf.namelist():
-                    skipped_missing += 1
-                    continue
+            filename = str(rec.get("filename") or "").strip()
+            if not filename:
+                continue
+            arc = (Path("images") / filename).as_posix()
+            if arc not in zip_names:
+                skipped_missing += 1
+                continue
 
-                # catégorie finale
-                cat = _normalize_category(category_override or str(rec.get("category") or DEFAULT_CATEGORY))
-                add_category(project, cat)
+            # catégorie finale
+            cat = _normalize_category(category_override or str(rec.get("category") or DEFAULT_CATEGORY))
+            add_category(project, cat)
 
-                # extrait en tmp
-                out = tmp / filename
-                out.parent.mkdir(parents=True, exist_ok=True)
-                with zf.open(zpath.as_posix(), "r") as src_f, out.open("wb") as dst_f:
-                    shutil.copyfileobj(src_f, dst_f)
+            # Lecture unique de l'entrée ZIP : hachage + écriture directe dans le
+            # dossier images (plus de dossier temporaire ni de relecture/copie).
+            dest_name = _new_png_name(Path(filename).stem)
+            dest_path = os.path.join(str(dest_dir), dest_name)
+            h = _new_content_hasher()
+            try:
+                with zf.open(arc, "r") as src_f, open(dest_path, "wb") as dst_f:
+                    while True:
+                        chunk = src_f.read(1024 * 1024)
+                        if not chunk:
+                            break
+                        h.update(chunk)
+                        dst_f.write(chunk)
+            except Exception:
+                try:
+                    os.unlink(dest_path)
+                except Exception:
+                    pass
+                raise
+            sha = h.hexdigest()
 
-                # calc sha
-                sha = ""
+            # si on a déjà ce contenu, on réutilise le même fichier
+            if sha in sha_to_rel:
+                rel = sha_to_rel[sha]
                 try:
-                    sha = _sha256_file(out)
+                    os.unlink(dest_path)
                 except Exception:
-                    sha = str(rec.get("sha256") or "")
-
-                # si on a déjà ce contenu, on réutilise le même fichier
-                if sha and sha in sha_to_rel:
-                    rel = sha_to_rel[sha]
-                else:
-                    # copie vers projet avec nom unique
-                    stem = Path(filename).stem
-                    safe_stem = "".join(ch for ch in stem if (ch.isalnum() or ch in ("-", "_", " "))).strip()
-                    safe_stem = safe_stem.replace(" ", "_") or "image"
-                    dest_name = f"{safe_stem}_{uuid.uuid4().hex[:6]}.png"
-                    dest_path = (dest_dir / dest_name).resolve()
-                    shutil.copy2(out, dest_path)
-                    rel = Path(IMAGES_DIR_REL, dest_name).as_posix()
-                    if sha:
-                        sha_to_rel[sha] = rel
-
-                entry = {
-                    "id": uuid.uuid4().hex,
-                    "name": str(rec.get("name") or Path(filename).stem or "image"),
-                    "rel": rel,
-                    "category": cat,
-                    "w_px": int(rec.get("w_px") or 0),
-                    "h_px": int(rec.get("h_px") or 0),
-                }
-                existing.append(entry)
-                created += 1
+                    pass
+            else:
+                rel = _IMAGES_REL_PREFIX + dest_name
+                sha_to_rel[sha] = rel
+
+            entry = {
+                "id": _rand_hex(16),
+                "name": str(rec.get("name") or Path(filename).stem or "image"),
+                "rel": rel,
+                "category": cat,
+                "w_px": int(rec.get("w_px") or 0),
+                "h_px": int(rec.get("h_px") or 0),
+            }
+            existing.append(entry)
+            created += 1
 
         project.settings["image_library"] = existing
+    _invalidate_resolve_cache()
+    _sha_cache_store_project(project)
 
     msg = f"Import terminé : {created} image(s) ajoutée(s)."
     if skipped_missing:
@@ -11,6 +11,8 @@ import fitz  # PyMuPDF
 # Pillow est généralement disponible dans le bundle (sinon, remplacer par PhotoImage PNG)
 from PIL import Image, ImageTk
 
+from app.services.pdf_annotate import MUPDF_LOCK
+
 
 class PDFViewer(ttk.Frame):
     """
@@ -70,12 +72,13 @@ class PDFViewer(ttk.Frame):
         self.canvas.delete("all")
         self._img_refs.clear()
         self._layout.clear()
-        if self._doc is not None:
-            try:
-                self._doc.close()
-            except Exception:
-                pass
-        self._doc = None
+        with MUPDF_LOCK:
+            if self._doc is not None:
+                try:
+                    self._doc.close()
+                except Exception:
+                    pass
+            self._doc = None
         self._pdf_path = None
         self._lazy_rerender_enabled = False
         self._lazy_rerender_after_id = None
@@ -102,17 +105,18 @@ class PDFViewer(ttk.Frame):
 
         self._pdf_path = Path(pdf_path)
         self._lazy_rerender_enabled = bool(lazy_render)
-        if self._doc is not None:
+        with MUPDF_LOCK:
+            if self._doc is not None:
+                try:
+                    self._doc.close()
+                except Exception:
+                    pass
+            # Ouvre le PDF depuis des bytes pour éviter des soucis de verrouillage/caching (surtout en .exe Windows)
             try:
-                self._doc.close()
+                _data = Path(self._pdf_path).read_bytes()
+                self._doc = fitz.open(stream=_data, filetype='pdf')
             except Exception:
-                pass
-        # Ouvre le PDF depuis des bytes pour éviter des soucis de verrouillage/caching (surtout en .exe Windows)
-        try:
-            _data = Path(self._pdf_path).read_bytes()
-            self._doc = fitz.open(stream=_data, filetype='pdf')
-        except Exception:
-            self._doc = fitz.open(str(self._pdf_path))
+                self._doc = fitz.open(str(self._pdf_path))
 
         if preserve_view:
             prev_zoom = max(0.2, min(6.0, prev_zoom))
@@ -275,12 +279,13 @@ class PDFViewer(ttk.Frame):
 
         # rendu de toutes les pages empilées
         for i in range(self._doc.page_count):
-            page = self._doc.load_page(i)
-            rect = page.rect  # points
-            w_pt, h_pt = float(rect.width), float(rect.height)
+            with MUPDF_LOCK:
+                page = self._doc.load_page(i)
+                rect = page.rect  # points
+                w_pt, h_pt = float(rect.width), float(rect.height)
 
-            mat = fitz.Matrix(self._zoom, self._zoom)
-            pix = page.get_pixmap(matrix=mat, alpha=False)
+                mat = fitz.Matrix(self._zoom, self._zoom)
+                pix = page.get_pixmap(matrix=mat, alpha=False)
 
             # pix -> PIL -> ImageTk
             img = Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
@@ -369,9 +374,10 @@ class PDFViewer(ttk.Frame):
         if not item_id:
             return
 
-        page = self._doc.load_page(page_index)
-        mat = fitz.Matrix(self._zoom, self._zoom)
-        pix = page.get_pixmap(matrix=mat, alpha=False)
+        with MUPDF_LOCK:
+            page = self._doc.load_page(page_index)
+            mat = fitz.Matrix(self._zoom, self._zoom)
+            pix = page.get_pixmap(matrix=mat, alpha=False)
         img = Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
         tk_img = ImageTk.PhotoImage(img)
 